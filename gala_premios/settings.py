@@ -1,5 +1,6 @@
 # gala_premios/gala_premios/settings.py
 
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -125,6 +126,50 @@ if DATABASE_URL and dj_database_url is not None:
     else:
         DATABASES['default'] = dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 
+# Caché (respuestas públicas precomprimidas, ver votaciones/cache.py)
+# Por defecto en memoria del proceso; con varios workers de gunicorn conviene un
+# backend compartido (p.ej. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# y CACHE_LOCATION=redis://...) para que la invalidación llegue a todos.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'gala-premios'),
+    }
+}
+# Con la caché en memoria de cada worker la invalidación por señales solo llega al
+# proceso que hizo el cambio: las respuestas cacheadas duran entonces unos segundos
+_CACHE_COMPARTIDA = 'locmem' not in CACHES['default']['BACKEND'] and 'dummy' not in CACHES['default']['BACKEND']
+CACHE_RESPUESTAS_SEGUNDOS = int(os.environ.get('CACHE_RESPUESTAS_SEGUNDOS', '3600' if _CACHE_COMPARTIDA else '5'))
+
+# Sesiones: 'db' (tabla django_session), 'cached_db' (lecturas desde la caché con la
+# tabla como respaldo) o 'cache' (solo caché). Los modos con caché necesitan un backend
+# compartido: con la caché en memoria de cada worker, una sesión cerrada en uno
+# seguiría viva en los demás. Por eso, sin CACHE_BACKEND compartido se usa 'db'.
+SESSION_MODO = os.environ.get('SESSION_MODO', 'cached_db' if _CACHE_COMPARTIDA else 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+}[SESSION_MODO]
+# Elegibilidad de voto por usuario (votaciones/elegibilidad.py): solo se cachea con un
+# backend compartido, porque los votos invalidan la entrada solo en el worker que los recibe
+ELEGIBILIDAD_CACHE = os.environ.get('ELEGIBILIDAD_CACHE', str(_CACHE_COMPARTIDA)) == 'True'
+ELEGIBILIDAD_CACHE_SEGUNDOS = int(os.environ.get('ELEGIBILIDAD_CACHE_SEGUNDOS', '3600'))
+# Edición vigente (models.edicion_vigente): al archivar una edición solo se invalida en el
+# worker que archiva, así que sin backend compartido se lee de ConfiguracionSistema
+EDICION_CACHE = os.environ.get('EDICION_CACHE', str(_CACHE_COMPARTIDA)) == 'True'
+# Tokens sin usar (ni iniciar sesión) en este número de días se borran con `limpiar_sesiones`
+TOKEN_CADUCIDAD_DIAS = int(os.environ.get('TOKEN_CADUCIDAD_DIAS', '90'))
+# El último uso de un token se guarda como mucho una vez por este intervalo
+TOKEN_USO_INTERVALO_SEGUNDOS = int(os.environ.get('TOKEN_USO_INTERVALO_SEGUNDOS', '3600'))
+
+# Proxies delante de la aplicación (Render añade uno): la IP del voto es la entrada de
+# X-Forwarded-For que añadió el más externo de ellos. Con 0 se usa REMOTE_ADDR.
+PROXIES_DE_CONFIANZA = int(os.environ.get('PROXIES_DE_CONFIANZA', '1'))
+
+# Tareas de administración (p.ej. reset de la gala) en un hilo en segundo plano
+TAREAS_EN_SEGUNDO_PLANO = os.environ.get('TAREAS_EN_SEGUNDO_PLANO', 'True') == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -172,6 +217,22 @@ STORAGES = {
     },
 }
 
+# Resultados públicos precalculados (votaciones/publicacion.py). WhiteNoise sirve
+# los que existían al arrancar en /resultados/...; los nombres llevan el hash del
+# contenido, así que se pueden cachear indefinidamente.
+RESULTADOS_PUBLICOS_DIR = Path(os.environ.get('RESULTADOS_PUBLICOS_DIR', BASE_DIR / 'publicados'))
+# WhiteNoise solo indexa al arrancar: si el directorio aún no existe no hay nada que servir
+if RESULTADOS_PUBLICOS_DIR.is_dir():
+    WHITENOISE_ROOT = RESULTADOS_PUBLICOS_DIR
+
+
+def _cabeceras_resultados(headers, path, url):
+    if url.startswith('/resultados/resultados-'):
+        headers['Cache-Control'] = 'max-age=315360000, public, immutable'
+
+
+WHITENOISE_ADD_HEADERS_FUNCTION = _cabeceras_resultados
+
 # Media files (user-uploaded content)
 MEDIA_URL = '/media/' # URL para acceder a los archivos de media
 MEDIA_ROOT = BASE_DIR / 'media' # Directorio donde se guardarán los archivos de media
@@ -186,14 +247,36 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication que además registra el último uso de cada token
+        'votaciones.autenticacion.TokenAuthenticationConUso',
         'rest_framework.authentication.SessionAuthentication',  # permite cookies de sesión
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON con orjson (misma salida que el renderer por defecto de DRF)
+    'DEFAULT_RENDERER_CLASSES': [
+        'votaciones.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'votaciones.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# MessagePack opcional (Accept: application/msgpack), solo si el paquete está instalado
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('votaciones.renderers.MessagePackRenderer')
+
+# El navegador de la API solo en desarrollo
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
+# Paginación por cursor (opcional en los listados: ?page_size=N / ?cursor=...)
+PAGINACION_TAMANO_PAGINA = int(os.environ.get('PAGINACION_TAMANO_PAGINA', '50'))
+PAGINACION_TAMANO_MAXIMO = int(os.environ.get('PAGINACION_TAMANO_MAXIMO', '500'))
+
 
 # CORS Headers# Configuración de CORS
 # https://github.com/adamchainz/django-cors-headers
@@ -17,10 +17,9 @@ Including another URLconf
 # gala_premios/gala_premios/urls.py
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework.authtoken.views import obtain_auth_token
 
 # Vistas públicas y de usuario
-from votaciones.views import RegistroUsuarioView, ListaPremiosView, VotarView, ListaParticipantesView, MiPerfilView, MisNominacionesView, EnviarSugerenciaView, ResultadosView, ResultadosPublicosView, UsuarioListCreateView, UsuarioDetailView, GoogleAuthView, MisEstadisticasView, ListaTodosPremiosView
+from votaciones.views import RegistroUsuarioView, ListaPremiosView, VotarView, ListaParticipantesView, MiPerfilView, MisNominacionesView, EnviarSugerenciaView, ResultadosView, ResultadosPublicosView, UsuarioListCreateView, UsuarioDetailView, GoogleAuthView, MisEstadisticasView, ListaTodosPremiosView, DetallePremioView, ObtenerTokenView, ResultadosEstaticosView, SalonDeLaFamaView
 from votaciones.views_mejoras import VerificarVotoView, MisVotosView, CambiarEstadoPremioView, EstadisticasAdminView
 
 # ¡NUEVA IMPORTACIÓN para las vistas administrativas!
@@ -33,13 +32,14 @@ from django.conf.urls.static import static
 urlpatterns = [
     path('admin/', admin.site.urls),
     # URLs de autenticación de DRF
-    path('api-token-auth/', obtain_auth_token, name='api_token_auth'),
+    path('api-token-auth/', ObtenerTokenView.as_view(), name='api_token_auth'),
     path('api/auth/register/', RegistroUsuarioView.as_view(), name='register'),
     path('api/auth/google/', GoogleAuthView.as_view(), name='google_auth'),
 
     # URLs de usuario general
     path('api/premios/', ListaPremiosView.as_view(), name='lista_premios'),
     path('api/premios-todos/', ListaTodosPremiosView.as_view(), name='lista_todos_premios'),
+    path('api/premios/<slug:slug>/', DetallePremioView.as_view(), name='detalle_premio'),
     path('api/votar/', VotarView.as_view(), name='votar'),
     path('api/mis-nominaciones/', MisNominacionesView.as_view(), name='mis_nominaciones'),
     path('api/participantes/', ListaParticipantesView.as_view(), name='lista_participantes'),
@@ -48,16 +48,26 @@ urlpatterns = [
     path('api/sugerencias/', EnviarSugerenciaView.as_view(), name='enviar_sugerencia'),
     path('api/resultados/', ResultadosView.as_view(), name='resultados'), # GET es cálculo, POST es publicar (para admins)
     path('api/resultados-publicos/', ResultadosPublicosView.as_view(), name='resultados_publicos'),
+    # Ficheros de resultados publicados (WhiteNoise los sirve antes si existían al arrancar)
+    path('resultados/<str:nombre>', ResultadosEstaticosView.as_view(), name='resultados_estaticos'),
+    path('api/salon-de-la-fama/', SalonDeLaFamaView.as_view(), name='salon_de_la_fama'),
 
     # URLs de administración (solo para superusuarios)
     path('api/admin/usuarios/', UsuarioListCreateView.as_view(), name='admin_usuarios_list'),
     path('api/admin/usuarios/<uuid:pk>/', UsuarioDetailView.as_view(), name='admin_usuarios_detail'),
+    path('api/admin/usuarios/verificar/', views_admin.verificar_usuarios_masivo, name='admin_usuarios_verificar'),
+    path('api/admin/usuarios/tags/', views_admin.asignar_tags_masivo, name='admin_usuarios_tags'),
+    path('api/admin/nominados/vincular/', views_admin.vincular_usuarios_masivo, name='admin_nominados_vincular'),
+    path('api/admin/nominados/importar/', views_admin.importar_nominados_masivo, name='admin_nominados_importar'),
     
     # URLs para el panel de administración
     path('api/admin/estadisticas/', views_admin.estadisticas, name='admin_estadisticas'),
     path('api/admin/premios-top/', views_admin.premios_top, name='admin_premios_top'),
     path('api/admin/avanzar-fase/', views_admin.avanzar_fase, name='avanzar_fase'),
     path('api/admin/reset-gala/', views_admin.reset_gala, name='reset_gala'),
+    path('api/admin/archivar-edicion/', views_admin.archivar_edicion, name='admin_archivar_edicion'),
+    path('api/admin/tareas/<uuid:tarea_id>/', views_admin.estado_tarea, name='admin_estado_tarea'),
+    path('api/admin/exportar-votos/', views_admin.exportar_votos, name='admin_exportar_votos'),
     # CRUD Admin Premios
     path('api/admin/premios/', views_admin.PremioListCreateAPIView.as_view(), name='admin_premios_list_create'),
     path('api/admin/premios/<uuid:id>/', views_admin.PremioRetrieveUpdateDestroyAPIView.as_view(), name='admin_premios_rud'),
@@ -66,6 +76,10 @@ urlpatterns = [
     path('api/admin/nominados/<uuid:id>/', views_admin.NominadoRetrieveUpdateDestroyAPIView.as_view(), name='admin_nominados_rud'),
     # CRUD Admin Sugerencias
     path('api/admin/sugerencias/', views_admin.SugerenciaListAPIView.as_view(), name='admin_sugerencias_list'),
+    path('api/admin/sugerencias/buscar/', views_admin.buscar_sugerencias_admin, name='admin_sugerencias_buscar'),
+    path('api/admin/sugerencias/grupos/', views_admin.grupos_sugerencias, name='admin_sugerencias_grupos'),
+    path('api/admin/premios/proyeccion/', views_admin.proyeccion_premios, name='admin_premios_proyeccion'),
+    path('api/admin/sugerencias/marcar-revisadas/', views_admin.marcar_sugerencias_revisadas, name='admin_sugerencias_marcar_revisadas'),
     path('api/admin/sugerencias/<uuid:id>/', views_admin.SugerenciaRetrieveUpdateDestroyAPIView.as_view(), name='admin_sugerencias_rud'),
     
     # Nuevas URLs para las mejoras
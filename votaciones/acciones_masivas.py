@@ -0,0 +1,193 @@
+# gala_premios/votaciones/acciones_masivas.py
+"""
+Acciones masivas de administración sobre usuarios y nominados.
+
+Cada operación valida todos los elementos con una consulta IN, aplica los
+cambios con un UPDATE (o un bulk insert en la tabla intermedia) y devuelve el
+resultado de cada elemento, para que el panel pueda mostrar qué se aplicó y qué no.
+update() y bulk_create() no envían señales, así que la caché pública se invalida a mano.
+"""
+import uuid
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .cache import invalidar_datos
+from .elegibilidad import invalidar_elegibilidad
+from .models import Nominado, Usuario
+
+# Resultados posibles por elemento
+ACTUALIZADO = 'actualizado'
+SIN_CAMBIOS = 'sin_cambios'
+NO_ENCONTRADO = 'no_encontrado'
+ID_INVALIDO = 'id_invalido'
+TAG_INVALIDO = 'tag_invalido'
+TAG_OCUPADO = 'tag_ocupado'
+TAG_REPETIDO = 'tag_repetido'
+ID_REPETIDO = 'id_repetido'
+VINCULADO = 'vinculado'
+YA_VINCULADO = 'ya_vinculado'
+USUARIO_NO_ENCONTRADO = 'usuario_no_encontrado'
+
+
+def _uuid(valor):
+    try:
+        return uuid.UUID(str(valor))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _resumen(resultados, correcto):
+    return {
+        'resultados': resultados,
+        'aplicados': sum(1 for r in resultados if r['estado'] == correcto),
+        'total': len(resultados),
+    }
+
+
+def verificar_usuarios(ids, verificado=True):
+    """Marca (o desmarca) como verificados los usuarios indicados con un único UPDATE."""
+    resultados, validos = [], []
+    for valor in ids:
+        pk = _uuid(valor)
+        resultados.append({'id': str(valor), 'estado': ID_INVALIDO if pk is None else None})
+        if pk is not None:
+            validos.append(pk)
+
+    actuales = dict(Usuario.objects.filter(pk__in=validos).values_list('pk', 'verificado'))
+    a_cambiar = {pk for pk, estado in actuales.items() if estado != verificado}
+    if a_cambiar:
+        Usuario.objects.filter(pk__in=a_cambiar).update(verificado=verificado)
+        invalidar_datos()
+
+    for resultado in resultados:
+        if resultado['estado'] is None:
+            pk = _uuid(resultado['id'])
+            if pk not in actuales:
+                resultado['estado'] = NO_ENCONTRADO
+            else:
+                resultado['estado'] = ACTUALIZADO if pk in a_cambiar else SIN_CAMBIOS
+    return _resumen(resultados, ACTUALIZADO)
+
+
+def asignar_tags(asignaciones):
+    """
+    Asigna `participante_tag` a varios usuarios: [{'id': ..., 'participante_tag': 'p1' | None}].
+    El tag es único: si lo tiene otro usuario que no está en el lote se informa como
+    ocupado. Los intercambios dentro del lote están permitidos. Si un id aparece
+    varias veces, se aplica la primera asignación válida y las demás son repetidas.
+    """
+    validos = {valor for valor, _ in Usuario.PARTICIPANTE_CHOICES}
+    resultados, pedidos = [], {}
+    tags_en_lote = {}
+    for asignacion in asignaciones:
+        valor = asignacion.get('id') if isinstance(asignacion, dict) else None
+        tag = asignacion.get('participante_tag') if isinstance(asignacion, dict) else None
+        tag = tag or None
+        pk = _uuid(valor)
+        resultado = {'id': str(valor), 'participante_tag': tag, 'estado': None}
+        resultados.append(resultado)
+        if pk is None:
+            resultado['estado'] = ID_INVALIDO
+        elif tag is not None and (not isinstance(tag, str) or tag not in validos):
+            # Un valor JSON no textual (lista, objeto...) ni siquiera se puede buscar en `validos`
+            resultado['estado'] = TAG_INVALIDO
+        elif pk in pedidos:
+            resultado['estado'] = ID_REPETIDO
+        elif tag is not None and tags_en_lote.get(tag, pk) != pk:
+            resultado['estado'] = TAG_REPETIDO
+        else:
+            pedidos[pk] = tag
+            if tag is not None:
+                tags_en_lote[tag] = pk
+
+    actuales = dict(Usuario.objects.filter(pk__in=pedidos).values_list('pk', 'participante_tag'))
+    # Tags que ya tiene otro usuario fuera del lote
+    ocupados = dict(
+        Usuario.objects.filter(participante_tag__in=tags_en_lote)
+        .exclude(pk__in=actuales).values_list('participante_tag', 'pk')
+    )
+    cambios = {}
+    for resultado in resultados:
+        if resultado['estado'] is not None:
+            continue
+        pk, tag = _uuid(resultado['id']), resultado['participante_tag']
+        if pk not in actuales:
+            resultado['estado'] = NO_ENCONTRADO
+        elif tag in ocupados:
+            resultado['estado'] = TAG_OCUPADO
+        elif actuales[pk] == tag:
+            resultado['estado'] = SIN_CAMBIOS
+        else:
+            resultado['estado'] = ACTUALIZADO
+            cambios[pk] = tag
+
+    # Un tag pedido puede seguir en manos de un usuario del lote que no cambia:
+    # se descarta y se repite, porque ese usuario conserva entonces su tag actual
+    while True:
+        retenidos = {tag for pk, tag in actuales.items() if pk not in cambios and tag}
+        bloqueados = [r for r in resultados if r['estado'] == ACTUALIZADO and r['participante_tag'] in retenidos]
+        if not bloqueados:
+            break
+        for resultado in bloqueados:
+            resultado['estado'] = TAG_OCUPADO
+            cambios.pop(_uuid(resultado['id']))
+
+    if cambios:
+        with transaction.atomic():
+            # Primero se liberan los tags del lote para permitir intercambios sin chocar con el UNIQUE
+            Usuario.objects.filter(pk__in=cambios).update(participante_tag=None)
+            Usuario.objects.filter(pk__in=[pk for pk, tag in cambios.items() if tag is not None]).update(
+                participante_tag=Case(*[When(pk=pk, then=Value(tag)) for pk, tag in cambios.items() if tag is not None])
+            )
+        invalidar_datos()
+    return _resumen(resultados, ACTUALIZADO)
+
+
+def vincular_usuarios(vinculos):
+    """
+    Vincula usuarios a nominados: [{'nominado': id, 'usuarios': [id, ...]}].
+    Todas las filas nuevas de la tabla intermedia se insertan con un único bulk_create.
+    Devuelve un resultado por cada par (nominado, usuario).
+    """
+    pares, resultados = [], []
+    for vinculo in vinculos:
+        nominado = vinculo.get('nominado') if isinstance(vinculo, dict) else None
+        usuarios = vinculo.get('usuarios') if isinstance(vinculo, dict) else None
+        if not isinstance(usuarios, list):
+            usuarios = [usuarios]
+        for usuario in usuarios:
+            resultado = {'nominado': str(nominado), 'usuario': str(usuario), 'estado': None}
+            resultados.append(resultado)
+            pk_nominado, pk_usuario = _uuid(nominado), _uuid(usuario)
+            if pk_nominado is None or pk_usuario is None:
+                resultado['estado'] = ID_INVALIDO
+            else:
+                pares.append((resultado, pk_nominado, pk_usuario))
+
+    nominados = dict(Nominado.objects.filter(pk__in={n for _, n, _ in pares}).values_list('pk', 'premio_id'))
+    usuarios = set(Usuario.objects.filter(pk__in={u for _, _, u in pares}).values_list('pk', flat=True))
+    Vinculo = Nominado.usuarios_vinculados.through
+    existentes = set(
+        Vinculo.objects.filter(nominado_id__in=nominados, usuario_id__in=usuarios)
+        .values_list('nominado_id', 'usuario_id')
+    )
+
+    nuevos = {}
+    for resultado, pk_nominado, pk_usuario in pares:
+        if pk_nominado not in nominados:
+            resultado['estado'] = NO_ENCONTRADO
+        elif pk_usuario not in usuarios:
+            resultado['estado'] = USUARIO_NO_ENCONTRADO
+        elif (pk_nominado, pk_usuario) in existentes or (pk_nominado, pk_usuario) in nuevos:
+            resultado['estado'] = YA_VINCULADO
+        else:
+            resultado['estado'] = VINCULADO
+            nuevos[(pk_nominado, pk_usuario)] = Vinculo(nominado_id=pk_nominado, usuario_id=pk_usuario)
+
+    if nuevos:
+        # ignore_conflicts: si otro proceso creó el mismo vínculo a la vez, no falla el lote
+        Vinculo.objects.bulk_create(nuevos.values(), ignore_conflicts=True)
+        invalidar_datos(premios={nominados[pk_nominado] for pk_nominado, _ in nuevos})
+        invalidar_elegibilidad(usuarios={pk_usuario for _, pk_usuario in nuevos})
+    return _resumen(resultados, VINCULADO)
@@ -1,24 +1,182 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin
-from .models import Usuario, Premio, Nominado, Voto, Sugerencia # Importamos nuestros modelos
+from .models import Usuario, Premio, Nominado, Voto, Sugerencia, PremioArchivado, NominadoArchivado, GanadorHistorico # Importamos nuestros modelos
+from .paginacion import EstimatedCountPaginator
+from .acciones_masivas import ACTUALIZADO, VINCULADO, asignar_tags, verificar_usuarios, vincular_usuarios
+
+
+class NominadoChoiceField(forms.ModelChoiceField):
+    # Sin __str__ de Nominado, que consulta los vinculados de cada opción
+    def label_from_instance(self, obj):
+        return f"{obj.premio.nombre} - {obj.nombre}"
+
+
+# Campos extra de la barra de acciones del listado de usuarios
+class UsuarioActionForm(ActionForm):
+    participante_tag = forms.ChoiceField(
+        choices=[('', 'Sin tag')] + list(Usuario.PARTICIPANTE_CHOICES), required=False, label='Tag'
+    )
+    nominado = NominadoChoiceField(
+        queryset=Nominado.objects.filter(activo=True).select_related('premio').order_by('premio__nombre', 'nombre'),
+        required=False, label='Nominado'
+    )
+
 
 # Creamos una clase de administración personalizada para Usuario
 class CustomUserAdmin(UserAdmin):
     # Aquí puedes personalizar qué campos se muestran en la lista de usuarios en el admin
     list_display = UserAdmin.list_display + ('verificado',) # Añade 'verificado' a la lista de columnas
+    list_filter = UserAdmin.list_filter + ('verificado', 'email_duplicado')
 
     # Aquí puedes personalizar los campos que se editan al ver o añadir un usuario
     # Puedes añadir 'verificado' a uno de los fieldsets existentes o crear uno nuevo.
     fieldsets = UserAdmin.fieldsets + (
-        ('Verificación', {'fields': ('verificado',)}),
+        ('Verificación', {'fields': ('verificado', 'email_duplicado')}),
     )
     # También puedes añadirlo al add_fieldsets si los tienes personalizados para la creación
+    # Las acciones usan las operaciones masivas de acciones_masivas.py (un UPDATE o un
+    # bulk_create por lote) e informan del resultado de cada usuario
+    actions = ('verificar', 'desverificar', 'asignar_tag', 'vincular_a_nominado')
+    action_form = UsuarioActionForm
+
+    @admin.action(description='Verificar usuarios seleccionados')
+    def verificar(self, request, queryset):
+        self._marcar_verificado(request, queryset, True)
+
+    @admin.action(description='Quitar verificación a los usuarios seleccionados')
+    def desverificar(self, request, queryset):
+        self._marcar_verificado(request, queryset, False)
+
+    def _marcar_verificado(self, request, queryset, verificado):
+        nombres = {str(pk): nombre for pk, nombre in queryset.values_list('pk', 'username')}
+        resumen = verificar_usuarios(list(nombres), verificado=verificado)
+        self._informar(request, resumen, nombres, 'id')
+
+    @admin.action(description='Asignar el tag elegido a los usuarios seleccionados')
+    def asignar_tag(self, request, queryset):
+        # Un tag solo puede tenerlo un usuario: con varios seleccionados se asigna al primero
+        tag = request.POST.get('participante_tag') or None
+        nombres = {str(pk): nombre for pk, nombre in queryset.order_by('username').values_list('pk', 'username')}
+        resumen = asignar_tags([{'id': pk, 'participante_tag': tag} for pk in nombres])
+        self._informar(request, resumen, nombres, 'id')
+
+    @admin.action(description='Vincular los usuarios seleccionados al nominado elegido')
+    def vincular_a_nominado(self, request, queryset):
+        nominado = request.POST.get('nominado')
+        if not nominado:
+            self.message_user(request, "Elige un nominado para vincular.", messages.ERROR)
+            return
+        nombres = {str(pk): nombre for pk, nombre in queryset.values_list('pk', 'username')}
+        resumen = vincular_usuarios([{'nominado': nominado, 'usuarios': list(nombres)}])
+        self._informar(request, resumen, nombres, 'usuario')
+
+    def _informar(self, request, resumen, nombres, campo):
+        """Mensaje con los aplicados y, agrupados por estado, los usuarios a los que no se aplicó."""
+        self.message_user(request, f"{resumen['aplicados']} de {resumen['total']} usuarios actualizados.")
+        omitidos = {}
+        for resultado in resumen['resultados']:
+            if resultado['estado'] not in (ACTUALIZADO, VINCULADO):
+                omitidos.setdefault(resultado['estado'], []).append(nombres.get(resultado[campo], resultado[campo]))
+        for estado, usuarios in omitidos.items():
+            self.message_user(request, f"{estado.replace('_', ' ')}: {', '.join(usuarios)}", messages.WARNING)
 
 # Desregistra el User por defecto si ya lo habías registrado antes y registra tu CustomUserAdmin
 admin.site.register(Usuario, CustomUserAdmin)
 
-# Registramos cada modelo para que aparezca en el panel de administración
-admin.site.register(Premio)
-admin.site.register(Nominado)
-admin.site.register(Voto)
-admin.site.register(Sugerencia)
\ No newline at end of file
+# Los listados no usan __str__ de Nominado/Voto (hacen consultas por fila):
+# cada columna sale de relaciones cargadas con select_related/prefetch_related.
+
+@admin.register(Premio)
+class PremioAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'estado', 'ronda_actual', 'tipo', 'sistema_puntuacion', 'edicion', 'activo')
+    list_filter = ('estado', 'tipo', 'sistema_puntuacion', 'activo', 'edicion')
+    search_fields = ('nombre', 'slug')
+    # Los ganadores se eligen con búsqueda en lugar de un desplegable con todos los nominados
+    autocomplete_fields = ('ganador_oro', 'ganador_plata', 'ganador_bronce')
+
+
+@admin.register(Nominado)
+class NominadoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'premio_nombre', 'vinculados', 'edicion', 'activo')
+    list_select_related = ('premio',)
+    list_filter = ('activo', 'edicion', 'premio__estado')
+    search_fields = ('nombre', 'premio__nombre')
+    autocomplete_fields = ('premio', 'usuarios_vinculados')
+
+    def get_queryset(self, request):
+        # También lo usa el autocompletado, que muestra str(nominado) (premio y vinculados)
+        return super().get_queryset(request).select_related('premio').prefetch_related('usuarios_vinculados')
+
+    @admin.display(description='Premio', ordering='premio__nombre')
+    def premio_nombre(self, obj):
+        return obj.premio.nombre
+
+    @admin.display(description='Vinculados')
+    def vinculados(self, obj):
+        return ", ".join(u.username for u in obj.usuarios_vinculados.all())
+
+
+@admin.register(Voto)
+class VotoAdmin(admin.ModelAdmin):
+    list_display = ('fecha_voto', 'usuario_username', 'premio_nombre', 'nominado_nombre', 'ronda', 'orden_ronda2', 'edicion')
+    list_select_related = ('usuario', 'premio', 'nominado')
+    # Filtros apoyados en los índices (premio, ronda, fecha_voto) y (edicion, ronda, fecha_voto),
+    # que devuelven las filas ya ordenadas por fecha; solo por ronda se recorre el de fecha_voto
+    list_filter = ('ronda', 'edicion', 'premio')
+    date_hierarchy = 'fecha_voto'
+    # Búsqueda exacta por username: usa el índice único en lugar de un LIKE sobre la tabla
+    search_fields = ('=usuario__username',)
+    raw_id_fields = ('usuario', 'premio', 'nominado', 'agente')
+    readonly_fields = ('fecha_voto',)
+    # Sin COUNT(*) de la tabla completa en cada página
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    @admin.display(description='Usuario', ordering='usuario__username')
+    def usuario_username(self, obj):
+        return obj.usuario.username
+
+    @admin.display(description='Premio', ordering='premio__nombre')
+    def premio_nombre(self, obj):
+        return obj.premio.nombre
+
+    @admin.display(description='Nominado', ordering='nominado__nombre')
+    def nominado_nombre(self, obj):
+        return obj.nominado.nombre
+
+
+@admin.register(Sugerencia)
+class SugerenciaAdmin(admin.ModelAdmin):
+    list_display = ('fecha_sugerencia', 'usuario', 'tipo', 'revisada')
+    list_select_related = ('usuario',)
+    list_filter = ('revisada', 'tipo')
+    date_hierarchy = 'fecha_sugerencia'
+    raw_id_fields = ('usuario',)
+
+# Archivo de ediciones pasadas
+class NominadoArchivadoInline(admin.TabularInline):
+    model = NominadoArchivado
+    extra = 0
+
+@admin.register(PremioArchivado)
+class PremioArchivadoAdmin(admin.ModelAdmin):
+    list_display = ('premio_nombre', 'edicion', 'votantes_ronda1', 'votantes_ronda2', 'fecha_archivado')
+    list_filter = ('edicion',)
+    inlines = [NominadoArchivadoInline]
+
+
+# Tabla derivada de Premio.ganadores_historicos: se consulta aquí y se edita desde el premio
+@admin.register(GanadorHistorico)
+class GanadorHistoricoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'premio', 'anio')
+    list_filter = ('anio',)
+    search_fields = ('nombre',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,209 @@
+# gala_premios/votaciones/analitica.py
+"""
+Instantánea columnar de los votos para análisis fuera de la base de datos.
+
+`exportar_dataset` escribe un directorio con un fichero `.npy` por columna
+(una fila por voto) y un `diccionario.json` que traduce los códigos enteros a
+ids y nombres:
+
+    premio.npy    int32   código del premio (índice en diccionario['premios'])
+    nominado.npy  int32   código del nominado
+    usuario.npy   int32   código del usuario
+    ronda.npy     uint8   1 o 2
+    posicion.npy  uint8   orden_ronda2 (0 en la Ronda 1)
+    fecha.npy     int64   fecha del voto en microsegundos desde 1970 (UTC)
+    edicion.npy   uint16  edición de la gala
+
+Los votos se leen con `.iterator()` y cada lote se añade a un fichero binario
+temporal por columna, así que la memoria no depende del número de votos. Al
+final se antepone la cabecera .npy y el directorio se publica con un rename.
+
+`cargar_dataset` abre las columnas con `np.load(mmap_mode='r')`: los datos se
+leen del disco bajo demanda y varios procesos comparten las mismas páginas.
+"""
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.utils import timezone
+
+from .exportacion import TAMANO_LOTE_EXPORTACION
+from .models import Nominado, Premio, Usuario
+
+VERSION_FORMATO = 1
+FICHERO_DICCIONARIO = 'diccionario.json'
+COLUMNAS_DATASET = {
+    'premio': np.int32,
+    'nominado': np.int32,
+    'usuario': np.int32,
+    'ronda': np.uint8,
+    'posicion': np.uint8,
+    'fecha': np.int64,
+    'edicion': np.uint16,
+}
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSEGUNDO = timedelta(microseconds=1)
+_LOTE_NOMBRES = 1000
+
+
+class _Codificador:
+    """Asigna códigos enteros consecutivos a los ids según van apareciendo."""
+
+    def __init__(self):
+        self.codigos = {}
+
+    def __call__(self, valor):
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.codigos)
+        return codigo
+
+    def ids(self):
+        return list(self.codigos)
+
+
+def _nombres(modelo, ids, campos):
+    """{id: {campo: valor}} por lotes (sin cargar toda la tabla)."""
+    datos = {}
+    for inicio in range(0, len(ids), _LOTE_NOMBRES):
+        for fila in modelo.objects.filter(pk__in=ids[inicio:inicio + _LOTE_NOMBRES]).values('pk', *campos):
+            datos[fila.pop('pk')] = fila
+    return datos
+
+
+def _escribir_npy(ruta, bruto, dtype, filas):
+    """Crea `ruta` (.npy) con la cabecera para `filas` elementos seguida del fichero binario `bruto`."""
+    cabecera = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': (filas,)}
+    with open(ruta, 'wb') as destino, open(bruto, 'rb') as origen:
+        np.lib.format.write_array_header_1_0(destino, cabecera)
+        shutil.copyfileobj(origen, destino, length=1 << 20)
+
+
+def exportar_dataset(votos, directorio, chunk_size=TAMANO_LOTE_EXPORTACION):
+    """
+    Escribe el dataset de `votos` (queryset) en `directorio`, que no debe
+    existir. Devuelve el número de votos exportados.
+    """
+    directorio = Path(directorio)
+    if directorio.exists():
+        raise FileExistsError(f"El directorio '{directorio}' ya existe.")
+    directorio.parent.mkdir(parents=True, exist_ok=True)
+    temporal = Path(tempfile.mkdtemp(prefix='.dataset-', dir=directorio.parent))
+    try:
+        premios, nominados, usuarios = _Codificador(), _Codificador(), _Codificador()
+        brutos = {nombre: open(temporal / f'{nombre}.bin', 'wb') for nombre in COLUMNAS_DATASET}
+        total = 0
+        try:
+            filas = votos.values_list(
+                'premio_id', 'nominado_id', 'usuario_id', 'ronda', 'orden_ronda2', 'fecha_voto', 'edicion'
+            ).iterator(chunk_size=chunk_size)
+            lote = []
+            for fila in filas:
+                lote.append(fila)
+                if len(lote) >= chunk_size:
+                    total += _volcar(lote, brutos, premios, nominados, usuarios)
+                    lote = []
+            total += _volcar(lote, brutos, premios, nominados, usuarios)
+        finally:
+            for fichero in brutos.values():
+                fichero.close()
+
+        for nombre, dtype in COLUMNAS_DATASET.items():
+            bruto = temporal / f'{nombre}.bin'
+            _escribir_npy(temporal / f'{nombre}.npy', bruto, dtype, total)
+            bruto.unlink()
+
+        datos_premios = _nombres(Premio, premios.ids(), ('nombre',))
+        datos_nominados = _nombres(Nominado, nominados.ids(), ('nombre', 'premio_id'))
+        datos_usuarios = _nombres(Usuario, usuarios.ids(), ('username',))
+        diccionario = {
+            'version': VERSION_FORMATO,
+            'generado': timezone.now().isoformat(),
+            'votos': total,
+            'columnas': {nombre: np.dtype(dtype).name for nombre, dtype in COLUMNAS_DATASET.items()},
+            'fecha': 'microsegundos desde 1970-01-01 UTC',
+            # El código es la posición en cada lista. Los borrados después de votar quedan sin nombre.
+            'premios': [
+                {'id': str(pk), 'nombre': datos_premios.get(pk, {}).get('nombre')} for pk in premios.ids()
+            ],
+            'nominados': [
+                {
+                    'id': str(pk),
+                    'nombre': datos_nominados.get(pk, {}).get('nombre'),
+                    'premio': premios.codigos.get(datos_nominados.get(pk, {}).get('premio_id')),
+                }
+                for pk in nominados.ids()
+            ],
+            'usuarios': [
+                {'id': str(pk), 'username': datos_usuarios.get(pk, {}).get('username')} for pk in usuarios.ids()
+            ],
+        }
+        with open(temporal / FICHERO_DICCIONARIO, 'w', encoding='utf-8') as fichero:
+            json.dump(diccionario, fichero, ensure_ascii=False)
+        os.replace(temporal, directorio)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return total
+
+
+def _volcar(lote, brutos, premios, nominados, usuarios):
+    """Codifica un lote de filas y lo añade al final de cada fichero binario."""
+    if not lote:
+        return 0
+    premio, nominado, usuario, ronda, posicion, fecha, edicion = zip(*lote)
+    columnas = {
+        'premio': [premios(v) for v in premio],
+        'nominado': [nominados(v) for v in nominado],
+        'usuario': [usuarios(v) for v in usuario],
+        'ronda': ronda,
+        'posicion': [v or 0 for v in posicion],
+        'fecha': [(v - _EPOCA) // _MICROSEGUNDO for v in fecha],
+        'edicion': edicion,
+    }
+    for nombre, valores in columnas.items():
+        np.asarray(valores, dtype=COLUMNAS_DATASET[nombre]).tofile(brutos[nombre])
+    return len(lote)
+
+
+class DatasetVotos:
+    """
+    Dataset exportado con `exportar_dataset`, abierto en modo memory-map.
+    Las columnas son arrays de solo lectura: `dataset.premio`, `dataset.fecha`...
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        with open(self.directorio / FICHERO_DICCIONARIO, encoding='utf-8') as fichero:
+            self.diccionario = json.load(fichero)
+        if self.diccionario.get('version') != VERSION_FORMATO:
+            raise ValueError(f"Versión de dataset no soportada: {self.diccionario.get('version')}")
+        self.columnas = {
+            nombre: np.load(self.directorio / f'{nombre}.npy', mmap_mode='r') for nombre in COLUMNAS_DATASET
+        }
+
+    def __getattr__(self, nombre):
+        columnas = self.__dict__.get('columnas', {})
+        if nombre in columnas:
+            return columnas[nombre]
+        raise AttributeError(nombre)
+
+    def __len__(self):
+        return self.diccionario['votos']
+
+    def fechas(self):
+        """Columna de fechas como datetime64[us] (vista, sin copiar)."""
+        return self.columnas['fecha'].view('datetime64[us]')
+
+    def nombre(self, tipo, codigo):
+        """Nombre de un código: tipo es 'premios', 'nominados' o 'usuarios'."""
+        entrada = self.diccionario[tipo][int(codigo)]
+        return entrada.get('nombre', entrada.get('username'))
+
+
+def cargar_dataset(directorio):
+    return DatasetVotos(directorio)
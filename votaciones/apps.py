@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class VotacionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'votaciones'
+
+    def ready(self):
+        # Registra los receptores de señales (invalidación de caché)
+        from . import signals  # noqa: F401
@@ -0,0 +1,35 @@
+# gala_premios/votaciones/autenticacion.py
+"""
+Autenticación por token que registra cuándo se usa cada token.
+
+TokenAuthentication de DRF no toca `last_login`, así que un cliente que
+conserva su token (p.ej. tras iniciar sesión con Google) parecería inactivo
+aunque lo use a diario. Aquí se guarda el último uso en UsoToken, con como
+mucho una escritura por token cada TOKEN_USO_INTERVALO_SEGUNDOS (el intervalo
+se controla con la caché; con la caché en memoria, una por worker).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+
+from .models import UsoToken
+
+
+def registrar_uso_token(clave, ahora=None):
+    """Apunta el uso del token si no se ha apuntado en el intervalo actual. Devuelve si se escribió."""
+    # La clave del token es secreta: en la caché solo se guarda su hash
+    marca = f"gala:token_uso:{hashlib.sha256(clave.encode()).hexdigest()[:32]}"
+    if not cache.add(marca, 1, timeout=settings.TOKEN_USO_INTERVALO_SEGUNDOS):
+        return False
+    UsoToken.objects.update_or_create(clave=clave, defaults={'ultimo_uso': ahora or timezone.now()})
+    return True
+
+
+class TokenAuthenticationConUso(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        usuario, token = super().authenticate_credentials(key)
+        registrar_uso_token(token.key)
+        return usuario, token
@@ -0,0 +1,187 @@
+# gala_premios/votaciones/busqueda.py
+"""
+Búsqueda de texto completo en las sugerencias (contenido y notas del administrador).
+
+- PostgreSQL: `to_tsvector` en español sobre ambos campos, con un índice GIN de
+  expresión creado en la migración 0019. `_vector()` debe coincidir exactamente
+  con la expresión del índice para que el planificador lo use.
+- SQLite: tabla virtual FTS5 `votaciones_sugerencia_fts` (id + textos),
+  mantenida con triggers sobre la tabla de sugerencias. Ranking con bm25.
+- Otros motores (o SQLite sin FTS5): búsqueda con icontains, sin ranking.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Sugerencia
+
+CONFIGURACION_TEXTO = 'spanish'
+TABLA_FTS = 'votaciones_sugerencia_fts'
+TAMANO_LOTE_MARCADO = 1000
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+
+
+def _vector():
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('contenido', 'notas_admin', config=CONFIGURACION_TEXTO)
+
+
+@lru_cache(maxsize=None)
+def _tiene_fts5():
+    return TABLA_FTS in connection.introspection.table_names()
+
+
+def motor_busqueda():
+    """'postgresql', 'fts5' o 'basico' según la base de datos en uso."""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and _tiene_fts5():
+        return 'fts5'
+    return 'basico'
+
+
+def _consulta_fts5(texto):
+    """Cada palabra entre comillas (sin operadores de FTS5); todas deben aparecer."""
+    return ' '.join(f'"{palabra}"' for palabra in _PALABRA.findall(texto))
+
+
+def _filtros(queryset, tipo, revisada):
+    if tipo is not None:
+        queryset = queryset.filter(tipo=tipo)
+    if revisada is not None:
+        queryset = queryset.filter(revisada=revisada)
+    return queryset
+
+
+def _coincidencias(motor, texto, tipo, revisada):
+    """
+    Queryset (sin ordenar) de las coincidencias en PostgreSQL o en la búsqueda
+    básica, junto con la SearchQuery de PostgreSQL (None en la básica).
+    """
+    if motor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery
+
+        consulta = SearchQuery(texto, config=CONFIGURACION_TEXTO, search_type='websearch')
+        coincidencias = (
+            _filtros(Sugerencia.objects.all(), tipo, revisada)
+            .annotate(documento=_vector())
+            .filter(documento=consulta)
+        )
+        return coincidencias, consulta
+    filtro = Q()
+    for palabra in _PALABRA.findall(texto):
+        filtro &= Q(contenido__icontains=palabra) | Q(notas_admin__icontains=palabra)
+    if not filtro:
+        return Sugerencia.objects.none(), None
+    return _filtros(Sugerencia.objects.filter(filtro), tipo, revisada), None
+
+
+def _from_fts5(consulta, tipo, revisada):
+    """Cláusulas FROM ... WHERE ... (y sus parámetros) de la búsqueda FTS5, con `s` como alias de las sugerencias."""
+    condiciones, parametros = [f'{TABLA_FTS} MATCH %s'], [consulta]
+    if tipo is not None:
+        condiciones.append('s.tipo = %s')
+        parametros.append(tipo)
+    if revisada is not None:
+        condiciones.append('s.revisada = %s')
+        parametros.append(revisada)
+    tabla = Sugerencia._meta.db_table
+    return (
+        f'FROM {TABLA_FTS} f JOIN {tabla} s ON s.id = f.sugerencia_id WHERE {" AND ".join(condiciones)}',
+        parametros,
+    )
+
+
+def _ids_fts5(cursor):
+    campo_id = Sugerencia._meta.pk
+    return [(campo_id.to_python(pk), *resto) for pk, *resto in cursor.fetchall()]
+
+
+def buscar_sugerencias(texto, tipo=None, revisada=None, limite=None, desplazamiento=0):
+    """
+    Lista de (id, rango) de las sugerencias que contienen `texto`, de más a menos
+    relevante (a igual relevancia, las más recientes primero). `rango` es None
+    en la búsqueda básica. La página (`limite`/`desplazamiento`) se pide a la
+    base de datos con LIMIT/OFFSET.
+    """
+    motor = motor_busqueda()
+    if motor == 'fts5':
+        consulta = _consulta_fts5(texto)
+        if not consulta:
+            return []
+        desde, parametros = _from_fts5(consulta, tipo, revisada)
+        with connection.cursor() as cursor:
+            # bm25() es menor cuanto más relevante: se devuelve cambiado de signo.
+            # LIMIT -1 en SQLite es "sin límite".
+            cursor.execute(
+                f'SELECT f.sugerencia_id, -bm25({TABLA_FTS}) AS rango {desde} '
+                f'ORDER BY rango DESC, s.fecha_sugerencia DESC LIMIT %s OFFSET %s',
+                [*parametros, -1 if limite is None else limite, desplazamiento],
+            )
+            return _ids_fts5(cursor)
+
+    coincidencias, consulta = _coincidencias(motor, texto, tipo, revisada)
+    fin = None if limite is None else desplazamiento + limite
+    if consulta is None:
+        pks = coincidencias.order_by('-fecha_sugerencia').values_list('pk', flat=True)[desplazamiento:fin]
+        return [(pk, None) for pk in pks]
+
+    from django.contrib.postgres.search import SearchRank
+
+    filas = (
+        coincidencias.annotate(rango=SearchRank(_vector(), consulta))
+        .order_by('-rango', '-fecha_sugerencia')
+        .values_list('pk', 'rango')
+    )
+    return list(filas[desplazamiento:fin])
+
+
+def contar_sugerencias(texto, tipo=None, revisada=None):
+    """Número de sugerencias que contienen `texto` (COUNT en la base de datos)."""
+    motor = motor_busqueda()
+    if motor == 'fts5':
+        consulta = _consulta_fts5(texto)
+        if not consulta:
+            return 0
+        desde, parametros = _from_fts5(consulta, tipo, revisada)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {desde}', parametros)
+            return cursor.fetchone()[0]
+    return _coincidencias(motor, texto, tipo, revisada)[0].count()
+
+
+def _pendientes(motor, texto, tipo, limite):
+    """Ids de hasta `limite` coincidencias aún sin revisar."""
+    if motor == 'fts5':
+        consulta = _consulta_fts5(texto)
+        if not consulta:
+            return []
+        desde, parametros = _from_fts5(consulta, tipo, False)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT f.sugerencia_id {desde} LIMIT %s', [*parametros, limite])
+            return [pk for pk, in _ids_fts5(cursor)]
+    coincidencias, _ = _coincidencias(motor, texto, tipo, False)
+    return list(coincidencias.values_list('pk', flat=True)[:limite])
+
+
+def marcar_revisadas(texto, tipo=None, revisada=None, tamano_lote=TAMANO_LOTE_MARCADO):
+    """
+    Marca como revisadas las sugerencias que contienen `texto` (mismos criterios
+    que `buscar_sugerencias`). Cada lote es una transacción corta: se leen
+    `tamano_lote` coincidencias pendientes y se actualizan, hasta que no quedan.
+    Devuelve cuántas cambiaron.
+    """
+    if revisada:
+        return 0
+    motor = motor_busqueda()
+    actualizadas = 0
+    while True:
+        with transaction.atomic():
+            ids = _pendientes(motor, texto, tipo, tamano_lote)
+            if not ids:
+                break
+            actualizadas += Sugerencia.objects.filter(pk__in=ids, revisada=False).update(revisada=True)
+    return actualizadas
@@ -0,0 +1,176 @@
+# gala_premios/votaciones/cache.py
+"""
+Caché de respuestas públicas.
+
+Las respuestas se guardan ya renderizadas (bytes) junto con sus variantes
+comprimidas con gzip y, si está instalado el paquete `brotli`, con brotli.
+Así el JSON se codifica y comprime una vez por versión de los datos y no en
+cada petición. La versión se incrementa desde `signals.py` cada vez que
+cambian premios, nominados, usuarios o la configuración.
+
+El detalle de un premio (`/api/premios/<slug>/`) usa además una versión propia
+por premio, de modo que editar un premio o sus nominados no invalida el
+detalle de los demás. Las operaciones masivas que no indican qué premios
+tocan invalidan todos los detalles a la vez (generación).
+"""
+import gzip
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None
+
+CLAVE_VERSION = 'gala:version_datos'
+CLAVE_GENERACION_PREMIOS = 'gala:premios:generacion'
+CLAVE_MAPA_SLUGS = 'gala:premios:slugs'
+
+
+def _clave_version_premio(premio_id):
+    return f'gala:premio:{premio_id}:version'
+
+
+def _incrementar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, 2, timeout=None)
+
+
+def version_datos():
+    """Versión actual de los datos públicos (se crea a 1 si no existe)."""
+    cache.add(CLAVE_VERSION, 1, timeout=None)
+    return cache.get(CLAVE_VERSION, 1)
+
+
+def version_premio(premio_id):
+    """Versión del detalle de un premio: generación global + versión propia del premio."""
+    claves = (CLAVE_GENERACION_PREMIOS, _clave_version_premio(premio_id))
+    valores = cache.get_many(claves)
+    return f"{valores.get(claves[0], 1)}.{valores.get(claves[1], 1)}"
+
+
+def invalidar_datos(premios=None):
+    """
+    Invalida todas las respuestas cacheadas pasando a una nueva versión.
+    Con `premios` (ids) solo se invalida el detalle de esos premios; sin él,
+    el de todos.
+    """
+    _incrementar(CLAVE_VERSION)
+    if premios is None:
+        _incrementar(CLAVE_GENERACION_PREMIOS)
+    else:
+        for premio_id in set(premios):
+            _incrementar(_clave_version_premio(premio_id))
+
+
+def invalidar_mapa_slugs():
+    cache.delete(CLAVE_MAPA_SLUGS)
+
+
+def premio_por_slug(slug):
+    """
+    Id del premio activo con ese slug (o None), a partir de un mapa slug -> id
+    cacheado. El mapa se invalida al guardar o borrar un premio y con cada
+    nueva generación (operaciones masivas).
+    """
+    from .models import Premio
+
+    generacion = cache.get(CLAVE_GENERACION_PREMIOS, 1)
+    entrada = cache.get(CLAVE_MAPA_SLUGS)
+    if entrada is None or entrada['generacion'] != generacion:
+        slugs = Premio.objects.filter(activo=True).exclude(slug__isnull=True).exclude(slug='')
+        entrada = {'generacion': generacion, 'mapa': dict(slugs.values_list('slug', 'id'))}
+        cache.set(CLAVE_MAPA_SLUGS, entrada, timeout=None)
+    return entrada['mapa'].get(slug)
+
+
+def codificaciones_aceptadas(request):
+    """Codificaciones de 'Accept-Encoding' que el cliente acepta (ignora las de q=0)."""
+    aceptadas = set()
+    for parte in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        parametros = parametros.replace(' ', '')
+        if nombre and parametros not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            aceptadas.add(nombre.lower())
+    return aceptadas
+
+
+def comprimir_variantes(cuerpo):
+    """Devuelve las variantes comprimidas que merecen la pena (más pequeñas que el original)."""
+    variantes = {}
+    comprimido = gzip.compress(cuerpo, compresslevel=9, mtime=0)
+    if len(comprimido) < len(cuerpo):
+        variantes['gzip'] = comprimido
+    if brotli is not None:
+        comprimido = brotli.compress(cuerpo, quality=9)
+        if len(comprimido) < len(cuerpo):
+            variantes['br'] = comprimido
+    return variantes
+
+
+def respuesta_desde_cache(entrada, request):
+    """Construye la respuesta eligiendo la variante según 'Accept-Encoding'."""
+    aceptadas = codificaciones_aceptadas(request)
+    cuerpo, codificacion = entrada['cuerpo'], None
+    for candidata in ('br', 'gzip'):
+        if candidata in entrada['variantes'] and candidata in aceptadas:
+            cuerpo, codificacion = entrada['variantes'][candidata], candidata
+            break
+
+    response = HttpResponse(cuerpo, content_type=entrada['content_type'], status=entrada['status'])
+    if codificacion:
+        response['Content-Encoding'] = codificacion
+    response['Content-Length'] = str(len(cuerpo))
+    for cabecera, valor in entrada['cabeceras'].items():
+        response[cabecera] = valor
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def respuesta_cacheada(solo_anonimos=False, version=None):
+    """
+    Decorador para el método `get` de una APIView pública.
+
+    La clave incluye la versión de los datos, la URL completa (con query string)
+    y el tipo de contenido negociado. Con `solo_anonimos=True` las peticiones
+    autenticadas no usan la caché (p.ej. cuando la respuesta incluye datos del usuario).
+    `version(view, request, *args, **kwargs)` sustituye a la versión global de
+    los datos cuando la respuesta depende solo de una parte de ellos (si
+    devuelve None se usa la global).
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltorio(self, request, *args, **kwargs):
+            if solo_anonimos and request.user.is_authenticated:
+                return metodo(self, request, *args, **kwargs)
+
+            huella = hashlib.sha1(
+                f"{request.build_absolute_uri()}|{request.accepted_media_type}".encode('utf-8')
+            ).hexdigest()
+            actual = (version and version(self, request, *args, **kwargs)) or version_datos()
+            clave = f"gala:respuesta:{actual}:{huella}"
+            entrada = cache.get(clave)
+            if entrada is None:
+                response = self.finalize_response(request, metodo(self, request, *args, **kwargs), *args, **kwargs)
+                response.render()
+                if response.status_code != 200:
+                    return response
+                cuerpo = bytes(response.content)
+                entrada = {
+                    'status': response.status_code,
+                    'content_type': response['Content-Type'],
+                    'cabeceras': {c: response[c] for c in ('Vary', 'Allow') if response.has_header(c)},
+                    'cuerpo': cuerpo,
+                    'variantes': comprimir_variantes(cuerpo),
+                }
+                cache.set(clave, entrada, timeout=getattr(settings, 'CACHE_RESPUESTAS_SEGUNDOS', 3600))
+            return respuesta_desde_cache(entrada, request)
+        return envoltorio
+    return decorador
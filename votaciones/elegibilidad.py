@@ -0,0 +1,129 @@
+# gala_premios/votaciones/elegibilidad.py
+"""
+Elegibilidad de voto de cada usuario.
+
+Lo que necesita la admisión de un voto se calcula por usuario con dos
+consultas y se guarda en la caché:
+  - vinculados: {nominado_id: premio_id} de los nominados a los que está
+    vinculado (no puede votarlos en ninguna ronda).
+  - votos: {(premio_id, ronda): (nominados votados, posiciones usadas)}; las
+    posiciones son las de la Ronda 2 (oro, plata, bronce).
+
+VotarView y Voto.clean la consultan en lugar de preguntar a la base de datos
+por cada regla, y los listados de premios la devuelven por premio (campo
+'elegibilidad' de PremioSerializer), así el frontend sabe antes de enviar el
+voto qué nominados no puede votar y qué posiciones le quedan.
+
+La entrada de un usuario se borra cuando cambian sus votos o sus vínculos
+(signals.py); las operaciones masivas que no envían señales invalidan todas
+las entradas a la vez (generación). Con la caché en memoria de cada worker la
+invalidación no llegaría a los demás procesos, así que sin un backend
+compartido (ELEGIBILIDAD_CACHE) se recalcula en cada petición.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Nominado, Voto
+
+MAXIMO_VOTOS_RONDA = {1: 4, 2: 3}
+CLAVE_GENERACION = 'gala:elegibilidad:generacion'
+_VACIO = (frozenset(), frozenset())
+
+
+def _clave(generacion, usuario_id):
+    return f'gala:elegibilidad:{generacion}:{usuario_id}'
+
+
+def _generacion():
+    cache.add(CLAVE_GENERACION, 1, timeout=None)
+    return cache.get(CLAVE_GENERACION, 1)
+
+
+class Elegibilidad:
+    """Vínculos y votos emitidos de un usuario."""
+
+    def __init__(self, vinculados, votos):
+        self.vinculados = vinculados
+        self.votos = votos
+
+    @classmethod
+    def calcular(cls, usuario_id):
+        Vinculo = Nominado.usuarios_vinculados.through
+        vinculados = dict(
+            Vinculo.objects.filter(usuario_id=usuario_id).values_list('nominado_id', 'nominado__premio_id')
+        )
+        agrupados = {}
+        for premio_id, ronda, nominado_id, orden in Voto.objects.filter(usuario_id=usuario_id).values_list(
+            'premio_id', 'ronda', 'nominado_id', 'orden_ronda2'
+        ):
+            nominados, posiciones = agrupados.setdefault((premio_id, ronda), (set(), set()))
+            nominados.add(nominado_id)
+            if orden is not None:
+                posiciones.add(orden)
+        votos = {clave: (frozenset(n), frozenset(p)) for clave, (n, p) in agrupados.items()}
+        return cls(vinculados, votos)
+
+    def vinculado(self, nominado_id):
+        return nominado_id in self.vinculados
+
+    def votados(self, premio_id, ronda):
+        """Nominados que ya ha votado en ese premio y ronda."""
+        return self.votos.get((premio_id, ronda), _VACIO)[0]
+
+    def posiciones(self, premio_id, ronda=2):
+        """Posiciones (1, 2, 3) ya usadas en ese premio y ronda."""
+        return self.votos.get((premio_id, ronda), _VACIO)[1]
+
+    def ha_votado(self, premio_id, ronda):
+        return (premio_id, ronda) in self.votos
+
+    def restantes(self, premio_id, ronda):
+        return max(MAXIMO_VOTOS_RONDA.get(ronda, 0) - len(self.votados(premio_id, ronda)), 0)
+
+    def por_premio(self, premio_id, ronda):
+        """Resumen que se devuelve con cada premio para su ronda actual."""
+        return {
+            'ronda': ronda,
+            'nominados_vinculados': sorted(str(n) for n, p in self.vinculados.items() if p == premio_id),
+            'nominados_votados': sorted(str(n) for n in self.votados(premio_id, ronda)),
+            'posiciones_usadas': sorted(self.posiciones(premio_id, ronda)),
+            'votos_restantes': self.restantes(premio_id, ronda),
+        }
+
+
+def elegibilidad(usuario):
+    """Elegibilidad de `usuario` (instancia o id), desde la caché si está activada."""
+    usuario_id = getattr(usuario, 'pk', usuario)
+    if not settings.ELEGIBILIDAD_CACHE:
+        return Elegibilidad.calcular(usuario_id)
+    clave = _clave(_generacion(), usuario_id)
+    entrada = cache.get(clave)
+    if entrada is None:
+        entrada = Elegibilidad.calcular(usuario_id)
+        cache.set(clave, entrada, timeout=settings.ELEGIBILIDAD_CACHE_SEGUNDOS)
+    return entrada
+
+
+def invalidar_elegibilidad(usuarios=None):
+    """
+    Borra la elegibilidad de los `usuarios` (ids) o, sin ellos, la de todos.
+    Se repite al confirmar la transacción para que una lectura concurrente no
+    vuelva a guardar el estado anterior.
+    """
+    def invalidar():
+        if usuarios is None:
+            try:
+                cache.incr(CLAVE_GENERACION)
+            except ValueError:
+                cache.set(CLAVE_GENERACION, 2, timeout=None)
+        else:
+            generacion = _generacion()
+            cache.delete_many([_clave(generacion, pk) for pk in set(usuarios)])
+
+    if usuarios is not None:
+        usuarios = list(usuarios)
+        if not usuarios:
+            return
+    invalidar()
+    transaction.on_commit(invalidar)
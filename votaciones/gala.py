@@ -0,0 +1,309 @@
+# gala_premios/votaciones/gala.py
+"""
+Operaciones sobre el ciclo de vida de la gala (reinicio, retención de datos de
+auditoría, limpieza de sesiones y tokens y archivado de ediciones).
+
+Están pensadas para tablas de votos grandes: los premios se reinician con un
+único UPDATE y los votos se borran sin cargarlos en Python (TRUNCATE o DELETE
+directo), o por lotes con progreso cuando se quiere evitar bloqueos largos.
+
+Al archivar una edición, sus votos se resumen en PremioArchivado/NominadoArchivado
+y se eliminan, de modo que la tabla de votos solo contiene la edición en curso.
+"""
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .cache import invalidar_datos
+from .elegibilidad import invalidar_elegibilidad
+from .models import (
+    CLAVE_CACHE_EDICION, ConfiguracionSistema, Nominado, NominadoArchivado, Premio,
+    PremioArchivado, UsoToken, Voto,
+)
+from .puntuacion import Papeletas, clasificacion
+from .tareas import actualizar_progreso
+
+MODOS_BORRADO = ('auto', 'truncate', 'lotes')
+TAMANO_LOTE_BORRADO = 5000
+
+
+def reiniciar_fases():
+    """Devuelve todos los premios y la configuración a 'preparacion' (un UPDATE por tabla)."""
+    with transaction.atomic():
+        Premio.objects.update(
+            estado='preparacion',
+            ronda_actual=1,
+            ganador_oro=None,
+            ganador_plata=None,
+            ganador_bronce=None,
+            fecha_resultados_publicados=None,
+        )
+        config, _ = ConfiguracionSistema.objects.get_or_create()
+        config.fase_actual = 'preparacion'
+        config.save(update_fields=['fase_actual'])
+    # update() no envía señales: invalidamos la caché a mano
+    invalidar_datos()
+
+
+def _truncar_votos():
+    # Ninguna tabla referencia a Voto, así que TRUNCATE es seguro en PostgreSQL.
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE TABLE {connection.ops.quote_name(Voto._meta.db_table)}')
+
+
+def _borrar_por_lotes(tarea, pendientes, tamano_lote):
+    """
+    Borra las filas del queryset en transacciones cortas, informando del progreso.
+    Solo para tablas a las que no apunta ninguna FK (no se recolectan objetos relacionados).
+    """
+    modelo = pendientes.model
+    total = pendientes.count()
+    actualizar_progreso(tarea, 0, total=total)
+    borrados = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pendientes.order_by('pk').values_list('pk', flat=True)[:tamano_lote])
+            if not ids:
+                break
+            # _raw_delete: DELETE directo, sin recolectar objetos ni enviar señales
+            borrados += modelo._base_manager.filter(pk__in=ids)._raw_delete(modelo._base_manager.db)
+        actualizar_progreso(tarea, borrados)
+    return borrados
+
+
+def _borrar_votos_por_lotes(tarea, pendientes, tamano_lote):
+    """Borra los votos del queryset en transacciones cortas, informando del progreso."""
+    return _borrar_por_lotes(tarea, pendientes, tamano_lote)
+
+
+def borrar_votos(tarea=None, modo='auto', corte=None, tamano_lote=TAMANO_LOTE_BORRADO):
+    """
+    Borra los votos.
+    - 'truncate': TRUNCATE en PostgreSQL (instantáneo); en otros motores, un DELETE directo.
+    - 'lotes': DELETE por lotes de `tamano_lote` votos anteriores a `corte`.
+    - 'auto': 'truncate' en PostgreSQL y 'lotes' en el resto.
+    """
+    if modo not in MODOS_BORRADO:
+        raise ValueError(f"Modo de borrado no válido: '{modo}'")
+    if modo == 'auto':
+        modo = 'truncate' if connection.vendor == 'postgresql' else 'lotes'
+    corte = corte or timezone.now()
+
+    if modo == 'truncate':
+        if connection.vendor == 'postgresql':
+            _truncar_votos()
+            borrados = None
+        else:
+            borrados = Voto.objects.all()._raw_delete(Voto.objects.db)
+        actualizar_progreso(tarea, borrados or 0, total=borrados)
+    else:
+        borrados = _borrar_votos_por_lotes(tarea, Voto.objects.filter(fecha_voto__lte=corte), tamano_lote)
+
+    invalidar_datos()
+    invalidar_elegibilidad()
+    if borrados is None:
+        return "Votos eliminados (TRUNCATE)."
+    return f"{borrados} votos eliminados."
+
+
+def tarea_reset_gala(tarea, modo='auto', corte=None, tamano_lote=TAMANO_LOTE_BORRADO):
+    """Cuerpo de la tarea en segundo plano de reinicio de la gala."""
+    return borrar_votos(tarea, modo=modo, corte=corte, tamano_lote=tamano_lote)
+
+
+# --- Retención de datos de auditoría ---
+
+def purgar_auditoria(premios, tarea=None, tamano_lote=TAMANO_LOTE_BORRADO):
+    """
+    Anula la IP y el user agent de los votos de los premios dados, por lotes
+    y sin cargar los votos en Python. Devuelve el número de votos anonimizados.
+    """
+    pendientes = Voto.objects.filter(premio__in=premios).filter(
+        Q(ip_address__isnull=False) | Q(agente__isnull=False)
+    )
+    total = pendientes.count()
+    actualizar_progreso(tarea, 0, total=total)
+    procesados = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pendientes.order_by('pk').values_list('pk', flat=True)[:tamano_lote])
+            if not ids:
+                break
+            procesados += Voto.objects.filter(pk__in=ids).update(ip_address=None, agente=None)
+        actualizar_progreso(tarea, procesados)
+    return procesados
+
+
+# --- Sesiones caducadas y tokens sin uso ---
+
+def sesiones_caducadas(ahora=None):
+    return Session.objects.filter(expire_date__lt=ahora or timezone.now())
+
+
+def tokens_obsoletos(dias, ahora=None):
+    """
+    Tokens creados hace más de `dias` días que no se han usado (UsoToken) y
+    cuyo usuario no ha iniciado sesión desde entonces, y todos los de
+    usuarios desactivados.
+    """
+    corte = (ahora or timezone.now()) - timedelta(days=dias)
+    usado = Exists(UsoToken.objects.filter(clave=OuterRef('key'), ultimo_uso__gte=corte))
+    sin_uso = (
+        Q(created__lt=corte)
+        & (Q(user__last_login__isnull=True) | Q(user__last_login__lt=corte))
+        & ~Q(usado)
+    )
+    return Token.objects.filter(sin_uso | Q(user__is_active=False))
+
+
+def usos_huerfanos():
+    """Registros de uso de tokens que ya no existen."""
+    return UsoToken.objects.exclude(clave__in=Token.objects.values('key'))
+
+
+def limpiar_sesiones_y_tokens(dias_token, tarea=None, tamano_lote=TAMANO_LOTE_BORRADO):
+    """Borra por lotes las sesiones caducadas y los tokens obsoletos (con su uso). Devuelve (sesiones, tokens)."""
+    sesiones = _borrar_por_lotes(tarea, sesiones_caducadas(), tamano_lote)
+    tokens = _borrar_por_lotes(tarea, tokens_obsoletos(dias_token), tamano_lote)
+    _borrar_por_lotes(tarea, usos_huerfanos(), tamano_lote)
+    return sesiones, tokens
+
+
+# --- Archivado de ediciones ---
+
+def regenerar_ganadores_historicos(premio):
+    """
+    Reconstruye `premio.ganadores_historicos` a partir del archivo (ganador de oro
+    de cada edición archivada). Las entradas manuales de años que no están en el
+    archivo se conservan. Orden: del más reciente al más antiguo.
+    """
+    archivados = {
+        nominado.premio_archivado.edicion: nominado.nombre
+        for nominado in NominadoArchivado.objects.filter(
+            premio_archivado__premio=premio, posicion=1
+        ).select_related('premio_archivado')
+    }
+    historico = [
+        entrada for entrada in (premio.ganadores_historicos or [])
+        if isinstance(entrada, dict) and entrada.get('year') not in archivados
+    ]
+    historico += [{'year': anio, 'name': nombre} for anio, nombre in archivados.items()]
+    historico.sort(key=lambda entrada: entrada.get('year') or 0, reverse=True)
+    premio.ganadores_historicos = historico
+    premio.save(update_fields=['ganadores_historicos'])
+    return historico
+
+
+def _archivar_premio(premio, edicion):
+    """Crea el resumen archivado de un premio a partir de sus votos de la edición."""
+    votos = Voto.objects.filter(premio=premio, edicion=edicion)
+    votos_r1 = votos.filter(ronda=1)
+    votos_r2 = votos.filter(ronda=2, orden_ronda2__in=[1, 2, 3])
+
+    conteo_r1 = dict(votos_r1.values_list('nominado').annotate(total=Count('id')).order_by())
+    # Puntos de ronda 2 según el sistema de puntuación del premio
+    ranking_r2 = clasificacion(premio, 2, Papeletas.cargar(premio, 2, edicion=edicion))
+    puntos_r2 = {fila['id']: fila['puntos'] for fila in ranking_r2}
+
+    nominados = list(
+        Nominado.objects.filter(premio=premio, edicion=edicion).prefetch_related('usuarios_vinculados')
+    )
+    # Posiciones: las publicadas si existen; si no, por puntos de ronda 2
+    posiciones = {}
+    publicados = [premio.ganador_oro_id, premio.ganador_plata_id, premio.ganador_bronce_id]
+    if any(publicados):
+        posiciones = {pk: i for i, pk in enumerate(publicados, start=1) if pk}
+    elif ranking_r2:
+        posiciones = {fila['id']: i for i, fila in enumerate(ranking_r2[:3], start=1)}
+
+    archivo, _ = PremioArchivado.objects.update_or_create(
+        edicion=edicion,
+        premio_nombre=premio.nombre,
+        defaults={
+            'premio': premio,
+            'votantes_ronda1': votos_r1.values('usuario').distinct().count(),
+            'votantes_ronda2': votos_r2.values('usuario').distinct().count(),
+            'votos_ronda1': sum(conteo_r1.values()),
+            'votos_ronda2': votos_r2.count(),
+        },
+    )
+    archivo.nominados.all().delete()
+    NominadoArchivado.objects.bulk_create([
+        NominadoArchivado(
+            premio_archivado=archivo,
+            nombre=n.nombre,
+            usuarios=[u.username for u in n.usuarios_vinculados.all()],
+            votos_ronda1=conteo_r1.get(n.pk, 0),
+            puntos_ronda2=puntos_r2.get(n.pk, 0),
+            posicion=posiciones.get(n.pk),
+        )
+        for n in nominados
+    ])
+    return archivo
+
+
+def archivar_edicion(tarea=None, edicion=None, conservar_nominados=False, tamano_lote=TAMANO_LOTE_BORRADO):
+    """
+    Archiva una edición finalizada:
+      1. Guarda por premio los votantes, votos y puntos por nominado y el podio.
+      2. Regenera `ganadores_historicos` de cada premio desde el archivo.
+      3. Elimina los votos de la edición (por lotes) y sus nominados, salvo que se
+         pida conservarlos, en cuyo caso pasan a la edición siguiente.
+      4. Reinicia los premios y la configuración para la edición siguiente.
+    """
+    config, _ = ConfiguracionSistema.objects.get_or_create()
+    edicion = edicion or config.edicion_actual
+    siguiente = edicion + 1
+
+    premios = list(Premio.objects.filter(edicion=edicion).select_related('ganador_oro'))
+    with transaction.atomic():
+        for premio in premios:
+            _archivar_premio(premio, edicion)
+        for premio in premios:
+            regenerar_ganadores_historicos(premio)
+    actualizar_progreso(tarea, 0, mensaje=f"{len(premios)} premios archivados. Eliminando votos...")
+
+    borrados = _borrar_votos_por_lotes(tarea, Voto.objects.filter(edicion=edicion), tamano_lote)
+
+    with transaction.atomic():
+        nominados = Nominado.objects.filter(edicion=edicion)
+        if conservar_nominados:
+            nominados.update(edicion=siguiente)
+        else:
+            # Los ganadores apuntan a nominados que se van a borrar
+            Premio.objects.filter(edicion=edicion).update(
+                ganador_oro=None, ganador_plata=None, ganador_bronce=None
+            )
+            nominados.delete()
+        Premio.objects.filter(edicion=edicion).update(
+            edicion=siguiente,
+            estado='preparacion',
+            ronda_actual=1,
+            ganador_oro=None,
+            ganador_plata=None,
+            ganador_bronce=None,
+            fecha_inicio_ronda1=None,
+            fecha_fin_ronda1=None,
+            fecha_inicio_ronda2=None,
+            fecha_fin_ronda2=None,
+            fecha_resultados_publicados=None,
+        )
+        if config.edicion_actual <= edicion:
+            config.edicion_actual = siguiente
+            config.fase_actual = 'preparacion'
+            config.save(update_fields=['edicion_actual', 'fase_actual'])
+    cache.delete(CLAVE_CACHE_EDICION)
+    invalidar_datos()
+    invalidar_elegibilidad()
+    return f"Edición {edicion} archivada: {len(premios)} premios, {borrados} votos eliminados."
+
+
+def tarea_archivar_edicion(tarea, **kwargs):
+    """Cuerpo de la tarea en segundo plano de archivado de una edición."""
+    return archivar_edicion(tarea, **kwargs)
+
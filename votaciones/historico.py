@@ -0,0 +1,145 @@
+# gala_premios/votaciones/historico.py
+"""
+Salón de la fama: ganadores históricos normalizados.
+
+`Premio.ganadores_historicos` es una lista JSON libre ([{year, name}, ...])
+que se edita a mano o se regenera desde el archivo de ediciones. Cada entrada
+se replica como una fila de GanadorHistorico al guardar el premio (signals.py),
+de modo que "cuántas veces ha ganado X" o "quién ganó en 2023" se resuelven con
+consultas indexadas por nombre normalizado y año.
+
+En PostgreSQL la columna JSON tiene además un índice GIN (jsonb_path_ops,
+migración 0021) para las consultas de contención que se hacen directamente
+sobre el JSON (`premios_con_ganador_json`). `victorias` las usa para detectar
+premios cuyo JSON se ha cambiado sin pasar por save() (update(), SQL) y
+sincronizarlos antes de responder.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+
+from .models import GanadorHistorico, Premio
+from .similitud import normalizar
+
+LONGITUD_NOMBRE = GanadorHistorico._meta.get_field('nombre').max_length
+
+
+def _anio(valor):
+    try:
+        anio = int(valor)
+    except (TypeError, ValueError):
+        return None
+    return anio if 0 < anio < 32768 else None
+
+
+def entradas_historico(ganadores_historicos):
+    """Lista ordenada de (año, nombre) válidos de un `ganadores_historicos` (se ignoran entradas sin nombre)."""
+    entradas = []
+    for entrada in ganadores_historicos or []:
+        if not isinstance(entrada, dict):
+            continue
+        nombre = str(entrada.get('name') or '').strip()[:LONGITUD_NOMBRE]
+        if nombre:
+            entradas.append((_anio(entrada.get('year')), nombre))
+    return sorted(entradas, key=lambda e: (e[0] or 0, e[1]))
+
+
+def sincronizar_ganadores(premio):
+    """Reemplaza las filas de GanadorHistorico del premio si no coinciden con su JSON. Devuelve si cambió algo."""
+    esperadas = entradas_historico(premio.ganadores_historicos)
+    actuales = sorted(
+        GanadorHistorico.objects.filter(premio=premio).values_list('anio', 'nombre'),
+        key=lambda e: (e[0] or 0, e[1]),
+    )
+    if actuales == esperadas:
+        return False
+    with transaction.atomic():
+        GanadorHistorico.objects.filter(premio=premio).delete()
+        GanadorHistorico.objects.bulk_create([
+            GanadorHistorico(premio=premio, anio=anio, nombre=nombre, nombre_clave=normalizar(nombre))
+            for anio, nombre in esperadas
+        ])
+    return True
+
+
+def reconstruir_ganadores(tamano_lote=500):
+    """Sincroniza todos los premios (p.ej. tras cambios en el JSON hechos con update()). Devuelve los premios corregidos."""
+    corregidos = 0
+    for premio in Premio.objects.only('pk', 'ganadores_historicos').iterator(chunk_size=tamano_lote):
+        corregidos += sincronizar_ganadores(premio)
+    return corregidos
+
+
+def premios_con_ganador_json(nombre):
+    """
+    Ids de los premios cuyo JSON contiene exactamente `nombre` como ganador.
+    En PostgreSQL es una consulta de contención (@>) que usa el índice GIN; en
+    otros motores, que no admiten `contains` sobre JSON, se recorre en Python.
+    """
+    if connection.vendor == 'postgresql':
+        return set(
+            Premio.objects.filter(ganadores_historicos__contains=[{'name': nombre}]).values_list('pk', flat=True)
+        )
+    return {
+        pk for pk, historico in Premio.objects.values_list('pk', 'ganadores_historicos')
+        if any(n == nombre for _, n in entradas_historico(historico))
+    }
+
+
+def sincronizar_desfasados(nombre):
+    """
+    Sincroniza los premios cuyo JSON tiene a `nombre` (exacto) como ganador pero
+    que no tienen ninguna fila suya en la tabla. Devuelve cuántos se corrigieron.
+    """
+    en_tabla = set(
+        GanadorHistorico.objects.filter(nombre_clave=normalizar(nombre)).values_list('premio_id', flat=True)
+    )
+    desfasados = premios_con_ganador_json(nombre) - en_tabla
+    corregidos = 0
+    for premio in Premio.objects.filter(pk__in=desfasados).only('pk', 'ganadores_historicos'):
+        corregidos += sincronizar_ganadores(premio)
+    return corregidos
+
+
+def victorias(nombre):
+    """Victorias de un ganador (por nombre normalizado): [{premio, slug, anio, nombre}], de la más reciente a la más antigua."""
+    # Búsqueda exacta en el JSON (índice GIN): repara la tabla si el JSON cambió sin señales
+    sincronizar_desfasados(nombre)
+    filas = (
+        GanadorHistorico.objects.filter(nombre_clave=normalizar(nombre))
+        .order_by('-anio', 'premio__nombre')
+        .values('anio', 'nombre', 'premio__nombre', 'premio__slug')
+    )
+    return [
+        {'premio': f['premio__nombre'], 'slug': f['premio__slug'], 'anio': f['anio'], 'nombre': f['nombre']}
+        for f in filas
+    ]
+
+
+def salon_de_la_fama(limite=50):
+    """
+    Agregados del histórico: los `limite` ganadores con más victorias y el
+    número de ganadores y premios por año. Dos consultas GROUP BY.
+    """
+    por_nombre = (
+        GanadorHistorico.objects.values('nombre_clave')
+        .annotate(
+            nombre=Min('nombre'),
+            victorias=Count('id'),
+            premios=Count('premio', distinct=True),
+            primer_anio=Min('anio'),
+            ultimo_anio=Max('anio'),
+        )
+        .order_by('-victorias', 'nombre_clave')[:limite]
+    )
+    por_anio = (
+        GanadorHistorico.objects.filter(anio__isnull=False).values('anio')
+        .annotate(ganadores=Count('nombre_clave', distinct=True), premios=Count('premio', distinct=True))
+        .order_by('-anio')
+    )
+    return {
+        'por_nombre': [
+            {k: fila[k] for k in ('nombre', 'victorias', 'premios', 'primer_anio', 'ultimo_anio')}
+            for fila in por_nombre
+        ],
+        'por_anio': list(por_anio),
+    }
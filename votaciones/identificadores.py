@@ -0,0 +1,59 @@
+# gala_premios/votaciones/identificadores.py
+"""
+Generador de UUIDs ordenados por tiempo (formato UUIDv7, RFC 9562).
+
+Los 48 bits altos son el instante en milisegundos, así que los IDs nuevos se
+insertan siempre al final de los índices B-tree en lugar de en páginas
+aleatorias (como ocurre con uuid4). Siguen siendo UUIDs normales: conviven con
+los IDs uuid4 ya existentes y no cambia el tipo de columna.
+"""
+import os
+import threading
+import time
+import uuid
+
+_cerrojo = threading.Lock()
+_ultimo_ms = 0
+_contador = 0
+
+# rand_a (12 bits) se usa como contador dentro del mismo milisegundo
+_MAX_CONTADOR = 0xFFF
+
+
+def uuid7():
+    """
+    Devuelve un UUIDv7. Dentro de un mismo proceso los valores son estrictamente
+    crecientes aunque se generen varios en el mismo milisegundo.
+    """
+    global _ultimo_ms, _contador
+    with _cerrojo:
+        ms = time.time_ns() // 1_000_000
+        if ms > _ultimo_ms:
+            _ultimo_ms = ms
+            # Empieza en la mitad inferior para dejar margen al contador
+            _contador = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _contador += 1
+            if _contador > _MAX_CONTADOR:
+                # Contador agotado (o reloj hacia atrás): avanzamos el milisegundo
+                _ultimo_ms += 1
+                _contador = 0
+        ms, contador = _ultimo_ms, _contador
+
+    aleatorio = int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF
+    valor = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | contador << 64
+        | 0b10 << 62
+        | aleatorio
+    )
+    return uuid.UUID(int=valor)
+
+
+def instante_uuid7(valor):
+    """Milisegundos desde epoch codificados en un UUIDv7 (None si no es v7)."""
+    valor = valor if isinstance(valor, uuid.UUID) else uuid.UUID(str(valor))
+    if valor.version != 7:
+        return None
+    return valor.int >> 80
@@ -0,0 +1,233 @@
+# gala_premios/votaciones/importacion.py
+"""
+Importación masiva de nominados desde CSV o JSON.
+
+Las referencias se resuelven de una vez: todos los premios (por id, slug o
+nombre) con una consulta IN, todos los usuarios (por id o username) con otra y
+los nominados ya existentes (clave premio + nombre) con una tercera. Después se
+escribe todo dentro de una transacción con bulk_create/bulk_update y un único
+insert en la tabla intermedia de usuarios vinculados.
+
+Formato de cada fila (CSV con cabecera o lista JSON de objetos):
+    premio       id, slug o nombre del premio
+    nombre       nombre del nominado (único por premio)
+    descripcion  opcional
+    usuarios     ids o usernames; en CSV separados por ';'
+    activo       opcional (true/false, por defecto true)
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import invalidar_datos
+from .elegibilidad import invalidar_elegibilidad
+from .models import Nominado, Premio, Usuario
+
+FORMATOS_IMPORTACION = ('csv', 'json')
+MODOS_IMPORTACION = ('crear', 'upsert')
+SEPARADOR_USUARIOS = ';'
+# Sin codificación explícita se prueba UTF-8 (con o sin BOM) y después
+# Windows-1252, la que usa Excel al guardar CSV con tildes y eñes
+CODIFICACIONES_IMPORTACION = ('utf-8-sig', 'cp1252')
+LONGITUD_NOMBRE = Nominado._meta.get_field('nombre').max_length
+
+CREADO = 'creado'
+ACTUALIZADO = 'actualizado'
+YA_EXISTE = 'ya_existe'
+ERROR = 'error'
+
+
+class ErrorImportacion(ValueError):
+    """Datos de entrada que no se pueden interpretar (formato, columnas...)."""
+
+
+def _lista_usuarios(valor):
+    if valor in (None, ''):
+        return []
+    if isinstance(valor, str):
+        return [v.strip() for v in valor.split(SEPARADOR_USUARIOS) if v.strip()]
+    if isinstance(valor, list):
+        return [str(v).strip() for v in valor if str(v).strip()]
+    raise ErrorImportacion("'usuarios' debe ser una lista o un texto separado por ';'.")
+
+
+def _booleano(valor):
+    if valor in (None, ''):
+        return True
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
+def _decodificar(contenido, codificacion=None):
+    for candidata in (codificacion,) if codificacion else CODIFICACIONES_IMPORTACION:
+        try:
+            return contenido.decode(candidata)
+        except LookupError:
+            raise ErrorImportacion(f"Codificación desconocida: '{candidata}'.")
+        except UnicodeDecodeError:
+            continue
+    probadas = codificacion or ', '.join(CODIFICACIONES_IMPORTACION)
+    raise ErrorImportacion(f"No se puede leer el fichero como texto ({probadas}). Indica su codificación.")
+
+
+def leer_filas(contenido, formato, codificacion=None):
+    """Convierte el contenido CSV/JSON (texto o bytes) en una lista de dicts."""
+    if formato not in FORMATOS_IMPORTACION:
+        raise ErrorImportacion(f"Formato no válido: '{formato}'. Usa csv o json.")
+    if isinstance(contenido, bytes):
+        contenido = _decodificar(contenido, codificacion)
+    if formato == 'csv':
+        lector = csv.DictReader(io.StringIO(contenido))
+        if not lector.fieldnames or not {'premio', 'nombre'} <= set(lector.fieldnames):
+            raise ErrorImportacion("El CSV debe tener cabecera con al menos las columnas 'premio' y 'nombre'.")
+        return list(lector)
+    try:
+        datos = json.loads(contenido)
+    except ValueError as e:
+        raise ErrorImportacion(f"JSON no válido: {e}")
+    if isinstance(datos, dict):
+        datos = datos.get('nominados')
+    if not isinstance(datos, list):
+        raise ErrorImportacion("El JSON debe ser una lista de nominados o {\"nominados\": [...]}.")
+    return datos
+
+
+def _como_uuid(valor):
+    try:
+        return uuid.UUID(str(valor))
+    except ValueError:
+        return None
+
+
+def _resolver(modelo, referencias, campos_texto):
+    """{referencia: objeto} buscando por pk y por los campos de texto con una sola consulta."""
+    if not referencias:
+        return {}
+    uuids = {r: u for r in referencias if (u := _como_uuid(r)) is not None}
+    filtro = Q(pk__in=uuids.values())
+    for campo in campos_texto:
+        filtro |= Q(**{f'{campo}__in': referencias})
+    por_clave = {}
+    for objeto in modelo.objects.filter(filtro):
+        por_clave[str(objeto.pk)] = objeto
+        for campo in campos_texto:
+            por_clave.setdefault(getattr(objeto, campo), objeto)
+    return {r: por_clave.get(str(uuids[r]) if r in uuids else r) for r in referencias}
+
+
+def importar_nominados(filas, modo='crear', estricto=False, simular=False):
+    """
+    Crea (o, con modo='upsert', actualiza) los nominados de `filas`.
+
+    - modo='crear': los que ya existen (mismo premio y nombre) se omiten como 'ya_existe'.
+    - modo='upsert': los existentes actualizan descripción, activo y usuarios vinculados.
+    - estricto=True: si alguna fila tiene errores no se escribe nada.
+    - simular=True: valida y devuelve el resultado sin escribir.
+    """
+    if modo not in MODOS_IMPORTACION:
+        raise ErrorImportacion(f"Modo no válido: '{modo}'. Usa crear o upsert.")
+
+    resultados, preparadas = [], []
+    for numero, fila in enumerate(filas, start=1):
+        resultado = {'fila': numero, 'estado': None}
+        resultados.append(resultado)
+        if not isinstance(fila, dict):
+            resultado.update(estado=ERROR, error='La fila debe ser un objeto.')
+            continue
+        nombre = str(fila.get('nombre') or '').strip()
+        premio = str(fila.get('premio') or '').strip()
+        resultado['nombre'] = nombre
+        try:
+            usuarios = _lista_usuarios(fila.get('usuarios'))
+        except ErrorImportacion as e:
+            resultado.update(estado=ERROR, error=str(e))
+            continue
+        if not nombre or not premio:
+            resultado.update(estado=ERROR, error="'premio' y 'nombre' son obligatorios.")
+        elif len(nombre) > LONGITUD_NOMBRE:
+            resultado.update(estado=ERROR, error=f"El nombre supera {LONGITUD_NOMBRE} caracteres.")
+        else:
+            preparadas.append((resultado, premio, nombre, usuarios, fila))
+
+    # Una consulta por tipo de referencia
+    premios = _resolver(Premio, {p for _, p, _, _, _ in preparadas}, ('slug', 'nombre'))
+    usuarios = _resolver(Usuario, {u for _, _, _, lista, _ in preparadas for u in lista}, ('username',))
+    claves = {(premios[p].pk, n) for _, p, n, _, _ in preparadas if premios.get(p)}
+    existentes = {}
+    if claves:
+        candidatos = Nominado.objects.filter(
+            premio_id__in={p for p, _ in claves}, nombre__in={n for _, n in claves}
+        )
+        existentes = {(n.premio_id, n.nombre): n for n in candidatos if (n.premio_id, n.nombre) in claves}
+
+    nuevos, actualizados, vinculos, vistos = [], [], {}, set()
+    for resultado, ref_premio, nombre, refs_usuarios, fila in preparadas:
+        premio = premios.get(ref_premio)
+        if premio is None:
+            resultado.update(estado=ERROR, error=f"Premio no encontrado: '{ref_premio}'.")
+            continue
+        faltan = [u for u in refs_usuarios if usuarios.get(u) is None]
+        if faltan:
+            resultado.update(estado=ERROR, error=f"Usuarios no encontrados: {', '.join(faltan)}.")
+            continue
+        clave = (premio.pk, nombre)
+        if clave in vistos:
+            resultado.update(estado=ERROR, error='Nominado repetido en el fichero.')
+            continue
+        vistos.add(clave)
+
+        descripcion = fila.get('descripcion') or None
+        activo = _booleano(fila.get('activo'))
+        nominado = existentes.get(clave)
+        if nominado is None:
+            nominado = Nominado(premio=premio, nombre=nombre, descripcion=descripcion, activo=activo)
+            nuevos.append(nominado)
+            resultado['estado'] = CREADO
+        elif modo == 'upsert':
+            nominado.descripcion, nominado.activo = descripcion, activo
+            actualizados.append(nominado)
+            resultado['estado'] = ACTUALIZADO
+        else:
+            resultado.update(estado=YA_EXISTE, id=str(nominado.pk))
+            continue
+        resultado['id'] = str(nominado.pk)
+        vinculos[nominado.pk] = {usuarios[u].pk for u in refs_usuarios}
+
+    errores = sum(1 for r in resultados if r['estado'] == ERROR)
+    escribir = not simular and not (estricto and errores)
+    if escribir and (nuevos or actualizados):
+        _guardar(nuevos, actualizados, vinculos)
+        invalidar_datos(premios={n.premio_id for n in nuevos + actualizados})
+    return {
+        # Con simular/estricto los contadores indican lo que se habría guardado
+        'creados': len(nuevos),
+        'actualizados': len(actualizados),
+        'errores': errores,
+        'aplicado': escribir,
+        'resultados': resultados,
+    }
+
+
+def _guardar(nuevos, actualizados, vinculos):
+    Vinculo = Nominado.usuarios_vinculados.through
+    with transaction.atomic():
+        Nominado.objects.bulk_create(nuevos, batch_size=500)
+        if actualizados:
+            Nominado.objects.bulk_update(actualizados, ['descripcion', 'activo'], batch_size=500)
+            # En upsert los vínculos pasan a ser exactamente los del fichero
+            Vinculo.objects.filter(nominado_id__in=[n.pk for n in actualizados]).delete()
+        Vinculo.objects.bulk_create(
+            [
+                Vinculo(nominado_id=nominado_id, usuario_id=usuario_id)
+                for nominado_id, usuarios in vinculos.items()
+                for usuario_id in usuarios
+            ],
+            batch_size=1000,
+        )
+    # Con upsert se han quitado vínculos de usuarios que no conocemos: se invalida a todos
+    invalidar_elegibilidad(None if actualizados else {u for usuarios in vinculos.values() for u in usuarios})
@@ -0,0 +1,276 @@
+# gala_premios/votaciones/lectura.py
+"""
+Serialización rápida (solo lectura) para los GET más usados.
+
+En lugar de instanciar modelos y recorrer los campos de un ModelSerializer por
+cada objeto, se leen las columnas con `values()` y se construyen los dicts a
+mano. El orden de los campos, los campos incluidos (?fields= / ?expand=) y la
+representación de fechas e imágenes se toman del serializer original, de modo
+que el JSON resultante es idéntico al de PremioSerializer,
+ResultadosPremioSerializer y UsuarioSerializer. La paridad se comprueba en
+votaciones/tests.py y la mejora con `python manage.py benchmark serializers`.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from types import SimpleNamespace
+
+from django.db.models import Count, F
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from .elegibilidad import elegibilidad
+from .models import Nominado, Voto
+from .serializers import NominadoSerializer, PremioSerializer, ResultadosPremioSerializer, UsuarioSerializer
+
+# Campos cuya representación es el propio valor leído de la base de datos
+_IDENTIDAD = (
+    serializers.CharField, serializers.BooleanField, serializers.IntegerField,
+    serializers.ChoiceField, serializers.JSONField, serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+# Campos que se delegan en su to_representation (zona horaria, formatos...)
+_DELEGADOS = (
+    serializers.DateTimeField, serializers.DateField, serializers.TimeField,
+    serializers.DecimalField, serializers.FloatField,
+)
+
+_ORIGEN = 'lectura_origen'
+
+
+def _conversor(campo):
+    """Función valor -> representación, o None si el valor se devuelve tal cual."""
+    if isinstance(campo, serializers.UUIDField):
+        return str if campo.uuid_format == 'hex_verbose' else campo.to_representation
+    if isinstance(campo, _IDENTIDAD):
+        return None
+    if isinstance(campo, _DELEGADOS):
+        return campo.to_representation
+    raise TypeError(f"Campo no soportado en la lectura rápida: {campo.field_name} ({type(campo).__name__})")
+
+
+def _fichero(nombre, campo_modelo, usar_url, request):
+    """Igual que FileField.to_representation de DRF a partir del nombre guardado en la columna."""
+    if not nombre:
+        return None
+    if not usar_url:
+        return nombre
+    url = campo_modelo.attr_class(None, campo_modelo, nombre).url
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class Plan:
+    """
+    Pasos para representar las filas de `values()` igual que `serializer`.
+
+    Cada paso es (nombre, tipo, clave, auxiliar):
+      - 'valor':  columna `clave`, convertida con `auxiliar` (o tal cual).
+      - 'fichero': columna `clave` con el nombre de un fichero; se devuelve su URL.
+      - 'lista':  relación `clave` serializada con el Plan `auxiliar`.
+      - 'ids':    relación `clave` devuelta como lista de IDs.
+      - 'objeto': FK `clave` serializada con el Plan `auxiliar` (o None).
+      - 'metodo': valor calculado por quien llama (SerializerMethodField).
+    """
+
+    def __init__(self, serializer):
+        self.modelo = serializer.Meta.model
+        self.pk = self.modelo._meta.pk.attname
+        self.columnas = [self.pk]
+        self.pasos = []
+        for campo in serializer._readable_fields:
+            nombre = campo.field_name
+            if isinstance(campo, serializers.SerializerMethodField):
+                self.pasos.append((nombre, 'metodo', nombre, None))
+            elif isinstance(campo, serializers.ListSerializer):
+                self.pasos.append((nombre, 'lista', campo.source, Plan(campo.child)))
+            elif isinstance(campo, serializers.ManyRelatedField):
+                self.pasos.append((nombre, 'ids', campo.source, None))
+            elif isinstance(campo, serializers.BaseSerializer):
+                self.pasos.append((nombre, 'objeto', self._columna(campo.source), Plan(campo)))
+            elif isinstance(campo, serializers.FileField):
+                # La URL depende de la request, así que se resuelve al representar
+                usar_url = getattr(campo, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+                auxiliar = (self.modelo._meta.get_field(campo.source), usar_url)
+                self.pasos.append((nombre, 'fichero', self._columna(campo.source), auxiliar))
+            else:
+                self.pasos.append((nombre, 'valor', self._columna(campo.source), _conversor(campo)))
+
+    def _columna(self, source):
+        columna = self.modelo._meta.get_field(source).attname
+        if columna not in self.columnas:
+            self.columnas.append(columna)
+        return columna
+
+    def _relacion(self, source):
+        """Modelo relacionado y lookup inverso de una relación M2M directa o FK inversa."""
+        campo = self.modelo._meta.get_field(source)
+        if campo.many_to_many and not campo.auto_created:
+            return campo.related_model, campo.related_query_name()
+        if campo.one_to_many:
+            return campo.related_model, campo.field.name
+        raise TypeError(f"Relación no soportada en la lectura rápida: {source}")
+
+    def _cargar_relacion(self, tipo, source, plan, ids, request):
+        """{id origen: [datos o ids]} con el orden de la precarga de Django (ordering del modelo)."""
+        modelo, lookup = self._relacion(source)
+        relacionados = modelo._default_manager.filter(**{f'{lookup}__in': ids})
+        agrupados = defaultdict(list)
+        if tipo == 'ids':
+            for origen, pk in relacionados.values_list(lookup, modelo._meta.pk.attname):
+                agrupados[origen].append(pk)
+            return agrupados
+        filas = list(relacionados.values(*plan.columnas, **{_ORIGEN: F(lookup)}))
+        for fila, datos in zip(filas, plan.representar(filas, request=request)):
+            agrupados[fila[_ORIGEN]].append(datos)
+        return agrupados
+
+    def representar(self, filas, metodos=None, request=None):
+        """
+        Lista de dicts serializados para `filas` (dicts con al menos `self.columnas`).
+        `request` hace el papel del contexto del serializer (URLs absolutas de ficheros).
+        """
+        relaciones = {}
+        ids = [fila[self.pk] for fila in filas]
+        for nombre, tipo, clave, plan in self.pasos:
+            if tipo in ('lista', 'ids'):
+                relaciones[nombre] = self._cargar_relacion(tipo, clave, plan, ids, request) if ids else {}
+            elif tipo == 'objeto':
+                pks = {fila[clave] for fila in filas if fila[clave] is not None}
+                relaciones[nombre] = plan.por_id(pks, request=request)
+
+        resultado = []
+        for fila in filas:
+            datos = {}
+            for nombre, tipo, clave, auxiliar in self.pasos:
+                if tipo == 'valor':
+                    valor = fila[clave]
+                    datos[nombre] = valor if valor is None or auxiliar is None else auxiliar(valor)
+                elif tipo == 'fichero':
+                    datos[nombre] = _fichero(fila[clave], *auxiliar, request)
+                elif tipo in ('lista', 'ids'):
+                    datos[nombre] = relaciones[nombre].get(fila[self.pk], [])
+                elif tipo == 'objeto':
+                    datos[nombre] = relaciones[nombre].get(fila[clave])
+                else:
+                    datos[nombre] = metodos[nombre](fila)
+            resultado.append(datos)
+        return resultado
+
+    def por_id(self, ids, request=None):
+        """{pk: datos} para los objetos indicados."""
+        if not ids:
+            return {}
+        filas = list(self.modelo._default_manager.filter(pk__in=ids).values(*self.columnas))
+        return {fila[self.pk]: datos for fila, datos in zip(filas, self.representar(filas, request=request))}
+
+
+# Los planes no dependen de la request: se construyen una vez por combinación de opciones
+@lru_cache(maxsize=64)
+def _plan_premios(campos, expand):
+    consulta = SimpleNamespace(query_params={})
+    serializer = PremioSerializer(context={'request': consulta}, expand=expand)
+    if campos is not None:
+        for nombre in list(serializer.fields):
+            if nombre not in campos:
+                serializer.fields.pop(nombre)
+    return serializer, Plan(serializer)
+
+
+@lru_cache(maxsize=None)
+def _plan_nominados(expandir_usuarios):
+    return Plan(NominadoSerializer(expandir_usuarios=expandir_usuarios))
+
+
+@lru_cache(maxsize=None)
+def _plan(clase_serializer):
+    return Plan(clase_serializer())
+
+
+# --- Premios (ListaPremiosView / ListaTodosPremiosView) ---
+
+def _top_ronda1(premio_ids):
+    """{premio_id: [ids de los 4 nominados más votados en ronda 1]} con una sola consulta."""
+    top = defaultdict(list)
+    filas = (
+        Voto.objects.filter(premio_id__in=premio_ids, ronda=1)
+        .values('premio', 'nominado')
+        .annotate(total=Count('id'))
+        .order_by('premio', '-total', 'nominado__nombre')
+        .values_list('premio', 'nominado')
+    )
+    for premio_id, nominado_id in filas:
+        if len(top[premio_id]) < 4:
+            top[premio_id].append(nominado_id)
+    return top
+
+
+def leer_premios(queryset, request):
+    """Equivale a `PremioSerializer(queryset, many=True, context={'request': request}).data`."""
+    campos, expand = PremioSerializer.opciones_respuesta(request)
+    serializer, plan = _plan_premios(
+        frozenset(campos) if campos is not None else None, frozenset(expand)
+    )
+    metodos = {}
+    filas = list(queryset.values(*plan.columnas, 'estado', 'ronda_actual', 'ganador_oro_id'))
+    premio_ids = [fila['id'] for fila in filas]
+
+    if {'ya_votado_por_usuario', 'elegibilidad'} & set(serializer.fields):
+        datos = None
+        if request is not None and request.user.is_authenticated and premio_ids:
+            datos = elegibilidad(request.user)
+        metodos['ya_votado_por_usuario'] = lambda fila: datos is not None and datos.ha_votado(fila['id'], fila['ronda_actual'])
+        metodos['elegibilidad'] = lambda fila: datos.por_premio(fila['id'], fila['ronda_actual']) if datos is not None else None
+
+    if 'nominados_visible' in serializer.fields:
+        metodos['nominados_visible'] = _nominados_visibles(serializer, filas)
+
+    return plan.representar(filas, metodos, request=request)
+
+
+def _nominados_visibles(serializer, filas):
+    """
+    Misma lógica que PremioSerializer.get_nominados_visible, resuelta con una
+    consulta por tipo de dato en lugar de una por premio. Los nominados se
+    serializan sin contexto, como en el serializer original.
+    """
+    ganador = lambda fila: fila['estado'] == 'finalizado' and fila['ganador_oro_id'] is not None
+    en_ronda2 = [fila['id'] for fila in filas if not ganador(fila) and fila['estado'] == 'votacion_2']
+    resto = [fila['id'] for fila in filas if not ganador(fila) and fila['estado'] != 'votacion_2']
+    top = _top_ronda1(en_ronda2) if en_ronda2 else {}
+
+    # Nominados de cada premio (orden del Meta) y los que no pertenecen a ese listado
+    por_premio = defaultdict(list)
+    for premio_id, nominado_id in Nominado.objects.filter(premio_id__in=resto).values_list('premio_id', 'id'):
+        por_premio[premio_id].append(nominado_id)
+    sueltos = {fila['ganador_oro_id'] for fila in filas if ganador(fila)}
+    for ids in top.values():
+        sueltos.update(ids)
+    necesarios = sueltos.union(*por_premio.values())
+
+    if serializer.expandir_nominados:
+        datos = _plan_nominados(serializer.expandir_usuarios).por_id(necesarios)
+    else:
+        datos = {pk: pk for pk in necesarios}
+
+    def visibles(fila):
+        if ganador(fila):
+            ids = [fila['ganador_oro_id']]
+        elif fila['estado'] == 'votacion_2':
+            ids = top.get(fila['id'], [])
+        else:
+            ids = por_premio.get(fila['id'], [])
+        return [datos[pk] for pk in ids if pk in datos]
+    return visibles
+
+
+# --- Resultados públicos y participantes ---
+
+def leer_resultados(queryset):
+    """Equivale a `ResultadosPremioSerializer(queryset, many=True).data`."""
+    plan = _plan(ResultadosPremioSerializer)
+    return plan.representar(list(queryset.values(*plan.columnas)))
+
+
+def leer_usuarios(queryset):
+    """Equivale a `UsuarioSerializer(queryset, many=True).data`."""
+    plan = _plan(UsuarioSerializer)
+    return plan.representar(list(queryset.values(*plan.columnas)))
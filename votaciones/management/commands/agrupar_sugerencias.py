@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.similitud import reagrupar_todas
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute MinHash signatures and near-duplicate groups for all suggestions "
+        "(use after upgrading or after bulk inserts that skip signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be a positive integer.")
+        procesadas = reagrupar_todas(tamano_lote=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{procesadas} suggestions grouped."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.gala import TAMANO_LOTE_BORRADO, archivar_edicion
+from votaciones.models import ConfiguracionSistema, Premio
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive a finished gala edition: store per-premio aggregates and podiums, rebuild "
+        "ganadores_historicos, delete the edition's votes and move premios to the next edition."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edicion", type=int, help="Edition (year) to archive. Defaults to the current one.")
+        parser.add_argument(
+            "--conservar-nominados", action="store_true",
+            help="Keep the nominees and move them to the next edition instead of deleting them.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE_BORRADO)
+        parser.add_argument("--force", action="store_true", help="Archive even if some premios are still open for voting.")
+
+    def handle(self, *args, **options):
+        config, _ = ConfiguracionSistema.objects.get_or_create()
+        edicion = options["edicion"] or config.edicion_actual
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be a positive integer.")
+        abiertos = Premio.objects.filter(edicion=edicion, estado__in=["votacion_1", "votacion_2"]).count()
+        if abiertos and not options["force"]:
+            raise CommandError(f"{abiertos} premios of edition {edicion} are still open for voting (use --force).")
+
+        mensaje = archivar_edicion(
+            edicion=edicion,
+            conservar_nominados=options["conservar_nominados"],
+            tamano_lote=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(mensaje))
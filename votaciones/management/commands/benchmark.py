@@ -0,0 +1,275 @@
+import gzip
+import inspect
+import random
+import time
+
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from votaciones.models import Nominado, Premio, Usuario, Voto
+
+
+class _Rollback(Exception):
+    pass
+
+
+def crear_datos_realistas(n_usuarios=18, n_premios=25, n_nominados=6, semilla=2025):
+    """
+    Crea un conjunto de datos con la forma de una gala real: participantes
+    verificados con bio y email, premios con varios nominados vinculados a
+    1-2 usuarios y votos de todos los participantes. Un tercio de los premios
+    queda finalizado (con ganadores), otro tercio en ronda 2 y el resto en ronda 1.
+    """
+    rng = random.Random(semilla)
+    prefijo = f"bench{rng.randrange(16 ** 6):06x}"
+    usuarios = [
+        Usuario.objects.create_user(
+            username=f"{prefijo}-participante{i}",
+            email=f"{prefijo}-participante{i}@example.com",
+            password="bench",
+            first_name=f"Nombre{i}",
+            last_name=f"Apellido{i}",
+            descripcion="Participante habitual de la gala. " * 4,
+            foto_url=f"https://res.cloudinary.com/demo/image/upload/participante{i}.jpg",
+            verificado=True,
+        )
+        for i in range(n_usuarios)
+    ]
+    premios = []
+    for p in range(n_premios):
+        premio = Premio.objects.create(
+            nombre=f"{prefijo} Premio {p}",
+            slug=f"{prefijo}-premio-{p}",
+            descripcion="Descripción del premio para la gala de este año.",
+            estado="votacion_1",
+            ronda_actual=1,
+            ganadores_historicos=[{"year": 2023, "name": "Alguien"}, {"year": 2024, "name": "Otro"}],
+        )
+        nominados = []
+        for n in range(n_nominados):
+            nominado = Nominado.objects.create(premio=premio, nombre=f"Nominado {p}-{n}", descripcion="Motivo de la nominación.")
+            nominado.usuarios_vinculados.add(*rng.sample(usuarios, rng.choice([1, 1, 2])))
+            nominados.append(nominado)
+        votos = []
+        recuento = {n.pk: 0 for n in nominados}
+        for usuario in usuarios:
+            for nominado in rng.sample(nominados, 4):
+                votos.append(Voto(usuario=usuario, premio=premio, nominado=nominado, ronda=1))
+                recuento[nominado.pk] += 1
+
+        if p < 2 * n_premios // 3:
+            # Ronda 2 entre los 4 más votados de la ronda 1
+            finalistas = sorted(nominados, key=lambda n: (-recuento[n.pk], n.nombre))[:4]
+            puntos = {n.pk: 0 for n in finalistas}
+            for usuario in usuarios:
+                for orden, nominado in enumerate(rng.sample(finalistas, 3), start=1):
+                    votos.append(Voto(usuario=usuario, premio=premio, nominado=nominado, ronda=2, orden_ronda2=orden))
+                    puntos[nominado.pk] += 4 - orden
+            premio.estado, premio.ronda_actual = "votacion_2", 2
+            if p < n_premios // 3:
+                podio = sorted(finalistas, key=lambda n: (-puntos[n.pk], n.nombre))
+                premio.ganador_oro, premio.ganador_plata, premio.ganador_bronce = podio[:3]
+                premio.estado = "finalizado"
+                premio.fecha_resultados_publicados = timezone.now()
+            premio.save()
+        Voto.objects.bulk_create(votos)
+        premios.append(premio)
+    # Los datos previos quedan fuera de las mediciones (todo se revierte al final)
+    Premio.objects.exclude(pk__in=[p.pk for p in premios]).update(activo=False)
+    Usuario.objects.exclude(pk__in=[u.pk for u in usuarios]).update(verificado=False)
+    return usuarios, premios
+
+
+class Command(BaseCommand):
+    help = "Run performance benchmarks on a realistic synthetic dataset created inside a rolled-back transaction."
+
+    escenarios = ("payload", "renderers", "serializers", "uuid")
+    # Escenarios que trabajan con sus propias tablas y no necesitan el conjunto de datos
+    escenarios_sin_datos = ("uuid",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("escenario", choices=self.escenarios)
+        parser.add_argument("--usuarios", type=int, default=18)
+        parser.add_argument("--premios", type=int, default=25)
+        parser.add_argument("--nominados", type=int, default=6)
+        parser.add_argument("--repeticiones", type=int, default=20)
+        parser.add_argument("--filas", type=int, default=1_000_000, help="Rows inserted by the uuid scenario.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options["escenario"] not in self.escenarios_sin_datos:
+                    crear_datos_realistas(options["usuarios"], options["premios"], options["nominados"])
+                getattr(self, f"bench_{options['escenario']}")(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _peticion(self, ruta):
+        return APIRequestFactory().get(ruta, HTTP_HOST="localhost")
+
+    def _datos(self, clase_vista, peticion):
+        """Ejecuta el GET de la vista sin pasar por la caché de respuestas y devuelve response.data."""
+        vista = clase_vista()
+        vista.args, vista.kwargs, vista.format_kwarg = (), {}, None
+        request = vista.initialize_request(peticion)
+        vista.request = request
+        vista.initial(request)
+        return inspect.unwrap(clase_vista.get)(vista, request).data
+
+    def _medir(self, funcion, repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            resultado = funcion()
+        return (time.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+    def bench_payload(self, options):
+        """Tamaño del listado de premios en formato normal frente al compacto (?formato=compacto)."""
+        from votaciones.views import ListaTodosPremiosView
+
+        renderer = JSONRenderer()
+
+        self.stdout.write(f"{'format':<12}{'bytes':>10}{'gzip':>10}{'ms/req':>10}")
+        for etiqueta, ruta in (("normal", "/api/premios-todos/"), ("compacto", "/api/premios-todos/?formato=compacto")):
+            ms, datos = self._medir(lambda: self._datos(ListaTodosPremiosView, self._peticion(ruta)), options["repeticiones"])
+            cuerpo = renderer.render(datos)
+            self.stdout.write(f"{etiqueta:<12}{len(cuerpo):>10}{len(gzip.compress(cuerpo)):>10}{ms:>10.2f}")
+
+    def bench_renderers(self, options):
+        """Tiempo de render de los payloads de premios y resultados con cada renderer."""
+        from rest_framework.test import force_authenticate
+
+        from votaciones.lectura import leer_resultados
+        from votaciones.publicacion import premios_publicados
+        from votaciones.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+        from votaciones.views import ListaTodosPremiosView, ResultadosView
+
+        admin = Usuario(username="bench-admin", is_staff=True, is_superuser=True)
+        peticion_admin = self._peticion("/api/resultados/")
+        force_authenticate(peticion_admin, user=admin)
+        payloads = {
+            "premios": self._datos(ListaTodosPremiosView, self._peticion("/api/premios-todos/")),
+            "resultados": self._datos(ResultadosView, peticion_admin),
+            # La vista sirve el JSON ya publicado (publicacion.py): se mide el documento que se renderiza al publicar
+            "resultados-publicos": leer_resultados(premios_publicados()),
+        }
+        renderers = [("drf-json", JSONRenderer())]
+        if orjson is not None:
+            renderers.append(("orjson", ORJSONRenderer()))
+        if msgpack is not None:
+            renderers.append(("msgpack", MessagePackRenderer()))
+
+        self.stdout.write(f"{'payload':<22}{'renderer':<12}{'bytes':>10}{'ms/render':>12}{'same-json':>11}")
+        for nombre, datos in payloads.items():
+            referencia = JSONRenderer().render(datos)
+            for etiqueta, renderer in renderers:
+                ms, cuerpo = self._medir(lambda: renderer.render(datos, "application/json"), options["repeticiones"])
+                igual = "-" if etiqueta == "msgpack" else ("yes" if cuerpo == referencia else "NO")
+                self.stdout.write(f"{nombre:<22}{etiqueta:<12}{len(cuerpo):>10}{ms:>12.3f}{igual:>11}")
+
+    def bench_serializers(self, options):
+        """
+        Lectura rápida (votaciones/lectura.py) frente a los serializers de DRF:
+        tiempo de cada uno. La paridad del JSON se comprueba en votaciones/tests.py.
+        """
+        from rest_framework.test import force_authenticate
+        from rest_framework.views import APIView
+
+        from votaciones.lectura import leer_premios, leer_resultados, leer_usuarios
+        from votaciones.serializers import PremioSerializer, ResultadosPremioSerializer, UsuarioSerializer
+
+        votante = Usuario.objects.filter(verificado=True).order_by("username").first()
+
+        def request(ruta, usuario=None):
+            peticion = self._peticion(ruta)
+            if usuario is not None:
+                force_authenticate(peticion, user=usuario)
+            vista = APIView()
+            vista.permission_classes = []
+            request = vista.initialize_request(peticion)
+            vista.initial(request)
+            return request
+
+        premios = Premio.objects.filter(activo=True).order_by("nombre")
+        publicados = Premio.objects.filter(estado="finalizado", fecha_resultados_publicados__isnull=False).order_by("nombre")
+        participantes = Usuario.objects.filter(verificado=True).order_by("username")
+        casos = []
+        for etiqueta, ruta, usuario in (
+            ("premios", "/api/premios-todos/", None),
+            ("premios (auth)", "/api/premios-todos/", votante),
+            ("premios ?expand=", "/api/premios-todos/?expand=", votante),
+            ("premios ?fields=", "/api/premios-todos/?fields=id,nombre,nominados_visible", None),
+        ):
+            r = request(ruta, usuario)
+            casos.append((
+                etiqueta,
+                lambda r=r: PremioSerializer(PremioSerializer.preparar_queryset(premios, r), many=True, context={"request": r}).data,
+                lambda r=r: leer_premios(premios, r),
+            ))
+        casos.append(("resultados-publicos", lambda: ResultadosPremioSerializer(publicados, many=True).data, lambda: leer_resultados(publicados)))
+        casos.append(("participantes", lambda: UsuarioSerializer(participantes, many=True).data, lambda: leer_usuarios(participantes)))
+
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'payload':<22}{'bytes':>10}{'drf ms':>10}{'fast ms':>10}{'speedup':>9}")
+        for etiqueta, drf, rapido in casos:
+            ms_drf, datos_drf = self._medir(drf, options["repeticiones"])
+            ms_rapido, _ = self._medir(rapido, options["repeticiones"])
+            self.stdout.write(
+                f"{etiqueta:<22}{len(renderer.render(datos_drf)):>10}{ms_drf:>10.2f}{ms_rapido:>10.2f}{ms_drf / ms_rapido:>8.1f}x"
+            )
+
+    def bench_uuid(self, options):
+        """
+        Inserción de votos con clave uuid4 frente a uuid7 (PostgreSQL): filas/s y
+        tamaño de la clave primaria y de un índice secundario al terminar.
+        Usa tablas temporales con la forma de votaciones_voto.
+        """
+        from votaciones.identificadores import uuid7
+
+        if connection.vendor != "postgresql":
+            raise CommandError("The uuid scenario needs PostgreSQL (it measures B-tree index sizes).")
+
+        filas, lote = options["filas"], 10_000
+        usuarios = [uuid.uuid4() for _ in range(500)]
+        premios = [uuid.uuid4() for _ in range(25)]
+        rng = random.Random(2025)
+
+        self.stdout.write(f"{'generator':<12}{'rows':>10}{'rows/s':>12}{'pk MB':>10}{'idx MB':>10}")
+        for etiqueta, generador in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+            tabla = f"bench_voto_{etiqueta}"
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {tabla} ("
+                    " id uuid PRIMARY KEY, usuario_id uuid NOT NULL, premio_id uuid NOT NULL,"
+                    " nominado_id uuid NOT NULL, ronda smallint NOT NULL, fecha_voto timestamptz NOT NULL DEFAULT now())"
+                )
+                cursor.execute(f"CREATE INDEX {tabla}_premio ON {tabla} (premio_id, ronda)")
+                inicio = time.perf_counter()
+                for desde in range(0, filas, lote):
+                    n = min(lote, filas - desde)
+                    cursor.execute(
+                        f"INSERT INTO {tabla} (id, usuario_id, premio_id, nominado_id, ronda) "
+                        "SELECT * FROM unnest(%s::uuid[], %s::uuid[], %s::uuid[], %s::uuid[], %s::smallint[])",
+                        [
+                            [generador() for _ in range(n)],
+                            [rng.choice(usuarios) for _ in range(n)],
+                            [rng.choice(premios) for _ in range(n)],
+                            [uuid.uuid4() for _ in range(n)],
+                            [1] * n,
+                        ],
+                    )
+                segundos = time.perf_counter() - inicio
+                cursor.execute(
+                    "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                    [f"{tabla}_pkey", f"{tabla}_premio"],
+                )
+                pk, idx = cursor.fetchone()
+                cursor.execute(f"DROP TABLE {tabla}")
+            self.stdout.write(
+                f"{etiqueta:<12}{filas:>10}{filas / segundos:>12.0f}{pk / 2 ** 20:>10.1f}{idx / 2 ** 20:>10.1f}"
+            )
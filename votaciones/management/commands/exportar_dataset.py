@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.analitica import exportar_dataset
+from votaciones.exportacion import TAMANO_LOTE_EXPORTACION, filtrar_votos
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot votes into a columnar dataset: one integer-encoded .npy file per column plus "
+        "diccionario.json. Rows are streamed, and the files can be opened with np.load(mmap_mode='r')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("salida", help="Output directory (must not exist).")
+        parser.add_argument("--premio", help="UUID of the premio to export.")
+        parser.add_argument("--ronda", type=int, choices=[1, 2])
+        parser.add_argument("--desde", help="Start date (YYYY-MM-DD or ISO 8601 datetime).")
+        parser.add_argument("--hasta", help="End date (YYYY-MM-DD or ISO 8601 datetime).")
+        parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE_EXPORTACION)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be a positive integer.")
+        try:
+            votos = filtrar_votos(
+                premio=options["premio"],
+                ronda=options["ronda"],
+                desde=options["desde"],
+                hasta=options["hasta"],
+            )
+            total = exportar_dataset(votos, options["salida"], chunk_size=options["chunk_size"])
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+        except (ValueError, FileExistsError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Exported {total} votes to '{options['salida']}'."))
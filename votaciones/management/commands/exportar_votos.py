@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+
+from votaciones.exportacion import (
+    FORMATOS_EXPORTACION, TAMANO_LOTE_EXPORTACION, filtrar_votos, iterar_exportacion,
+)
+
+
+class Command(BaseCommand):
+    help = "Export votes (including IP and user agent) as CSV or JSONL for audits, streaming rows so memory stays flat."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formato", choices=FORMATOS_EXPORTACION, default="csv")
+        parser.add_argument("--premio", help="UUID of the premio to export.")
+        parser.add_argument("--ronda", type=int, choices=[1, 2])
+        parser.add_argument("--desde", help="Start date (YYYY-MM-DD or ISO 8601 datetime).")
+        parser.add_argument("--hasta", help="End date (YYYY-MM-DD or ISO 8601 datetime).")
+        parser.add_argument("--salida", help="Output file. Defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE_EXPORTACION)
+
+    def handle(self, *args, **options):
+        try:
+            votos = filtrar_votos(
+                premio=options["premio"],
+                ronda=options["ronda"],
+                desde=options["desde"],
+                hasta=options["hasta"],
+            )
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lineas = iterar_exportacion(votos, options["formato"], chunk_size=options["chunk_size"])
+        if not options["salida"]:
+            for linea in lineas:
+                self.stdout.write(linea, ending="")
+            return
+
+        total = 0
+        with open(options["salida"], "w", encoding="utf-8", newline="") as fichero:
+            for linea in lineas:
+                fichero.write(linea)
+                total += 1
+        if options["formato"] == "csv":
+            total -= 1  # cabecera
+        self.stderr.write(self.style.SUCCESS(f"Exported {total} votes to '{options['salida']}'."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.importacion import (
+    FORMATOS_IMPORTACION, MODOS_IMPORTACION, ERROR, ErrorImportacion, importar_nominados, leer_filas,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create or upsert nominees from a CSV or JSON file. Columns: premio (id, slug or name), "
+        "nombre, descripcion, usuarios (ids or usernames separated by ';'), activo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="CSV or JSON file.")
+        parser.add_argument("--formato", choices=FORMATOS_IMPORTACION, help="Defaults to the file extension.")
+        parser.add_argument("--modo", choices=MODOS_IMPORTACION, default="crear")
+        parser.add_argument("--encoding", help="File encoding. Defaults to UTF-8, falling back to Windows-1252.")
+        parser.add_argument("--estricto", action="store_true", help="Write nothing if any row has errors.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing.")
+
+    def handle(self, *args, **options):
+        formato = options["formato"] or ("json" if options["archivo"].lower().endswith(".json") else "csv")
+        try:
+            with open(options["archivo"], "rb") as f:
+                filas = leer_filas(f.read(), formato, codificacion=options["encoding"])
+            resultado = importar_nominados(
+                filas, modo=options["modo"], estricto=options["estricto"], simular=options["dry_run"]
+            )
+        except (OSError, ErrorImportacion) as e:
+            raise CommandError(str(e))
+
+        for fila in resultado["resultados"]:
+            if fila["estado"] == ERROR:
+                self.stderr.write(f"Row {fila['fila']}: {fila['error']}")
+        resumen = (
+            f"{resultado['creados']} created, {resultado['actualizados']} updated, "
+            f"{resultado['errores']} rows with errors."
+        )
+        if not resultado["aplicado"]:
+            resumen = f"Nothing was written. Would have: {resumen}"
+        self.stdout.write(self.style.SUCCESS(resumen) if resultado["aplicado"] else resumen)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.gala import TAMANO_LOTE_BORRADO, limpiar_sesiones_y_tokens, sesiones_caducadas, tokens_obsoletos
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions and stale auth tokens (created more than --dias-token days ago "
+        "and neither used nor logged in with since, or belonging to inactive users) in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias-token", type=int, default=settings.TOKEN_CADUCIDAD_DIAS,
+            help="Days without use or login after which a token is considered stale.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE_BORRADO)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be deleted.")
+
+    def handle(self, *args, **options):
+        if options["dias_token"] < 1 or options["chunk_size"] <= 0:
+            raise CommandError("--dias-token and --chunk-size must be positive integers.")
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{sesiones_caducadas().count()} expired sessions, "
+                f"{tokens_obsoletos(options['dias_token']).count()} stale tokens."
+            )
+            return
+        sesiones, tokens = limpiar_sesiones_y_tokens(options["dias_token"], tamano_lote=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{sesiones} expired sessions and {tokens} stale tokens deleted."))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from votaciones.gala import TAMANO_LOTE_BORRADO, purgar_auditoria
+from votaciones.models import Premio
+
+
+class Command(BaseCommand):
+    help = (
+        "Retention job: null out the IP address and user agent of votes for premios whose "
+        "results were published more than --dias days ago. Runs in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=30, help="Days to keep audit data after results are published.")
+        parser.add_argument("--chunk-size", type=int, default=TAMANO_LOTE_BORRADO)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many premios would be affected.")
+
+    def handle(self, *args, **options):
+        if options["dias"] < 0 or options["chunk_size"] <= 0:
+            raise CommandError("--dias must be >= 0 and --chunk-size a positive integer.")
+        corte = timezone.now() - timedelta(days=options["dias"])
+        premios = Premio.objects.filter(estado="finalizado", fecha_resultados_publicados__lte=corte)
+        if options["dry_run"]:
+            self.stdout.write(f"{premios.count()} premios finalized before {corte:%Y-%m-%d %H:%M}.")
+            return
+        anonimizados = purgar_auditoria(premios, tamano_lote=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{anonimizados} votes anonymized."))
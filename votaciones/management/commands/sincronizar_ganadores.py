@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from votaciones.historico import reconstruir_ganadores
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the normalized historic-winners table from every premio's ganadores_historicos "
+        "(use after changing the JSON with update() or raw SQL, which skip signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be a positive integer.")
+        corregidos = reconstruir_ganadores(tamano_lote=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{corregidos} premios resynchronized."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0012_configuracionsistema_alter_sugerencia_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nominado',
+            index=models.Index(fields=['nombre', 'id'], name='votaciones__nombre_d55091_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sugerencia',
+            index=models.Index(fields=['fecha_sugerencia', 'id'], name='votaciones__fecha_s_22e422_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0013_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaAdmin',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('reset_gala', 'Reiniciar gala')], max_length=30, verbose_name='Tipo')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completada', 'Completada'), ('error', 'Error')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('procesados', models.PositiveBigIntegerField(default=0, verbose_name='Elementos procesados')),
+                ('total', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Total de elementos')),
+                ('mensaje', models.TextField(blank=True, default='', verbose_name='Mensaje')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Finalización')),
+            ],
+            options={
+                'verbose_name': 'Tarea de Administración',
+                'verbose_name_plural': 'Tareas de Administración',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
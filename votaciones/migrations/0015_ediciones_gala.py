@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:37
+
+import django.db.models.deletion
+import votaciones.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0014_tareaadmin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configuracionsistema',
+            name='edicion_actual',
+            field=models.PositiveSmallIntegerField(default=votaciones.models.anio_actual, verbose_name='Edición Actual'),
+        ),
+        migrations.AddField(
+            model_name='nominado',
+            name='edicion',
+            field=models.PositiveSmallIntegerField(default=votaciones.models.edicion_vigente, verbose_name='Edición'),
+        ),
+        migrations.AddField(
+            model_name='premio',
+            name='edicion',
+            field=models.PositiveSmallIntegerField(default=votaciones.models.edicion_vigente, verbose_name='Edición'),
+        ),
+        migrations.AddField(
+            model_name='voto',
+            name='edicion',
+            field=models.PositiveSmallIntegerField(default=votaciones.models.edicion_vigente, verbose_name='Edición'),
+        ),
+        migrations.AlterField(
+            model_name='tareaadmin',
+            name='tipo',
+            field=models.CharField(choices=[('reset_gala', 'Reiniciar gala'), ('archivar_edicion', 'Archivar edición')], max_length=30, verbose_name='Tipo'),
+        ),
+        migrations.CreateModel(
+            name='PremioArchivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('edicion', models.PositiveSmallIntegerField(verbose_name='Edición')),
+                ('premio_nombre', models.CharField(max_length=255, verbose_name='Nombre del Premio')),
+                ('votantes_ronda1', models.PositiveIntegerField(default=0, verbose_name='Votantes Ronda 1')),
+                ('votantes_ronda2', models.PositiveIntegerField(default=0, verbose_name='Votantes Ronda 2')),
+                ('votos_ronda1', models.PositiveIntegerField(default=0, verbose_name='Votos Ronda 1')),
+                ('votos_ronda2', models.PositiveIntegerField(default=0, verbose_name='Votos Ronda 2')),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Archivado')),
+                ('premio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archivos', to='votaciones.premio', verbose_name='Premio')),
+            ],
+            options={
+                'verbose_name': 'Premio Archivado',
+                'verbose_name_plural': 'Premios Archivados',
+                'ordering': ['-edicion', 'premio_nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='NominadoArchivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='Nombre del Nominado')),
+                ('usuarios', models.JSONField(blank=True, default=list, verbose_name='Usuarios Vinculados')),
+                ('votos_ronda1', models.PositiveIntegerField(default=0, verbose_name='Votos Ronda 1')),
+                ('puntos_ronda2', models.PositiveIntegerField(default=0, verbose_name='Puntos Ronda 2')),
+                ('posicion', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Posición Final')),
+                ('premio_archivado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nominados', to='votaciones.premioarchivado', verbose_name='Premio Archivado')),
+            ],
+            options={
+                'verbose_name': 'Nominado Archivado',
+                'verbose_name_plural': 'Nominados Archivados',
+                'ordering': ['premio_archivado', models.OrderBy(models.F('posicion'), nulls_last=True), '-puntos_ronda2', 'nombre'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='premioarchivado',
+            constraint=models.UniqueConstraint(fields=('edicion', 'premio_nombre'), name='unico_premio_archivado_por_edicion'),
+        ),
+    ]
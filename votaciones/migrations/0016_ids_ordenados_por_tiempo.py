@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:38
+
+import votaciones.identificadores
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0015_ediciones_gala'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='nominado',
+            name='id',
+            field=models.UUIDField(default=votaciones.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='sugerencia',
+            name='id',
+            field=models.UUIDField(default=votaciones.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='voto',
+            name='id',
+            field=models.UUIDField(default=votaciones.identificadores.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def internar_user_agents(apps, schema_editor):
+    """Crea un UserAgent por cada texto distinto y enlaza los votos (un UPDATE por texto)."""
+    Voto = apps.get_model('votaciones', 'Voto')
+    UserAgent = apps.get_model('votaciones', 'UserAgent')
+    textos = (
+        Voto.objects.exclude(user_agent__isnull=True).exclude(user_agent='')
+        .values_list('user_agent', flat=True).distinct().order_by()
+    )
+    for texto in list(textos):
+        agente, _ = UserAgent.objects.get_or_create(texto=texto[:500])
+        Voto.objects.filter(user_agent=texto).update(agente=agente)
+
+
+def restaurar_user_agents(apps, schema_editor):
+    Voto = apps.get_model('votaciones', 'Voto')
+    UserAgent = apps.get_model('votaciones', 'UserAgent')
+    for agente in UserAgent.objects.iterator():
+        Voto.objects.filter(agente=agente).update(user_agent=agente.texto)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0016_ids_ordenados_por_tiempo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('texto', models.CharField(max_length=500, unique=True, verbose_name='User Agent')),
+            ],
+            options={
+                'verbose_name': 'User Agent',
+                'verbose_name_plural': 'User Agents',
+            },
+        ),
+        migrations.AddField(
+            model_name='voto',
+            name='agente',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='votaciones.useragent', verbose_name='User Agent'),
+        ),
+        migrations.RunPython(internar_user_agents, restaurar_user_agents),
+        migrations.RemoveField(
+            model_name='voto',
+            name='user_agent',
+        ),
+    ]
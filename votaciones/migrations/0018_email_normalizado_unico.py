@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:50
+
+import django.db.models.functions.text
+import votaciones.models
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def marcar_emails_duplicados(apps, schema_editor):
+    """
+    Para cada email repetido (sin distinguir mayúsculas) conserva la cuenta más
+    antigua y marca el resto como duplicadas, para poder crear la restricción única.
+    """
+    Usuario = apps.get_model('votaciones', 'Usuario')
+    con_email = Usuario.objects.exclude(email='').annotate(email_normalizado=Lower('email'))
+    repetidos = (
+        con_email.values('email_normalizado').annotate(total=Count('id'))
+        .filter(total__gt=1).values_list('email_normalizado', flat=True).order_by()
+    )
+    for email in list(repetidos):
+        cuentas = con_email.filter(email_normalizado=email).order_by('date_joined', 'pk')
+        duplicadas = list(cuentas.values_list('pk', flat=True)[1:])
+        Usuario.objects.filter(pk__in=duplicadas).update(email_duplicado=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('votaciones', '0017_user_agents_internados'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', votaciones.models.UsuarioManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='email_duplicado',
+            field=models.BooleanField(default=False, help_text='Su email coincide con el de otra cuenta más antigua (sin distinguir mayúsculas).'),
+        ),
+        migrations.RunPython(marcar_emails_duplicados, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='usuario_email_lower_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='usuario',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(models.Q(('email', ''), _negated=True), ('email_duplicado', False)), name='usuario_email_unico_ci', violation_error_message='Ya existe un usuario con este correo electrónico.'),
+        ),
+    ]
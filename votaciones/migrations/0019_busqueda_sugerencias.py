@@ -0,0 +1,70 @@
+from django.db import migrations
+
+TABLA_FTS = 'votaciones_sugerencia_fts'
+INDICE_GIN = 'sugerencia_busqueda_gin'
+
+# Tabla FTS5 independiente (no external content): las tablas de Django no tienen
+# INTEGER PRIMARY KEY y VACUUM podría cambiar sus rowid.
+SQL_FTS5 = [
+    f"""CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5(
+        sugerencia_id UNINDEXED, contenido, notas_admin,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER votaciones_sugerencia_fts_ai AFTER INSERT ON votaciones_sugerencia BEGIN
+        INSERT INTO {TABLA_FTS} (sugerencia_id, contenido, notas_admin)
+        VALUES (NEW.id, NEW.contenido, COALESCE(NEW.notas_admin, ''));
+    END""",
+    f"""CREATE TRIGGER votaciones_sugerencia_fts_ad AFTER DELETE ON votaciones_sugerencia BEGIN
+        DELETE FROM {TABLA_FTS} WHERE sugerencia_id = OLD.id;
+    END""",
+    f"""CREATE TRIGGER votaciones_sugerencia_fts_au AFTER UPDATE OF contenido, notas_admin ON votaciones_sugerencia BEGIN
+        UPDATE {TABLA_FTS} SET contenido = NEW.contenido, notas_admin = COALESCE(NEW.notas_admin, '')
+        WHERE sugerencia_id = OLD.id;
+    END""",
+    f"""INSERT INTO {TABLA_FTS} (sugerencia_id, contenido, notas_admin)
+        SELECT id, contenido, COALESCE(notas_admin, '') FROM votaciones_sugerencia""",
+]
+
+
+def _indice_gin():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Misma expresión que votaciones.busqueda._vector()
+    return GinIndex(SearchVector('contenido', 'notas_admin', config='spanish'), name=INDICE_GIN)
+
+
+def _fts5_disponible(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def crear_indice_busqueda(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('votaciones', 'Sugerencia'), _indice_gin())
+    elif vendor == 'sqlite' and _fts5_disponible(schema_editor):
+        for sql in SQL_FTS5:
+            schema_editor.execute(sql)
+
+
+def borrar_indice_busqueda(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('votaciones', 'Sugerencia'), _indice_gin())
+    elif vendor == 'sqlite':
+        for sufijo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS votaciones_sugerencia_fts_{sufijo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0018_email_normalizado_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice_busqueda, borrar_indice_busqueda),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0019_busqueda_sugerencias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sugerencia',
+            name='firma_minhash',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='sugerencia',
+            name='grupo',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name='Grupo de similares'),
+        ),
+        migrations.CreateModel(
+            name='CubetaSugerencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('banda', models.PositiveSmallIntegerField()),
+                ('valor', models.BigIntegerField()),
+                ('sugerencia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cubetas', to='votaciones.sugerencia')),
+            ],
+            options={
+                'verbose_name': 'Cubeta LSH de sugerencia',
+                'verbose_name_plural': 'Cubetas LSH de sugerencias',
+                'indexes': [models.Index(fields=['banda', 'valor'], name='votaciones__banda_382428_idx')],
+            },
+        ),
+    ]
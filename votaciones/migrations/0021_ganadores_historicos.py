@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+INDICE_GIN = 'premio_ganadores_gin'
+
+
+def _indice_gin():
+    from django.contrib.postgres.indexes import GinIndex
+
+    # jsonb_path_ops: índice más compacto, suficiente para la contención (@>)
+    return GinIndex(fields=['ganadores_historicos'], name=INDICE_GIN, opclasses=['jsonb_path_ops'])
+
+
+def poblar_ganadores(apps, schema_editor):
+    # Funciones puras (sin modelos): el reparto del JSON y la normalización son los de la app
+    from votaciones.historico import entradas_historico
+    from votaciones.similitud import normalizar
+
+    Premio = apps.get_model('votaciones', 'Premio')
+    GanadorHistorico = apps.get_model('votaciones', 'GanadorHistorico')
+    GanadorHistorico.objects.bulk_create(
+        [
+            GanadorHistorico(premio_id=pk, anio=anio, nombre=nombre, nombre_clave=normalizar(nombre))
+            for pk, historico in Premio.objects.values_list('pk', 'ganadores_historicos').iterator()
+            for anio, nombre in entradas_historico(historico)
+        ],
+        batch_size=1000,
+    )
+
+
+def crear_indice_json(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('votaciones', 'Premio'), _indice_gin())
+
+
+def borrar_indice_json(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('votaciones', 'Premio'), _indice_gin())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0020_similitud_sugerencias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GanadorHistorico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Año')),
+                ('nombre', models.CharField(max_length=255, verbose_name='Nombre')),
+                ('nombre_clave', models.CharField(max_length=255, verbose_name='Nombre normalizado')),
+                ('premio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ganadores', to='votaciones.premio', verbose_name='Premio')),
+            ],
+            options={
+                'verbose_name': 'Ganador Histórico',
+                'verbose_name_plural': 'Ganadores Históricos',
+                'ordering': ['-anio', 'nombre'],
+                'indexes': [models.Index(fields=['nombre_clave', 'anio'], name='votaciones__nombre__7e724e_idx'), models.Index(fields=['anio', 'nombre_clave'], name='votaciones__anio_5d038a_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_ganadores, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_json, borrar_indice_json),
+    ]
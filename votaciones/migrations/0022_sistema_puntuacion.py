@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0021_ganadores_historicos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='premio',
+            name='sistema_puntuacion',
+            field=models.CharField(choices=[('puntos_321', 'Puntos 3-2-1'), ('borda', 'Borda modificado'), ('aprobacion', 'Aprobación'), ('irv', 'Segunda vuelta instantánea (IRV)')], default='puntos_321', max_length=20, verbose_name='Sistema de Puntuación'),
+        ),
+    ]
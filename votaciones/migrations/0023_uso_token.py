@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0022_sistema_puntuacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsoToken',
+            fields=[
+                ('clave', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='Token')),
+                ('ultimo_uso', models.DateTimeField(db_index=True, verbose_name='Último uso')),
+            ],
+            options={
+                'verbose_name': 'Uso de token',
+                'verbose_name_plural': 'Usos de tokens',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0023_uso_token'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voto',
+            index=models.Index(fields=['edicion', 'ronda', 'fecha_voto'], name='votaciones__edicion_1ed5f9_idx'),
+        ),
+    ]
@@ -1,7 +1,57 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser, Group, Permission
+from collections import OrderedDict
+import ipaddress
+import threading
+
+from django.conf import settings
+from django.db import models, transaction
+from django.contrib.auth.models import AbstractUser, Group, Permission, UserManager
+from django.core.cache import cache
+from django.db.models.functions import Lower
+from django.utils import timezone
 import uuid
 
+from .identificadores import uuid7
+
+CLAVE_CACHE_EDICION = 'gala:edicion_actual'
+
+
+def anio_actual():
+    return timezone.now().year
+
+
+def edicion_vigente():
+    """
+    Edición (año) de la gala en curso según ConfiguracionSistema, cacheada si
+    la caché es compartida (EDICION_CACHE).
+    Es el valor por defecto de 'edicion' en premios, nominados y votos.
+    """
+    if not settings.EDICION_CACHE:
+        return _leer_edicion()
+    edicion = cache.get(CLAVE_CACHE_EDICION)
+    if edicion is None:
+        edicion = _leer_edicion()
+        cache.set(CLAVE_CACHE_EDICION, edicion, timeout=None)
+    return edicion
+
+
+def _leer_edicion():
+    # Solo se lee esta columna para que funcione también durante las migraciones
+    return ConfiguracionSistema.objects.values_list('edicion_actual', flat=True).first() or anio_actual()
+
+def normalizar_email(email):
+    """Forma canónica de un email para compararlo sin distinguir mayúsculas."""
+    return (email or '').strip().lower()
+
+
+class UsuarioManager(UserManager):
+    def por_email(self, email):
+        """
+        Usuarios con ese email sin distinguir mayúsculas. Filtra por Lower(email)
+        para usar el índice funcional en lugar de recorrer la tabla.
+        """
+        return self.alias(email_normalizado=Lower('email')).filter(email_normalizado=normalizar_email(email))
+
+
 # Modelo de Usuario
 class Usuario(AbstractUser):
     # Aquí puedes añadir campos adicionales a tu modelo de usuario
@@ -45,6 +95,12 @@ class Usuario(AbstractUser):
         unique=True,
         help_text="Etiqueta del slot de participante asignado (único)."
     )
+    # Cuentas que ya compartían email (sin distinguir mayúsculas) antes de exigir que
+    # sea único: se marcan en la migración y quedan fuera de la restricción
+    email_duplicado = models.BooleanField(
+        default=False,
+        help_text="Su email coincide con el de otra cuenta más antigua (sin distinguir mayúsculas)."
+    )
 
     # Resolución de colisiones de related_name para grupos y permisos
     # Es vital cuando se usa un Custom User Model
@@ -68,9 +124,23 @@ class Usuario(AbstractUser):
         related_query_name="usuario",
     )
 
+    objects = UsuarioManager()
+
     class Meta:
         verbose_name = 'Usuario'
         verbose_name_plural = 'Usuarios'
+        indexes = [
+            # Búsquedas por email sin distinguir mayúsculas (login con Google, registro)
+            models.Index(Lower('email'), name='usuario_email_lower_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                Lower('email'),
+                condition=~models.Q(email='') & models.Q(email_duplicado=False),
+                name='usuario_email_unico_ci',
+                violation_error_message='Ya existe un usuario con este correo electrónico.',
+            ),
+        ]
 
     def __str__(self):
         return self.username
@@ -91,6 +161,16 @@ class Premio(models.Model):
         ('indirecto', 'Indirecto (Frases/Objetos)'),
     ]
     tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, default='directo', verbose_name="Tipo de Premio")
+    # Cómo se puntúan las papeletas de la Ronda 2 (ver puntuacion.py)
+    SISTEMA_PUNTUACION_CHOICES = [
+        ('puntos_321', 'Puntos 3-2-1'),
+        ('borda', 'Borda modificado'),
+        ('aprobacion', 'Aprobación'),
+        ('irv', 'Segunda vuelta instantánea (IRV)'),
+    ]
+    sistema_puntuacion = models.CharField(
+        max_length=20, choices=SISTEMA_PUNTUACION_CHOICES, default='puntos_321', verbose_name="Sistema de Puntuación"
+    )
     
     # Fechas de las rondas
     fecha_inicio_ronda1 = models.DateTimeField(null=True, blank=True, verbose_name="Inicio Ronda 1")
@@ -109,6 +189,9 @@ class Premio(models.Model):
     activo = models.BooleanField(default=True, verbose_name="Activo")
     estado = models.CharField(max_length=50, choices=ESTADO_CHOICES, default='preparacion', verbose_name="Estado")
 
+    # Edición (año) de la gala en la que participa actualmente el premio
+    edicion = models.PositiveSmallIntegerField(default=edicion_vigente, verbose_name="Edición")
+
     # Nuevo: cantidad de usuarios vinculados requeridos por nominado para este premio (1 por defecto; p.ej. Pareja del Año = 2)
     vinculos_requeridos = models.PositiveIntegerField(default=1, verbose_name="Usuarios vinculados requeridos")
 
@@ -168,9 +251,34 @@ class Premio(models.Model):
         verbose_name_plural = "Premios"
         ordering = ['nombre']
 
+class GanadorHistorico(models.Model):
+    """
+    Una fila por entrada de `Premio.ganadores_historicos`, mantenida en
+    sincronía por signals.py (ver historico.py). Permite contar victorias por
+    nombre o por año con consultas indexadas en lugar de recorrer el JSON.
+    """
+    premio = models.ForeignKey(Premio, on_delete=models.CASCADE, related_name='ganadores', verbose_name="Premio")
+    anio = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Año")
+    nombre = models.CharField(max_length=255, verbose_name="Nombre")
+    # Nombre en minúsculas y sin tildes ni signos: agrupa variantes del mismo ganador
+    nombre_clave = models.CharField(max_length=255, verbose_name="Nombre normalizado")
+
+    def __str__(self):
+        return f"{self.nombre} - {self.premio} ({self.anio})"
+
+    class Meta:
+        verbose_name = "Ganador Histórico"
+        verbose_name_plural = "Ganadores Históricos"
+        ordering = ['-anio', 'nombre']
+        indexes = [
+            models.Index(fields=['nombre_clave', 'anio']),
+            models.Index(fields=['anio', 'nombre_clave']),
+        ]
+
+
 # Modelo de Nominado (¡REDIFINIDO CON ManyToMany a Usuario!)
 class Nominado(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     # Relación ForeignKey: Un nominado pertenece a un premio.
     premio = models.ForeignKey(Premio, on_delete=models.CASCADE, related_name='nominados', verbose_name="Premio")
 
@@ -190,12 +298,13 @@ class Nominado(models.Model):
 
     activo = models.BooleanField(default=True, verbose_name="Activo")
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    edicion = models.PositiveSmallIntegerField(default=edicion_vigente, verbose_name="Edición")
 
     def __str__(self):
         # Mejora la representación para mostrar usuarios vinculados si existen
-        if self.usuarios_vinculados.exists():
-            # Obtiene los usernames de los usuarios vinculados
-            vinculados = ", ".join([u.username for u in self.usuarios_vinculados.all()])
+        # (.all() en lugar de .exists() para aprovechar prefetch_related cuando lo hay)
+        vinculados = ", ".join([u.username for u in self.usuarios_vinculados.all()])
+        if vinculados:
             return f"{self.nombre} ({self.premio.nombre} - Vinculado/s: {vinculados})"
         return f"{self.nombre} ({self.premio.nombre})"
 
@@ -207,10 +316,14 @@ class Nominado(models.Model):
         # Por ahora, mantengamos 'premio' y 'nombre' como únicos para evitar duplicados exactos.
         unique_together = ('premio', 'nombre')
         ordering = ['nombre']
+        indexes = [
+            # Ordenación estable para la paginación por cursor (nombre + id)
+            models.Index(fields=['nombre', 'id']),
+        ]
 
 # Modelo de Voto (¡AJUSTADO PARA RONDAS!)
 class Voto(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='votos_emitidos', verbose_name="Usuario")
     premio = models.ForeignKey(Premio, on_delete=models.CASCADE, related_name='votos', verbose_name="Premio Votado")
     nominado = models.ForeignKey(Nominado, on_delete=models.CASCADE, related_name='votos_recibidos', verbose_name="Nominado Votado")
@@ -223,7 +336,14 @@ class Voto(models.Model):
         help_text="Solo aplica para la Ronda 2"
     )
     ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="Dirección IP")
-    user_agent = models.TextField(blank=True, null=True, verbose_name="User Agent")
+    # User agent internado en UserAgent: cada voto guarda solo un entero
+    agente = models.ForeignKey(
+        'UserAgent', on_delete=models.PROTECT, null=True, blank=True,
+        related_name='+', verbose_name="User Agent"
+    )
+    # Edición de la gala. Al archivar una edición sus votos se agregan en
+    # PremioArchivado/NominadoArchivado y se eliminan de esta tabla.
+    edicion = models.PositiveSmallIntegerField(default=edicion_vigente, verbose_name="Edición")
     
     class Meta:
         constraints = [
@@ -250,6 +370,7 @@ class Voto(models.Model):
         indexes = [
             models.Index(fields=['usuario', 'premio', 'ronda']),
             models.Index(fields=['premio', 'ronda', 'fecha_voto']),
+            models.Index(fields=['edicion', 'ronda', 'fecha_voto']),
             models.Index(fields=['fecha_voto']),
         ]
         verbose_name = 'Voto'
@@ -263,10 +384,11 @@ class Voto(models.Model):
     
     def clean(self):
         from django.core.exceptions import ValidationError
+        from .elegibilidad import elegibilidad
         
         # Validar que no se vote por uno mismo
         if hasattr(self, 'usuario') and hasattr(self, 'nominado'):
-            if self.usuario in self.nominado.usuarios_vinculados.all():
+            if elegibilidad(self.usuario_id).vinculado(self.nominado_id):
                 raise ValidationError("No puedes votar por un nominado al que estás vinculado")
         
         # Validar que el voto sea en la ronda correcta del premio
@@ -279,33 +401,122 @@ class Voto(models.Model):
                 raise ValidationError("Este premio no está en período de votación")
             
             # Validar que el usuario no haya votado más veces de las permitidas en esta ronda
-            votos_en_ronda = Voto.objects.filter(
-                usuario=self.usuario,
-                premio=self.premio,
-                ronda=self.ronda
-            ).exclude(pk=getattr(self, 'pk', None)).count()
+            if self._state.adding:
+                votos_en_ronda = len(elegibilidad(self.usuario_id).votados(self.premio_id, self.ronda))
+            else:
+                # Al editar un voto existente no se cuenta el propio voto
+                votos_en_ronda = Voto.objects.filter(
+                    usuario=self.usuario,
+                    premio=self.premio,
+                    ronda=self.ronda
+                ).exclude(pk=self.pk).count()
             
             if self.ronda == 1 and votos_en_ronda >= 4:
                 raise ValidationError("Ya has alcanzado el límite de 4 votos en la Ronda 1")
             elif self.ronda == 2 and votos_en_ronda >= 3:
                 raise ValidationError("Ya has alcanzado el límite de 3 votos en la Ronda 2")
     
+    @property
+    def user_agent(self):
+        return self.agente.texto if self.agente_id else None
+
+    @user_agent.setter
+    def user_agent(self, texto):
+        self.agente_id = UserAgent.resolver(texto)
+
+    @staticmethod
+    def ip_desde_peticion(request):
+        """
+        IP del cliente. X-Forwarded-For solo se usa hasta los PROXIES_DE_CONFIANZA
+        saltos añadidos por nuestros proxies (las entradas anteriores las puede
+        inventar el cliente). Un valor que no es una IP válida se descarta.
+        """
+        candidatas = []
+        saltos = settings.PROXIES_DE_CONFIANZA
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if saltos and x_forwarded_for:
+            direcciones = [d.strip() for d in x_forwarded_for.split(',')]
+            candidatas.append(direcciones[-min(saltos, len(direcciones))])
+        candidatas.append(request.META.get('REMOTE_ADDR'))
+        for candidata in candidatas:
+            try:
+                return str(ipaddress.ip_address(candidata or ''))
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def auditoria_desde_peticion(request):
+        """IP y user agent de la petición, listos para pasar al crear el voto."""
+        return {'ip_address': Voto.ip_desde_peticion(request), 'user_agent': request.META.get('HTTP_USER_AGENT', '')}
+
     def save(self, *args, **kwargs):
-        # Si es un voto nuevo (no actualización) y no hay IP/User-Agent en los kwargs
-        if not self.pk and not self.ip_address and hasattr(self, 'request'):
-            x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                self.ip_address = x_forwarded_for.split(',')[0]
-            else:
-                self.ip_address = self.request.META.get('REMOTE_ADDR')
-            self.user_agent = self.request.META.get('HTTP_USER_AGENT', '')[:500]
+        # Si es un voto nuevo (no actualización) y no hay IP/User-Agent en los kwargs.
+        # El id (uuid7) ya existe antes de guardar, así que se comprueba _state.adding.
+        if self._state.adding and not self.ip_address and hasattr(self, 'request'):
+            for campo, valor in self.auditoria_desde_peticion(self.request).items():
+                setattr(self, campo, valor)
         
         self.full_clean()
         super().save(*args, **kwargs)
 
+
+class UserAgent(models.Model):
+    """
+    Tabla de user agents distintos. Los votos la referencian con un entero en
+    lugar de copiar el texto completo en cada fila.
+    """
+    LONGITUD_MAXIMA = 500
+    # Caché en proceso texto -> id (LRU). Solo se guardan ids ya confirmados.
+    _cache = OrderedDict()
+    _cache_maximo = 512
+    _cerrojo = threading.Lock()
+
+    id = models.AutoField(primary_key=True)
+    texto = models.CharField(max_length=LONGITUD_MAXIMA, unique=True, verbose_name="User Agent")
+
+    class Meta:
+        verbose_name = 'User Agent'
+        verbose_name_plural = 'User Agents'
+
+    def __str__(self):
+        return self.texto
+
+    @classmethod
+    def _cachear(cls, texto, pk):
+        with cls._cerrojo:
+            cls._cache[texto] = pk
+            cls._cache.move_to_end(texto)
+            while len(cls._cache) > cls._cache_maximo:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def resolver(cls, texto):
+        """Devuelve el id del user agent (creándolo si hace falta) o None si viene vacío."""
+        texto = (texto or '')[:cls.LONGITUD_MAXIMA]
+        if not texto:
+            return None
+        with cls._cerrojo:
+            pk = cls._cache.get(texto)
+            if pk is not None:
+                cls._cache.move_to_end(texto)
+                return pk
+        agente, creado = cls.objects.get_or_create(texto=texto)
+        if creado:
+            # Si la transacción se deshace el id no existirá: se cachea al confirmar
+            transaction.on_commit(lambda: cls._cachear(texto, agente.pk))
+        else:
+            cls._cachear(texto, agente.pk)
+        return agente.pk
+
+    @classmethod
+    def limpiar_cache(cls):
+        with cls._cerrojo:
+            cls._cache.clear()
+
 # Modelo de Sugerencia
 class Sugerencia(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     # Las sugerencias las pueden enviar solo usuarios logueados, de ahí la ForeignKey
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='sugerencias_enviadas', verbose_name="Usuario")
 
@@ -320,10 +531,38 @@ class Sugerencia(models.Model):
     revisada = models.BooleanField(default=False, verbose_name="Revisada por Administrador")
     notas_admin = models.TextField(blank=True, null=True, verbose_name="Notas del Administrador")
 
+    # Detección de casi-duplicados (ver similitud.py): firma MinHash del contenido y
+    # grupo de sugerencias parecidas (id de una de ellas; cada una empieza en el suyo)
+    firma_minhash = models.BinaryField(null=True, editable=False)
+    grupo = models.UUIDField(null=True, blank=True, editable=False, db_index=True, verbose_name="Grupo de similares")
+
+    class Meta:
+        indexes = [
+            # Ordenación estable para la paginación por cursor (fecha + id)
+            models.Index(fields=['fecha_sugerencia', 'id']),
+        ]
+
     def __str__(self):
         return f"Sugerencia de {self.usuario.username} - {self.get_tipo_display()}"
 
 
+class CubetaSugerencia(models.Model):
+    """
+    Cubetas LSH de la firma MinHash de una sugerencia (una por banda). Dos
+    sugerencias que comparten alguna cubeta son candidatas a casi-duplicado.
+    """
+    sugerencia = models.ForeignKey(Sugerencia, on_delete=models.CASCADE, related_name='cubetas')
+    banda = models.PositiveSmallIntegerField()
+    valor = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = 'Cubeta LSH de sugerencia'
+        verbose_name_plural = 'Cubetas LSH de sugerencias'
+        indexes = [
+            models.Index(fields=['banda', 'valor']),
+        ]
+
+
 class ConfiguracionSistema(models.Model):
     """
     Modelo para almacenar la configuración global del sistema de votación.
@@ -339,6 +578,8 @@ class ConfiguracionSistema(models.Model):
         default='preparacion',
         verbose_name="Fase Actual del Sistema"
     )
+    # Año de la edición en curso de la gala
+    edicion_actual = models.PositiveSmallIntegerField(default=anio_actual, verbose_name="Edición Actual")
     
     # Fechas importantes
     fecha_creacion = models.DateTimeField(auto_now_add=True)
@@ -359,4 +600,115 @@ class ConfiguracionSistema(models.Model):
     
     class Meta:
         verbose_name = "Configuración del Sistema"
-        verbose_name_plural = "Configuraciones del Sistema"
\ No newline at end of file
+        verbose_name_plural = "Configuraciones del Sistema"
+
+
+class TareaAdmin(models.Model):
+    """
+    Trabajo de administración que se ejecuta en segundo plano (p.ej. reiniciar la gala).
+    Guarda el estado y el progreso para poder consultarlos desde el panel.
+    """
+    TIPO_CHOICES = [
+        ('reset_gala', 'Reiniciar gala'),
+        ('archivar_edicion', 'Archivar edición'),
+    ]
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('en_curso', 'En curso'),
+        ('completada', 'Completada'),
+        ('error', 'Error'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES, verbose_name="Tipo")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', verbose_name="Estado")
+    procesados = models.PositiveBigIntegerField(default=0, verbose_name="Elementos procesados")
+    total = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Total de elementos")
+    mensaje = models.TextField(blank=True, default='', verbose_name="Mensaje")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Finalización")
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.get_estado_display()}"
+
+    class Meta:
+        verbose_name = "Tarea de Administración"
+        verbose_name_plural = "Tareas de Administración"
+        ordering = ['-fecha_creacion']
+
+
+# Archivo de ediciones finalizadas: agregados compactos de los votos
+class PremioArchivado(models.Model):
+    """
+    Resumen de un premio en una edición ya archivada (los votos individuales se eliminan).
+    """
+    edicion = models.PositiveSmallIntegerField(verbose_name="Edición")
+    premio = models.ForeignKey(
+        Premio,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archivos',
+        verbose_name="Premio"
+    )
+    premio_nombre = models.CharField(max_length=255, verbose_name="Nombre del Premio")
+    votantes_ronda1 = models.PositiveIntegerField(default=0, verbose_name="Votantes Ronda 1")
+    votantes_ronda2 = models.PositiveIntegerField(default=0, verbose_name="Votantes Ronda 2")
+    votos_ronda1 = models.PositiveIntegerField(default=0, verbose_name="Votos Ronda 1")
+    votos_ronda2 = models.PositiveIntegerField(default=0, verbose_name="Votos Ronda 2")
+    fecha_archivado = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Archivado")
+
+    def __str__(self):
+        return f"{self.premio_nombre} ({self.edicion})"
+
+    class Meta:
+        verbose_name = "Premio Archivado"
+        verbose_name_plural = "Premios Archivados"
+        ordering = ['-edicion', 'premio_nombre']
+        constraints = [
+            models.UniqueConstraint(fields=['edicion', 'premio_nombre'], name='unico_premio_archivado_por_edicion'),
+        ]
+
+
+class NominadoArchivado(models.Model):
+    """
+    Resultado de un nominado en una edición archivada: votos de ronda 1,
+    puntos de ronda 2 y posición final (1=Oro, 2=Plata, 3=Bronce).
+    """
+    premio_archivado = models.ForeignKey(
+        PremioArchivado,
+        on_delete=models.CASCADE,
+        related_name='nominados',
+        verbose_name="Premio Archivado"
+    )
+    nombre = models.CharField(max_length=100, verbose_name="Nombre del Nominado")
+    usuarios = models.JSONField(default=list, blank=True, verbose_name="Usuarios Vinculados")
+    votos_ronda1 = models.PositiveIntegerField(default=0, verbose_name="Votos Ronda 1")
+    puntos_ronda2 = models.PositiveIntegerField(default=0, verbose_name="Puntos Ronda 2")
+    posicion = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Posición Final")
+
+    def __str__(self):
+        return f"{self.nombre} - {self.premio_archivado}"
+
+    class Meta:
+        verbose_name = "Nominado Archivado"
+        verbose_name_plural = "Nominados Archivados"
+        ordering = ['premio_archivado', models.F('posicion').asc(nulls_last=True), '-puntos_ronda2', 'nombre']
+
+
+
+class UsoToken(models.Model):
+    """
+    Último uso de cada token de autenticación (lo registra
+    votaciones.autenticacion.TokenAuthenticationConUso como mucho una vez por
+    intervalo). `limpiar_sesiones` caduca los tokens por uso y no por inicio de
+    sesión. Sin FK al token: los tokens se borran con DELETE directos por lotes.
+    """
+    clave = models.CharField(max_length=40, primary_key=True, verbose_name="Token")
+    ultimo_uso = models.DateTimeField(db_index=True, verbose_name="Último uso")
+
+    def __str__(self):
+        return f"{self.clave[:8]}… ({self.ultimo_uso:%Y-%m-%d %H:%M})"
+
+    class Meta:
+        verbose_name = "Uso de token"
+        verbose_name_plural = "Usos de tokens"
@@ -0,0 +1,171 @@
+# gala_premios/votaciones/paginacion.py
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET, cada página continúa a partir de los valores de ordenación
+del último elemento devuelto, así que el coste de pedir una página no crece con
+el tamaño de la tabla. La vista indica la ordenación estable a usar en
+`keyset_ordering` (p.ej. ('nombre', 'id')); el último campo debe ser único.
+
+Es opcional: si la petición no incluye `cursor` ni `page_size`, la vista
+responde con la lista completa como hasta ahora.
+
+También incluye EstimatedCountPaginator, el paginador del admin para tablas
+grandes (votos), que evita el COUNT(*) completo cuando no hay filtros.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'PAGINACION_TAMANO_PAGINA', 50)
+        self.max_page_size = getattr(settings, 'PAGINACION_TAMANO_MAXIMO', 500)
+        self.next_cursor = None
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_ordering(self, view):
+        ordering = getattr(view, 'keyset_ordering', None)
+        assert ordering, (
+            f"{view.__class__.__name__} debe definir 'keyset_ordering' para usar KeysetPagination."
+        )
+        return tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, values):
+        raw = json.dumps([str(v) for v in values]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request, model, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [model._meta.get_field(f).to_python(v) for f, v in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_keyset_filter(self, fields, descending, values):
+        # (a, b) > (x, y)  <=>  a > x  OR  (a = x AND b > y)
+        condition = Q()
+        for i, field in enumerate(fields):
+            lookup = 'lt' if descending[i] else 'gt'
+            term = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(fields[:i], values[:i]):
+                term &= Q(**{prev_field: prev_value})
+            condition |= term
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        ordering = self.get_ordering(view)
+        fields = [o.lstrip('-') for o in ordering]
+        descending = [o.startswith('-') for o in ordering]
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*ordering)
+        values = self.decode_cursor(request, queryset.model, fields)
+        if values is not None:
+            queryset = queryset.filter(self.build_keyset_filter(fields, descending, values))
+
+        # Pedimos un elemento de más para saber si hay página siguiente
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            last = page[-1]
+            self.next_cursor = self.encode_cursor([getattr(last, f) for f in fields])
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador de Django que, en PostgreSQL y sin filtros, usa la estimación de
+    filas de las estadísticas (pg_class.reltuples) en lugar de COUNT(*), que
+    recorre la tabla entera. Con filtros, o si la tabla es pequeña, cuenta de verdad.
+    """
+    umbral_estimacion = 10000
+
+    def _estimacion(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or queryset.query.where:
+            return None
+        conexion = connections[queryset.db]
+        if conexion.vendor != 'postgresql':
+            return None
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [conexion.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            fila = cursor.fetchone()
+        return fila[0] if fila else None
+
+    @cached_property
+    def count(self):
+        estimacion = self._estimacion()
+        if estimacion is not None and estimacion >= self.umbral_estimacion:
+            return estimacion
+        return super().count
+
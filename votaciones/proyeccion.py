@@ -0,0 +1,191 @@
+# gala_premios/votaciones/proyeccion.py
+"""
+Proyección Monte-Carlo de los premios en Ronda 2.
+
+Para todos los premios abiertos se leen con dos consultas los finalistas (top 4
+de la Ronda 1) y las papeletas de la Ronda 2 (ver puntuacion.py). Los votos por
+posición se resumen en una matriz NumPy compacta
+`posiciones[premio, finalista, posicion]`.
+
+Los votantes que faltan se simulan de forma vectorizada:
+  1. Las preferencias de cada simulación se muestrean de una Dirichlet
+     centrada en la puntuación actual de cada finalista (más 1 de prior), así
+     la incertidumbre es mayor cuanto menos votos hay.
+  2. Cada papeleta es un podio (oro, plata, bronce) con probabilidad de
+     Plackett-Luce; el número de papeletas de cada podio posible entre los
+     votantes restantes sale de una multinomial. Con 4 finalistas hay 24
+     podios, así que cada premio es una operación sobre una matriz (S, 24).
+  3. Las papeletas simuladas se puntúan con el sistema del premio: con
+     puntos por posición es un producto de matrices; con IRV se resuelve la
+     segunda vuelta de todas las simulaciones a la vez (irv_ponderado).
+
+Simplificaciones: las papeletas incompletas cuentan como emitidas y no se
+excluye el voto de los nominados vinculados a un finalista.
+"""
+from itertools import permutations
+
+import numpy as np
+from django.db.models import Count
+
+from .models import Premio, Usuario, Voto
+from .puntuacion import VACIA, SegundaVueltaInstantanea, cargar_papeletas, irv_ponderado, sistema_de
+
+NUM_FINALISTAS = 4
+POSICIONES = 3
+# Con 2000 simulaciones el error estándar de una probabilidad es como mucho ~1,1 puntos
+SIMULACIONES_POR_DEFECTO = 2000
+SIMULACIONES_MAXIMAS = 50000
+
+
+def _finalistas(premio_ids):
+    """{premio_id: [(nominado_id, nombre), ...]} con el top 4 de la Ronda 1 (mismo orden que VotarView)."""
+    filas = (
+        Voto.objects.filter(premio_id__in=premio_ids, ronda=1)
+        .values_list('premio_id', 'nominado_id', 'nominado__nombre')
+        .annotate(total=Count('id'))
+        .order_by('premio_id', '-total', 'nominado__nombre')
+    )
+    finalistas = {pk: [] for pk in premio_ids}
+    for premio_id, nominado_id, nombre, _ in filas:
+        if len(finalistas[premio_id]) < NUM_FINALISTAS:
+            finalistas[premio_id].append((nominado_id, nombre))
+    return finalistas
+
+
+def matriz_posiciones(premio_ids, papeletas):
+    """
+    Matriz int32 (premios, NUM_FINALISTAS, POSICIONES) con los votos de cada
+    finalista (en el orden de sus papeletas) en cada posición.
+    """
+    posiciones = np.zeros((len(premio_ids), NUM_FINALISTAS, POSICIONES), dtype=np.int32)
+    for i, pk in enumerate(premio_ids):
+        matriz = papeletas[pk].matriz
+        columna = np.broadcast_to(np.arange(POSICIONES), matriz.shape)
+        ocupadas = matriz != VACIA
+        recuento = np.bincount(
+            matriz[ocupadas].astype(np.intp) * POSICIONES + columna[ocupadas],
+            minlength=NUM_FINALISTAS * POSICIONES,
+        )
+        posiciones[i] = recuento.reshape(NUM_FINALISTAS, POSICIONES)
+    return posiciones
+
+
+def _podios(num_finalistas):
+    """Podios posibles: matriz (podios, posiciones) de índices de finalista."""
+    return np.array(list(permutations(range(num_finalistas), min(POSICIONES, num_finalistas))), dtype=np.intp)
+
+
+def decidido(sistema, papeletas, puntos, restantes, lider):
+    """
+    True si el líder gana pase lo que pase con los votantes restantes.
+    - Puntos por posición: ningún otro puede alcanzarle aunque todos los
+      restantes le den la máxima puntuación (y al líder ninguna).
+    - IRV: el líder tiene la mayoría absoluta de primeras preferencias
+      contando también las papeletas que faltan.
+    """
+    if restantes <= 0:
+        return True
+    if isinstance(sistema, SegundaVueltaInstantanea):
+        primeras = int(np.count_nonzero(papeletas.matriz[:, 0] == lider)) if len(papeletas) else 0
+        return 2 * primeras > len(papeletas) + restantes
+    maximo = sistema.pesos_papeleta_completa(min(POSICIONES, len(puntos))).max()
+    margen = puntos[lider] - puntos - maximo * restantes
+    indices = np.arange(len(puntos))
+    # A igualdad de puntos gana el de menor nombre (índice menor)
+    supera = (margen > 0) | ((margen == 0) & (indices > lider))
+    return bool(np.all(supera[indices != lider]))
+
+
+def simular_premio(sistema, papeletas, restantes, simulaciones, rng):
+    """
+    (probabilidad de victoria de cada finalista, orden actual, puntuación actual)
+    dadas las papeletas emitidas y los votantes restantes.
+    """
+    num = papeletas.num_candidatos
+    orden, puntos = sistema.clasificar(papeletas)
+    probabilidades = np.zeros(num)
+    if restantes <= 0 or num == 1:
+        probabilidades[orden[0]] = 1.0
+        return probabilidades, orden, puntos
+
+    podios = _podios(num)
+    # Preferencias por simulación (S, num) y probabilidad Plackett-Luce de cada podio (S, podios)
+    pesos = rng.dirichlet(np.maximum(puntos, 0) + 1.0, size=simulaciones)
+    # Peso aún no elegido de cada podio en cada simulación
+    restante = np.ones((simulaciones, len(podios)))
+    probabilidad = np.ones((simulaciones, len(podios)))
+    for posicion in range(podios.shape[1]):
+        elegidos = pesos[:, podios[:, posicion]]
+        probabilidad *= elegidos / np.maximum(restante, 1e-12)
+        restante = restante - elegidos
+    probabilidad /= probabilidad.sum(axis=1, keepdims=True)
+    simuladas = rng.multinomial(restantes, probabilidad)  # (S, podios)
+
+    if isinstance(sistema, SegundaVueltaInstantanea):
+        # Papeletas emitidas (distintas, con su número) + podios simulados, por simulación
+        relleno = np.full((len(podios), papeletas.matriz.shape[1]), VACIA, dtype=papeletas.matriz.dtype)
+        relleno[:, :podios.shape[1]] = podios
+        emitidas, cuentas = np.unique(papeletas.matriz, axis=0, return_counts=True)
+        tipos = np.concatenate([emitidas, relleno])
+        cuentas = np.concatenate([np.broadcast_to(cuentas, (simulaciones, len(cuentas))), simuladas], axis=1)
+        ganadores = irv_ponderado(tipos, cuentas.astype(np.float64), num)[0][:, 0]
+    else:
+        puntos_podio = np.zeros((len(podios), num))
+        puntos_podio[np.arange(len(podios))[:, None], podios] = sistema.pesos_papeleta_completa(podios.shape[1])
+        finales = puntos[None, :] + simuladas @ puntos_podio
+        # Más puntos y, a igualdad, el primero (menor nombre)
+        ganadores = np.argmax(finales, axis=1)
+    probabilidades[:] = np.bincount(ganadores, minlength=num) / simulaciones
+    return probabilidades, orden, puntos
+
+
+def proyectar_premios(simulaciones=SIMULACIONES_POR_DEFECTO, semilla=None):
+    """
+    Proyección de todos los premios en Ronda 2. Para cada uno devuelve los
+    finalistas con su puntuación actual (según el sistema del premio) y
+    probabilidad de ganar, los votantes que faltan y si el ganador ya está
+    matemáticamente decidido.
+    """
+    premios = list(Premio.objects.filter(activo=True, estado='votacion_2').order_by('nombre'))
+    premio_ids = [p.pk for p in premios]
+    if not premio_ids:
+        return []
+
+    # Las papeletas ordenan a los finalistas por nombre: el índice menor gana los empates
+    papeletas = cargar_papeletas(premio_ids, 2, candidatos=_finalistas(premio_ids))
+    posiciones = matriz_posiciones(premio_ids, papeletas)
+    elegibles = Usuario.objects.filter(verificado=True, is_active=True).count()
+    rng = np.random.default_rng(semilla)
+
+    resultado = []
+    for i, premio in enumerate(premios):
+        votos = papeletas[premio.pk]
+        sistema = sistema_de(premio)
+        restantes = max(elegibles - len(votos), 0)
+        entrada = {
+            'premio_id': str(premio.pk),
+            'premio_nombre': premio.nombre,
+            'slug': premio.slug,
+            'sistema_puntuacion': premio.sistema_puntuacion,
+            'votantes': len(votos),
+            'votantes_restantes': restantes,
+            'decidido': False,
+            'finalistas': [],
+        }
+        if votos.num_candidatos:
+            probabilidades, orden, puntos = simular_premio(sistema, votos, restantes, simulaciones, rng)
+            lider = int(orden[0])
+            entrada['decidido'] = decidido(sistema, votos, puntos, restantes, lider)
+            entrada['finalistas'] = [
+                {
+                    'nominado_id': str(votos.candidatos[j]),
+                    'nombre': votos.nombres[j],
+                    'puntos': int(round(float(puntos[j]))),
+                    'posiciones': posiciones[i, j].tolist(),
+                    'probabilidad_victoria': round(float(probabilidades[j]), 4),
+                    'lider': j == lider,
+                }
+                for j in orden
+            ]
+        resultado.append(entrada)
+    return resultado
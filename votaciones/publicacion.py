@@ -0,0 +1,128 @@
+# gala_premios/votaciones/publicacion.py
+"""
+Resultados públicos como fichero estático inmutable.
+
+Al publicar resultados (ResultadosView.post o el paso de un premio a
+'finalizado') el documento de /api/resultados-publicos/ se renderiza una vez y
+se guarda como `resultados/resultados-<hash>.json` (con sus variantes .gz y
+.br) en RESULTADOS_PUBLICOS_DIR. El nombre incluye el hash del contenido, así
+que el fichero nunca cambia y se sirve con caché de larga duración: WhiteNoise
+lo sirve directamente si existía al arrancar (WHITENOISE_ROOT) y, si se ha
+escrito después, lo sirve ResultadosEstaticosView con las mismas cabeceras.
+
+El artefacto vigente se guarda en la caché junto con la versión de los datos;
+si los datos cambian por otra vía o el fichero no existe (p.ej. tras un
+despliegue), se vuelve a generar en la siguiente petición.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from .cache import codificaciones_aceptadas, comprimir_variantes, version_datos
+from .lectura import leer_resultados
+from .models import Premio
+from .renderers import ORJSONRenderer
+
+CLAVE_ARTEFACTO = 'gala:resultados_publicos:artefacto'
+SUBDIRECTORIO = 'resultados'
+PATRON_NOMBRE = re.compile(r'^resultados-(?P<huella>[0-9a-f]{16})\.json$')
+EXTENSIONES = {'br': '.br', 'gzip': '.gz'}
+ARTEFACTOS_CONSERVADOS = 10
+CACHE_INMUTABLE = 'max-age=315360000, public, immutable'
+# El endpoint de la API siempre revalida (barato: 304 con el ETag del contenido)
+CACHE_REVALIDAR = 'max-age=0, public, must-revalidate'
+
+
+def directorio():
+    return Path(settings.RESULTADOS_PUBLICOS_DIR) / SUBDIRECTORIO
+
+
+def premios_publicados():
+    return Premio.objects.filter(estado='finalizado', fecha_resultados_publicados__isnull=False).order_by('nombre')
+
+
+def _escribir(ruta, contenido):
+    """Escritura atómica: nunca se sirve un fichero a medio escribir."""
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as fichero:
+            fichero.write(contenido)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def _podar():
+    """Conserva solo los ARTEFACTOS_CONSERVADOS más recientes (los clientes pueden tener URLs antiguas)."""
+    artefactos = sorted(
+        (ruta for ruta in directorio().iterdir() if PATRON_NOMBRE.match(ruta.name)),
+        key=lambda ruta: ruta.stat().st_mtime, reverse=True,
+    )
+    for ruta in artefactos[ARTEFACTOS_CONSERVADOS:]:
+        for extension in ('', *EXTENSIONES.values()):
+            ruta.with_name(ruta.name + extension).unlink(missing_ok=True)
+
+
+def publicar_resultados():
+    """Renderiza el documento de resultados y escribe su fichero si no existía. Devuelve la entrada vigente."""
+    # La versión se lee antes de renderizar: si cambia mientras tanto, se regenerará
+    version = version_datos()
+    cuerpo = ORJSONRenderer().render(leer_resultados(premios_publicados()))
+    huella = hashlib.sha256(cuerpo).hexdigest()[:16]
+    nombre = f'resultados-{huella}.json'
+    ruta = directorio() / nombre
+    if not ruta.exists():
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        for codificacion, variante in comprimir_variantes(cuerpo).items():
+            _escribir(ruta.with_name(nombre + EXTENSIONES[codificacion]), variante)
+        # El JSON se escribe el último: si existe, sus variantes también
+        _escribir(ruta, cuerpo)
+        _podar()
+    entrada = {'version': version, 'nombre': nombre, 'huella': huella}
+    cache.set(CLAVE_ARTEFACTO, entrada, timeout=None)
+    return entrada
+
+
+def artefacto_actual():
+    """Entrada {'nombre', 'huella', ...} del fichero de resultados vigente (generándolo si hace falta)."""
+    entrada = cache.get(CLAVE_ARTEFACTO)
+    if entrada is None or entrada['version'] != version_datos() or not (directorio() / entrada['nombre']).exists():
+        entrada = publicar_resultados()
+    return entrada
+
+
+def respuesta_artefacto(request, nombre, cache_control):
+    """
+    Respuesta con el fichero `nombre` (variante comprimida según 'Accept-Encoding'),
+    ETag del contenido y 304 si el cliente ya lo tiene. None si no existe.
+    """
+    coincidencia = PATRON_NOMBRE.match(nombre)
+    ruta = directorio() / nombre
+    if coincidencia is None or not ruta.exists():
+        return None
+
+    etag = f'W/"{coincidencia["huella"]}"'
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+    else:
+        aceptadas, codificacion = codificaciones_aceptadas(request), None
+        for candidata in ('br', 'gzip'):
+            variante = ruta.with_name(nombre + EXTENSIONES[candidata])
+            if candidata in aceptadas and variante.exists():
+                ruta, codificacion = variante, candidata
+                break
+        response = HttpResponse(ruta.read_bytes(), content_type='application/json')
+        if codificacion:
+            response['Content-Encoding'] = codificacion
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,268 @@
+# gala_premios/votaciones/puntuacion.py
+"""
+Motor de puntuación de las rondas.
+
+Los votos de un premio en una ronda se cargan con una sola consulta como
+`Papeletas`: una matriz NumPy (votantes x posiciones) con el índice del
+candidato elegido en cada posición (-1 = vacía). Los candidatos se ordenan por
+nombre en la base de datos (order_by('nombre'), con su collation), de modo que
+el índice menor es el que gana los empates (el mismo desempate de siempre: más
+puntos y, a igualdad, orden alfabético, igual que los finalistas de VotarView).
+
+Sistemas de puntuación (Premio.sistema_puntuacion, solo Ronda 2; la Ronda 1
+es siempre un recuento de votos, es decir, aprobación):
+  - puntos_321: 3 puntos al oro, 2 a la plata y 1 al bronce.
+  - borda: Borda modificado; una papeleta con m candidatos da m puntos al
+    primero, m-1 al segundo... (las papeletas incompletas valen menos).
+  - aprobacion: 1 punto a cada candidato de la papeleta, sin importar la posición.
+  - irv: segunda vuelta instantánea; se elimina el candidato con menos
+    primeras preferencias y sus papeletas pasan a la siguiente preferencia
+    hasta que queda uno. Los "puntos" son los votos que tenía cada candidato
+    en la última vuelta en la que participó.
+
+`irv_ponderado` acepta pesos por papeleta en varias filas a la vez, lo que
+permite puntuar miles de escenarios simulados de una vez (proyeccion.py).
+"""
+import numpy as np
+
+from .models import Nominado, Voto
+
+VACIA = -1
+POSICIONES_RONDA = {1: 4, 2: 3}
+
+
+class Papeletas:
+    """Papeletas de un premio en una ronda. `matriz[v, k]` = índice del candidato en la posición k del votante v."""
+
+    def __init__(self, candidatos, nombres, matriz):
+        self.candidatos = list(candidatos)
+        self.nombres = list(nombres)
+        self.matriz = matriz
+
+    def __len__(self):
+        return len(self.matriz)
+
+    @property
+    def num_candidatos(self):
+        return len(self.candidatos)
+
+    @classmethod
+    def desde_filas(cls, filas, posiciones, candidatos=None):
+        """
+        Construye las papeletas a partir de filas (usuario, nominado, nombre, orden),
+        agrupadas por usuario. Sin `orden` (Ronda 1) los votos de cada usuario
+        se colocan en el orden en que llegan. `candidatos` [(id, nombre)] fija la
+        lista de candidatos en su orden de desempate y se ignoran los votos a
+        otros nominados; sin ella son los votados, en el orden en que aparecen.
+        """
+        if candidatos is None:
+            candidatos = list({nominado: (nominado, nombre) for _, nominado, nombre, _ in filas}.values())
+        indice = {nominado: i for i, (nominado, _) in enumerate(candidatos)}
+        filas = [f for f in filas if f[1] in indice]
+
+        votantes = {}
+        fila_votante = np.fromiter(
+            (votantes.setdefault(usuario, len(votantes)) for usuario, _, _, _ in filas), dtype=np.intp, count=len(filas)
+        )
+        candidato = np.fromiter((indice[f[1]] for f in filas), dtype=np.intp, count=len(filas))
+        orden = np.fromiter((f[3] or 0 for f in filas), dtype=np.intp, count=len(filas))
+        if len(filas) and not orden.any():
+            # Sin posiciones: cada voto ocupa la siguiente columna de su votante
+            # (las filas de un mismo usuario llegan seguidas)
+            inicio = np.zeros(len(filas), dtype=np.intp)
+            cambios = np.flatnonzero(np.diff(fila_votante)) + 1
+            inicio[cambios] = cambios
+            orden = np.arange(len(filas)) - np.maximum.accumulate(inicio) + 1
+        validos = (orden >= 1) & (orden <= posiciones)
+
+        matriz = np.full((len(votantes), posiciones), VACIA, dtype=np.int16)
+        matriz[fila_votante[validos], orden[validos] - 1] = candidato[validos]
+        return cls([c for c, _ in candidatos], [n for _, n in candidatos], matriz)
+
+    @classmethod
+    def cargar(cls, premio, ronda, candidatos=None, **filtros):
+        """Papeletas de `premio` en `ronda` (ver cargar_papeletas)."""
+        return cargar_papeletas([premio.pk], ronda, {premio.pk: candidatos} if candidatos else None, **filtros)[premio.pk]
+
+
+def cargar_papeletas(premio_ids, ronda, candidatos=None, **filtros):
+    """
+    {premio_id: Papeletas} para varios premios con una sola consulta de votos (`filtros`
+    se aplican a los votos) y otra para el orden de desempate de los candidatos.
+    """
+    filas = Voto.objects.filter(premio_id__in=premio_ids, ronda=ronda, **filtros)
+    if ronda == 2:
+        filas = filas.filter(orden_ronda2__in=[1, 2, 3])
+    por_premio = {pk: [] for pk in premio_ids}
+    for premio_id, *fila in filas.order_by('usuario_id', 'orden_ronda2', 'fecha_voto').values_list(
+        'premio_id', 'usuario_id', 'nominado_id', 'nominado__nombre', 'orden_ronda2'
+    ):
+        por_premio[premio_id].append(fila)
+    candidatos = candidatos or {}
+    orden = _orden_desempate(por_premio, candidatos)
+    resultado = {}
+    for pk, filas in por_premio.items():
+        lista = candidatos.get(pk) or {(f[1], f[2]) for f in filas}
+        resultado[pk] = Papeletas.desde_filas(
+            filas, POSICIONES_RONDA[ronda], sorted(lista, key=lambda c: orden[c[0]])
+        )
+    return resultado
+
+
+def _orden_desempate(por_premio, candidatos):
+    """
+    {nominado_id: posición} por nombre según la base de datos. Ordenar en Python
+    compararía códigos de carácter ('Álvaro' tras 'Zoe', minúsculas tras
+    mayúsculas), distinto del order_by('nominado__nombre') de los recuentos.
+    """
+    ids = {f[1] for filas in por_premio.values() for f in filas}
+    ids.update(nominado for lista in candidatos.values() for nominado, _ in lista)
+    if not ids:
+        return {}
+    ordenados = Nominado.objects.filter(pk__in=ids).order_by('nombre', 'pk').values_list('pk', flat=True)
+    return {pk: i for i, pk in enumerate(ordenados)}
+
+
+def _orden_por_puntos(puntos):
+    """Índices de mayor a menor puntuación; a igualdad, índice menor (nombre) primero."""
+    return np.lexsort((np.arange(len(puntos)), -np.asarray(puntos)))
+
+
+class SistemaPuntuacion:
+    """Sistema de puntuación de papeletas ordenadas."""
+    clave = None
+
+    def pesos(self, matriz):
+        """Puntos (float) que da cada casilla de la matriz de papeletas."""
+        raise NotImplementedError
+
+    def pesos_papeleta_completa(self, posiciones):
+        """Puntos por posición de una papeleta con `posiciones` candidatos (proyecciones)."""
+        return self.pesos(np.arange(posiciones)[None, :])[0]
+
+    def puntuar(self, papeletas):
+        """Vector de puntos por candidato."""
+        matriz = papeletas.matriz
+        ocupadas = matriz != VACIA
+        return np.bincount(
+            matriz[ocupadas].astype(np.intp), weights=self.pesos(matriz)[ocupadas], minlength=papeletas.num_candidatos
+        )
+
+    def clasificar(self, papeletas):
+        """(orden de los candidatos de primero a último, puntos por candidato)."""
+        puntos = self.puntuar(papeletas)
+        return _orden_por_puntos(puntos), puntos
+
+
+class PuntosPorPosicion(SistemaPuntuacion):
+    def __init__(self, clave, puntos):
+        self.clave = clave
+        self.puntos = np.asarray(puntos, dtype=np.float64)
+
+    def pesos(self, matriz):
+        return np.broadcast_to(self.puntos[:matriz.shape[1]], matriz.shape)
+
+
+class BordaModificado(SistemaPuntuacion):
+    clave = 'borda'
+
+    def pesos(self, matriz):
+        # m candidatos en la papeleta: m, m-1, ..., 1 (las casillas vacías no cuentan)
+        ocupadas = matriz != VACIA
+        m = ocupadas.sum(axis=1, keepdims=True)
+        return np.where(ocupadas, m - np.cumsum(ocupadas, axis=1) + 1, 0).astype(np.float64)
+
+
+class SegundaVueltaInstantanea(SistemaPuntuacion):
+    clave = 'irv'
+
+    def pesos_papeleta_completa(self, posiciones):
+        # Para cotas: una papeleta aporta como mucho un voto a un candidato
+        return np.ones(posiciones)
+
+    def clasificar(self, papeletas):
+        if not len(papeletas):
+            return _orden_por_puntos(np.zeros(papeletas.num_candidatos)), np.zeros(papeletas.num_candidatos)
+        unicas, cuentas = np.unique(papeletas.matriz, axis=0, return_counts=True)
+        orden, votos = irv_ponderado(unicas, cuentas[None, :].astype(np.float64), papeletas.num_candidatos)
+        return orden[0], votos[0]
+
+    def puntuar(self, papeletas):
+        return self.clasificar(papeletas)[1]
+
+
+def irv_ponderado(matriz, pesos, num_candidatos):
+    """
+    Segunda vuelta instantánea vectorizada sobre S escenarios.
+
+    `matriz` (B, P): papeletas distintas; `pesos` (S, B): cuántas papeletas de
+    cada tipo hay en cada escenario. Devuelve (orden (S, n) del ganador al
+    último eliminado, votos (S, n) en la última vuelta de cada candidato).
+    A igualdad de votos se elimina primero el de índice mayor.
+    """
+    escenarios = pesos.shape[0]
+    eliminado = np.zeros((escenarios, num_candidatos), dtype=bool)
+    votos_finales = np.zeros((escenarios, num_candidatos))
+    orden = np.empty((escenarios, num_candidatos), dtype=np.intp)
+    ocupadas = matriz != VACIA
+    indices = np.where(ocupadas, matriz, 0).astype(np.intp)
+    filas, tipos = np.arange(escenarios), np.arange(len(matriz))[None, :]
+
+    for vuelta in range(num_candidatos):
+        # Primera preferencia aún en juego de cada papeleta en cada escenario (S, B)
+        vigentes = ocupadas[None, :, :] & ~eliminado[:, indices]
+        primera = np.argmax(vigentes, axis=2)
+        tiene = vigentes.any(axis=2)
+        elegido = indices[tipos, primera]
+        votos = np.bincount(
+            (filas[:, None] * num_candidatos + elegido).ravel(),
+            weights=(pesos * tiene).ravel(),
+            minlength=escenarios * num_candidatos,
+        ).reshape(escenarios, num_candidatos)
+
+        candidatos = np.where(eliminado, np.inf, votos)
+        perdedor = num_candidatos - 1 - np.argmin(candidatos[:, ::-1], axis=1)
+        votos_finales[filas, perdedor] = votos[filas, perdedor]
+        eliminado[filas, perdedor] = True
+        orden[:, num_candidatos - 1 - vuelta] = perdedor
+    return orden, votos_finales
+
+
+APROBACION = PuntosPorPosicion('aprobacion', [1, 1, 1, 1])
+SISTEMAS_PUNTUACION = {
+    sistema.clave: sistema
+    for sistema in (
+        PuntosPorPosicion('puntos_321', [3, 2, 1]),
+        BordaModificado(),
+        APROBACION,
+        SegundaVueltaInstantanea(),
+    )
+}
+
+
+def sistema_de(premio, ronda=2):
+    """Sistema de puntuación que aplica a `premio` en `ronda` (la Ronda 1 es siempre un recuento)."""
+    if ronda == 1:
+        return APROBACION
+    return SISTEMAS_PUNTUACION[getattr(premio, 'sistema_puntuacion', None) or 'puntos_321']
+
+
+def clasificacion(premio, ronda=2, papeletas=None):
+    """
+    Clasificación de los nominados de `premio` en `ronda` con su sistema de
+    puntuación: lista de {'id', 'nombre', 'puntos'} del primero al último.
+    Solo aparecen los nominados con algún voto.
+    """
+    papeletas = papeletas if papeletas is not None else Papeletas.cargar(premio, ronda)
+    orden, puntos = sistema_de(premio, ronda).clasificar(papeletas)
+    presentes = np.zeros(papeletas.num_candidatos, dtype=bool)
+    presentes[papeletas.matriz[papeletas.matriz != VACIA].astype(np.intp)] = True
+    return [
+        {'id': papeletas.candidatos[i], 'nombre': papeletas.nombres[i], 'puntos': _numero(puntos[i])}
+        for i in orden if presentes[i]
+    ]
+
+
+def _numero(valor):
+    """Los puntos son enteros en todos los sistemas: se devuelven como int para el JSON."""
+    return int(round(float(valor)))
@@ -0,0 +1,88 @@
+# gala_premios/votaciones/renderers.py
+"""
+Renderers y parsers rápidos para la API.
+
+- ORJSONRenderer / ORJSONParser: JSON con `orjson`. UUIDs se codifican de
+  forma nativa; datetimes, Decimals y el resto de tipos se codifican igual que
+  el `JSONEncoder` de DRF, así que la salida es la misma que con el renderer
+  por defecto. Si `orjson` no está instalado se comportan como los de DRF.
+- MessagePackRenderer: respuesta en MessagePack (`Accept: application/msgpack`
+  o `?format=msgpack`). Requiere el paquete opcional `msgpack`.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+def _por_defecto(obj):
+    """
+    Tipos que orjson/msgpack no codifican por sí mismos (datetime, Decimal,
+    UUID en msgpack, cadenas lazy...): mismo criterio que el encoder de DRF.
+    """
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Renderer JSON basado en orjson, con la misma salida que el JSONRenderer de DRF."""
+
+    # Los datetimes pasan por el encoder de DRF (sufijo 'Z' para UTC)
+    opciones = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Con indentación (p.ej. el navegador de la API) se usa el renderer de DRF
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_por_defecto, option=self.opciones)
+        # Igual que DRF: escapar U+2028/U+2029 para que sea un subconjunto estricto de JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """Parser JSON basado en orjson (o el de DRF si no está disponible)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer MessagePack (binario, más compacto que JSON)."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise RuntimeError("MessagePackRenderer requiere el paquete 'msgpack'.")
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_por_defecto, use_bin_type=True)
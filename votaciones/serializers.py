@@ -1,12 +1,31 @@
 # votaciones/serializers.py (MODIFICADO)
 
 from rest_framework import serializers
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.password_validation import validate_password
-from .models import Usuario, Premio, Nominado, Voto, Sugerencia
+from .models import Usuario, Premio, Nominado, Voto, Sugerencia, TareaAdmin, normalizar_email
+from .elegibilidad import elegibilidad
 
 # --- Serializers para el Modelo Usuario ---
 
+def validar_email_libre(email, instancia=None):
+    """
+    Comprueba (con el índice sobre Lower(email)) que ningún otro usuario tenga
+    el mismo email sin distinguir mayúsculas. Una cuenta marcada como
+    duplicada puede conservar su email actual.
+    """
+    if not email:
+        return email
+    if instancia is not None and normalizar_email(instancia.email) == normalizar_email(email):
+        return email
+    otros = Usuario.objects.por_email(email)
+    if instancia is not None:
+        otros = otros.exclude(pk=instancia.pk)
+    if otros.exists():
+        raise serializers.ValidationError("Ya existe un usuario con este correo electrónico.")
+    return email
+
+
 class UsuarioSerializer(serializers.ModelSerializer):
     """
     Serializer para mostrar información pública de un usuario.
@@ -18,6 +37,9 @@ class UsuarioSerializer(serializers.ModelSerializer):
         # Campos de solo lectura en el perfil del usuario actual
         read_only_fields = ['id', 'username', 'verificado', 'is_staff']
 
+    def validate_email(self, value):
+        return validar_email_libre(value, self.instance)
+
 
 class AdminUsuarioSerializer(serializers.ModelSerializer):
     """
@@ -29,6 +51,9 @@ class AdminUsuarioSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'foto_perfil', 'foto_url', 'descripcion', 'verificado', 'is_staff', 'participante_tag']
         read_only_fields = ['id', 'username']
 
+    def validate_email(self, value):
+        return validar_email_libre(value, self.instance)
+
 class RegistroUsuarioSerializer(serializers.ModelSerializer):
     """
     Serializer para el registro de nuevos usuarios.
@@ -54,7 +79,8 @@ class RegistroUsuarioSerializer(serializers.ModelSerializer):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Las contraseñas no coinciden."})
 
-        if Usuario.objects.filter(email=attrs['email']).exists():
+        # Sin distinguir mayúsculas y usando el índice sobre Lower(email)
+        if Usuario.objects.por_email(attrs['email']).exists():
             raise serializers.ValidationError({"email": "Ya existe un usuario con este correo electrónico."})
 
         # Opcional: Validar que first_name y last_name no estén vacíos si los marcaste como required=True
@@ -68,7 +94,12 @@ class RegistroUsuarioSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password2')
 
-        user = Usuario.objects.create_user(**validated_data)
+        try:
+            with transaction.atomic():
+                user = Usuario.objects.create_user(**validated_data)
+        except IntegrityError:
+            # Otro registro con el mismo email ha ganado la carrera tras validate()
+            raise serializers.ValidationError({"email": "Ya existe un usuario con este correo electrónico."})
         return user
 
 
@@ -104,6 +135,32 @@ class NominadoSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'activo'] # 'premio' ya no es read_only, 'usuarios_vinculados' es write_only
 
+    def __init__(self, *args, expandir_usuarios=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sin expandir, los usuarios vinculados se devuelven solo como lista de IDs
+        if not expandir_usuarios:
+            self.fields['usuarios_vinculados_detalles'] = serializers.PrimaryKeyRelatedField(
+                source='usuarios_vinculados', many=True, read_only=True
+            )
+
+
+# --- Parámetros ?fields= / ?expand= ---
+
+def parametro_lista(request, nombre):
+    """
+    Devuelve el conjunto de valores de un parámetro tipo '?nombre=a,b,c',
+    o None si la petición no lo incluye.
+    """
+    if request is None or nombre not in request.query_params:
+        return None
+    valores = request.query_params.get(nombre, '')
+    return {v.strip() for v in valores.split(',') if v.strip()}
+
+
+def es_formato_compacto(request):
+    """True si el cliente pide la respuesta normalizada (?formato=compacto)."""
+    return request is not None and request.query_params.get('formato') == 'compacto'
+
 
 # --- Serializers para el Modelo Premio (DEFINIDO DESPUÉS DE NominadoSerializer) ---
 
@@ -116,20 +173,91 @@ class PremioSerializer(serializers.ModelSerializer):
     nominados_visible = serializers.SerializerMethodField()
 
     ya_votado_por_usuario = serializers.SerializerMethodField()
+    # Vínculos, votos y posiciones del usuario en la ronda actual (None para anónimos)
+    elegibilidad = serializers.SerializerMethodField()
+
+    # Relaciones anidadas que se pueden controlar con ?expand=
+    EXPANSIONES = ('nominados', 'usuarios')
 
     class Meta:
         model = Premio
         fields = '__all__'
 
-    def get_ya_votado_por_usuario(self, obj):
+    def __init__(self, *args, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        campos, expand_pedido = self.opciones_respuesta(request)
+        # 'expand' explícito (p.ej. el formato compacto) tiene prioridad sobre ?expand=
+        expand = expand_pedido if expand is None else set(expand)
+
+        # ?fields=a,b,c: solo se serializan (y calculan) los campos pedidos
+        if campos is not None:
+            for nombre in list(self.fields):
+                if nombre not in campos:
+                    self.fields.pop(nombre)
+
+        # ?expand=...: lo no expandido se devuelve como lista de IDs
+        self.expandir_nominados = 'nominados' in expand
+        self.expandir_usuarios = 'usuarios' in expand
+        if 'nominados' in self.fields:
+            if self.expandir_nominados:
+                self.fields['nominados'] = NominadoSerializer(
+                    many=True, read_only=True, expandir_usuarios=self.expandir_usuarios
+                )
+            else:
+                self.fields['nominados'] = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    @classmethod
+    def opciones_respuesta(cls, request):
+        """
+        Interpreta ?fields= y ?expand=. Sin ?expand se expande todo, como hasta ahora;
+        con ?expand (aunque sea vacío) solo se expanden las relaciones indicadas.
+        """
+        campos = parametro_lista(request, 'fields')
+        expand = parametro_lista(request, 'expand')
+        if expand is None:
+            expand = set(cls.EXPANSIONES)
+        return campos, expand & set(cls.EXPANSIONES)
+
+    @classmethod
+    def preparar_queryset(cls, queryset, request):
+        """
+        Añade al queryset solo las precargas que necesitan los campos pedidos,
+        para no consultar relaciones que no se van a devolver.
+        """
+        campos, expand = cls.opciones_respuesta(request)
+        incluye = lambda nombre: campos is None or nombre in campos
+        necesita_nominados = incluye('nominados') or incluye('nominados_visible')
+        if necesita_nominados:
+            if 'nominados' in expand or es_formato_compacto(request):
+                queryset = queryset.prefetch_related('nominados__usuarios_vinculados')
+            else:
+                queryset = queryset.prefetch_related('nominados')
+        if incluye('nominados_visible'):
+            queryset = queryset.select_related('ganador_oro')
+        return queryset
+
+    def _serializar_nominados(self, nominados):
+        if not self.expandir_nominados:
+            return [n.pk for n in nominados]
+        return NominadoSerializer(nominados, many=True, expandir_usuarios=self.expandir_usuarios).data
+
+    def _elegibilidad(self):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Voto.objects.filter(
-                usuario=request.user,
-                premio=obj,
-                ronda=obj.ronda_actual
-            ).exists()
-        return False
+        if not (request and request.user.is_authenticated):
+            return None
+        if '_elegibilidad' not in self.context:
+            # Una sola lectura por respuesta (el contexto se comparte entre los premios de la lista)
+            self.context['_elegibilidad'] = elegibilidad(request.user)
+        return self.context['_elegibilidad']
+
+    def get_ya_votado_por_usuario(self, obj):
+        datos = self._elegibilidad()
+        return datos is not None and datos.ha_votado(obj.pk, obj.ronda_actual)
+
+    def get_elegibilidad(self, obj):
+        datos = self._elegibilidad()
+        return datos.por_premio(obj.pk, obj.ronda_actual) if datos is not None else None
     
     def get_nominados_con_votos(self, obj):
         nominados = obj.nominados.all().order_by('nombre')
@@ -144,7 +272,7 @@ class PremioSerializer(serializers.ModelSerializer):
         """
         # Resultados definitivos (estado finalizado)
         if obj.estado == 'finalizado' and obj.ganador_oro:
-            return NominadoSerializer([obj.ganador_oro], many=True).data
+            return self._serializar_nominados([obj.ganador_oro])
 
         # En R2: mostrar top 4 de R1
         if obj.estado == 'votacion_2':
@@ -156,14 +284,64 @@ class PremioSerializer(serializers.ModelSerializer):
                 .order_by('-total', 'nominado__nombre')[:4]
             )
             ids = [row['nominado'] for row in qs]
-            nominados = list(Nominado.objects.filter(id__in=ids))
+            nominados = Nominado.objects.filter(id__in=ids)
+            if self.expandir_nominados:
+                nominados = nominados.prefetch_related('usuarios_vinculados')
+            nominados = list(nominados)
             # conservar orden por total desc
             ordered = sorted(nominados, key=lambda n: ids.index(n.id))
-            return NominadoSerializer(ordered, many=True).data
+            return self._serializar_nominados(ordered)
 
         # En R1 y resto de estados: mostrar todos los nominados activos
-        nominados = obj.nominados.all().order_by('nombre')
-        return NominadoSerializer(nominados, many=True).data
+        # (el orden por nombre es el del Meta, así se aprovecha la precarga)
+        nominados = obj.nominados.all()
+        return self._serializar_nominados(nominados)
+
+def serializar_premios_compacto(premios, context):
+    """
+    Formato compacto (normalizado) para los listados de premios.
+
+    Cada nominado y cada usuario aparece una sola vez en los diccionarios
+    'nominados' y 'usuarios' (indexados por id); los premios y los nominados
+    solo guardan los IDs a los que hacen referencia:
+
+        {"premios": [...], "nominados": {id: {...}}, "usuarios": {id: {...}}}
+    """
+    premios = list(premios)
+    datos_premios = PremioSerializer(premios, many=True, context=context, expand=()).data
+
+    # Nominados ya cargados (precarga de 'nominados' + ganador_oro)
+    disponibles = {}
+    for premio in premios:
+        for nominado in premio.nominados.all():
+            disponibles[nominado.pk] = nominado
+        if premio.ganador_oro_id and premio.ganador_oro_id not in disponibles:
+            disponibles[premio.ganador_oro_id] = premio.ganador_oro
+
+    referenciados = []
+    vistos = set()
+    for datos in datos_premios:
+        for nominado_id in list(datos.get('nominados', [])) + list(datos.get('nominados_visible', [])):
+            if nominado_id not in vistos:
+                vistos.add(nominado_id)
+                referenciados.append(nominado_id)
+    faltan = [pk for pk in referenciados if pk not in disponibles]
+    if faltan:
+        disponibles.update(Nominado.objects.prefetch_related('usuarios_vinculados').in_bulk(faltan))
+    nominados = [disponibles[pk] for pk in referenciados if pk in disponibles]
+
+    usuarios = {}
+    for nominado in nominados:
+        for usuario in nominado.usuarios_vinculados.all():
+            usuarios.setdefault(usuario.pk, usuario)
+
+    datos_nominados = NominadoSerializer(nominados, many=True, context=context, expandir_usuarios=False).data
+    datos_usuarios = UsuarioSerializer(list(usuarios.values()), many=True, context=context).data
+    return {
+        'premios': datos_premios,
+        'nominados': {str(n['id']): n for n in datos_nominados},
+        'usuarios': {str(u['id']): u for u in datos_usuarios},
+    }
 
 # --- Serializer para el Modelo Voto ---
 
@@ -284,4 +462,23 @@ class MisNominacionSerializer(serializers.ModelSerializer):
 
     def get_es_activo(self, obj: Nominado):
         # Activo si el premio está en alguna fase de votación
-        return obj.premio.estado in ['votacion_1', 'votacion_2']
\ No newline at end of file
+        return obj.premio.estado in ['votacion_1', 'votacion_2']
+
+
+# --- Serializer para las tareas de administración en segundo plano ---
+class TareaAdminSerializer(serializers.ModelSerializer):
+    progreso = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TareaAdmin
+        fields = ['id', 'tipo', 'estado', 'procesados', 'total', 'progreso', 'mensaje', 'fecha_creacion', 'fecha_fin']
+        read_only_fields = fields
+
+    def get_progreso(self, obj: TareaAdmin):
+        # Porcentaje completado (None si aún no se conoce el total)
+        if obj.estado == 'completada':
+            return 100
+        if not obj.total:
+            return None
+        return round(obj.procesados * 100 / obj.total, 1)
+
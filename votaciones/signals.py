@@ -0,0 +1,100 @@
+# gala_premios/votaciones/signals.py
+"""
+Invalidación de la caché de respuestas públicas (y de la edición vigente y la
+elegibilidad de voto de cada usuario) cuando cambian los datos, agrupación de sugerencias casi duplicadas y
+sincronización de la tabla de ganadores históricos.
+"""
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidar_datos, invalidar_mapa_slugs
+from .elegibilidad import invalidar_elegibilidad
+from .historico import sincronizar_ganadores
+from .models import CLAVE_CACHE_EDICION, ConfiguracionSistema, Nominado, Premio, Sugerencia, Usuario, Voto
+from .similitud import registrar_sugerencia
+
+
+@receiver(post_save, sender=Premio)
+@receiver(post_delete, sender=Premio)
+def invalidar_cache_premio(sender, instance, **kwargs):
+    invalidar_mapa_slugs()
+    invalidar_datos(premios=[instance.pk])
+
+
+@receiver(post_save, sender=Premio)
+def sincronizar_ganadores_historicos(sender, instance, update_fields=None, **kwargs):
+    # Solo si puede haber cambiado el JSON (las filas se borran en cascada con el premio)
+    if update_fields is None or 'ganadores_historicos' in update_fields:
+        sincronizar_ganadores(instance)
+
+
+@receiver(post_save, sender=Nominado)
+@receiver(post_delete, sender=Nominado)
+# Los votos nuevos no cambian ninguna respuesta pública cacheada (las de premios
+# solo se cachean para anónimos y los resultados salen de los ganadores guardados);
+# borrar votos sí puede cambiar los finalistas visibles de la ronda 2.
+@receiver(post_delete, sender=Voto)
+def invalidar_cache_del_premio(sender, instance, **kwargs):
+    invalidar_datos(premios=[instance.premio_id])
+
+
+@receiver(post_save, sender=Voto)
+@receiver(post_delete, sender=Voto)
+def invalidar_elegibilidad_votante(sender, instance, **kwargs):
+    invalidar_elegibilidad(usuarios=[instance.usuario_id])
+
+
+@receiver(post_save, sender=Nominado)
+@receiver(post_delete, sender=Nominado)
+def invalidar_elegibilidad_nominado(sender, instance, created=False, **kwargs):
+    # Al borrarlo (o cambiarlo de premio) no se sabe qué usuarios estaban vinculados
+    if not created:
+        invalidar_elegibilidad()
+
+
+@receiver(post_save, sender=ConfiguracionSistema)
+@receiver(post_delete, sender=Usuario)
+def invalidar_cache_publica(sender, **kwargs):
+    invalidar_datos()
+
+
+@receiver(post_save, sender=Usuario)
+def invalidar_cache_usuario(sender, update_fields=None, **kwargs):
+    # Los inicios de sesión solo tocan 'last_login' y no afectan a las respuestas públicas
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_datos()
+
+
+@receiver(m2m_changed, sender=Nominado.usuarios_vinculados.through)
+def invalidar_cache_vinculos(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        invalidar_elegibilidad(usuarios=[instance.pk])
+    elif pk_set:
+        invalidar_elegibilidad(usuarios=pk_set)
+    else:
+        # post_clear desde el nominado no indica qué usuarios tenía
+        invalidar_elegibilidad()
+    if not reverse:
+        invalidar_datos(premios=[instance.premio_id])
+    elif pk_set:
+        # Desde el lado del usuario: pk_set son los nominados afectados
+        invalidar_datos(premios=Nominado.objects.filter(pk__in=pk_set).values_list('premio_id', flat=True))
+    else:
+        # post_clear desde el usuario no indica qué nominados tenía
+        invalidar_datos()
+
+
+@receiver(post_save, sender=ConfiguracionSistema)
+def invalidar_cache_edicion(sender, **kwargs):
+    cache.delete(CLAVE_CACHE_EDICION)
+
+
+@receiver(post_save, sender=Sugerencia)
+def agrupar_sugerencia(sender, instance, raw=False, **kwargs):
+    # Firma MinHash y grupo de similares (no hace nada si el contenido no cambia)
+    if not raw:
+        registrar_sugerencia(instance)
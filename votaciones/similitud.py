@@ -0,0 +1,145 @@
+# gala_premios/votaciones/similitud.py
+"""
+Detección incremental de sugerencias casi duplicadas con MinHash + LSH.
+
+Cada sugerencia se resume al guardarse en una firma MinHash de sus 4-gramas de
+caracteres (texto normalizado: minúsculas, sin tildes ni signos). La firma se
+parte en bandas y cada banda se guarda como una cubeta (CubetaSugerencia).
+Al llegar una sugerencia nueva solo se comparan las que comparten alguna
+cubeta con ella (una consulta indexada), en lugar de todas contra todas; la
+similitud de Jaccard se estima con las firmas y la sugerencia se une al grupo
+de la más parecida si supera UMBRAL_SIMILITUD.
+
+Con BANDAS x FILAS_POR_BANDA = 20 x 3, dos textos con Jaccard 0.5 comparten
+alguna cubeta con probabilidad ~0.93, y con Jaccard 0.2 solo ~0.15.
+"""
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import CubetaSugerencia, Sugerencia
+
+TAMANO_SHINGLE = 4
+BANDAS = 20
+FILAS_POR_BANDA = 3
+NUM_PERMUTACIONES = BANDAS * FILAS_POR_BANDA
+UMBRAL_SIMILITUD = 0.5
+
+_PRIMO = (1 << 61) - 1
+# Permutaciones fijas: las firmas guardadas deben seguir siendo comparables
+_aleatorio = random.Random(20240611)
+_PERMUTACIONES = [
+    (_aleatorio.randrange(1, _PRIMO), _aleatorio.randrange(0, _PRIMO))
+    for _ in range(NUM_PERMUTACIONES)
+]
+_FORMATO_FIRMA = f'>{NUM_PERMUTACIONES}Q'
+_NO_PALABRA = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con los signos y espacios reducidos a un espacio."""
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return _NO_PALABRA.sub(' ', texto.lower()).strip()
+
+
+def _hash64(datos):
+    return int.from_bytes(hashlib.blake2b(datos, digest_size=8).digest(), 'big')
+
+
+def firma_minhash(texto):
+    """Tupla de NUM_PERMUTACIONES enteros (mínimo de cada permutación sobre los shingles)."""
+    texto = normalizar(texto)
+    if len(texto) <= TAMANO_SHINGLE:
+        shingles = {texto}
+    else:
+        shingles = {texto[i:i + TAMANO_SHINGLE] for i in range(len(texto) - TAMANO_SHINGLE + 1)}
+    hashes = [_hash64(shingle.encode('utf-8')) for shingle in shingles]
+    return tuple(min((a * h + b) % _PRIMO for h in hashes) for a, b in _PERMUTACIONES)
+
+
+def firma_a_bytes(firma):
+    return struct.pack(_FORMATO_FIRMA, *firma)
+
+
+def firma_desde_bytes(datos):
+    return struct.unpack(_FORMATO_FIRMA, bytes(datos))
+
+
+def cubetas(firma):
+    """Valor de cubeta (entero de 64 bits con signo) de cada banda de la firma."""
+    valores = []
+    for banda in range(BANDAS):
+        filas = firma[banda * FILAS_POR_BANDA:(banda + 1) * FILAS_POR_BANDA]
+        resumen = hashlib.blake2b(struct.pack(f'>{FILAS_POR_BANDA}Q', *filas), digest_size=8).digest()
+        valores.append(int.from_bytes(resumen, 'big', signed=True))
+    return valores
+
+
+def similitud_estimada(firma_a, firma_b):
+    """Estimación de la similitud de Jaccard: fracción de posiciones iguales."""
+    return sum(1 for a, b in zip(firma_a, firma_b) if a == b) / NUM_PERMUTACIONES
+
+
+def registrar_sugerencia(sugerencia, forzar=False):
+    """
+    Calcula y guarda la firma y las cubetas de la sugerencia y la asigna a un
+    grupo. No hace nada si el contenido no ha cambiado (salvo con `forzar`).
+    Devuelve el id del grupo.
+    """
+    firma = firma_minhash(sugerencia.contenido)
+    datos = firma_a_bytes(firma)
+    actual = sugerencia.firma_minhash
+    if not forzar and actual is not None and bytes(actual) == datos and sugerencia.grupo is not None:
+        return sugerencia.grupo
+
+    valores = cubetas(firma)
+    with transaction.atomic():
+        CubetaSugerencia.objects.filter(sugerencia=sugerencia).delete()
+        CubetaSugerencia.objects.bulk_create([
+            CubetaSugerencia(sugerencia=sugerencia, banda=banda, valor=valor)
+            for banda, valor in enumerate(valores)
+        ])
+
+        filtro = Q()
+        for banda, valor in enumerate(valores):
+            filtro |= Q(banda=banda, valor=valor)
+        candidatas = (
+            CubetaSugerencia.objects.filter(filtro).exclude(sugerencia=sugerencia)
+            .values_list('sugerencia_id', flat=True).distinct()
+        )
+        # Se une al grupo de la candidata más parecida. No se fusionan grupos: con
+        # enlace simple, una sugerencia "puente" acabaría juntando temas distintos.
+        grupo, mejor = sugerencia.pk, UMBRAL_SIMILITUD
+        for pk, firma_otra, grupo_otra in Sugerencia.objects.filter(pk__in=candidatas).values_list(
+            'pk', 'firma_minhash', 'grupo'
+        ):
+            if firma_otra is None:
+                continue
+            similitud = similitud_estimada(firma, firma_desde_bytes(firma_otra))
+            if similitud >= mejor:
+                grupo, mejor = grupo_otra or pk, similitud
+        Sugerencia.objects.filter(pk=sugerencia.pk).update(firma_minhash=datos, grupo=grupo)
+    sugerencia.firma_minhash, sugerencia.grupo = datos, grupo
+    return grupo
+
+
+def reagrupar_todas(tamano_lote=500):
+    """
+    Recalcula firmas y grupos de todas las sugerencias, de la más antigua a la
+    más reciente (para sugerencias creadas sin señales, p.ej. con bulk_create).
+    Devuelve el número de sugerencias procesadas.
+    """
+    # Sin firma, las aún no procesadas no cuentan como candidatas
+    Sugerencia.objects.update(grupo=None, firma_minhash=None)
+    procesadas = 0
+    pendientes = Sugerencia.objects.order_by('fecha_sugerencia', 'pk').only('pk', 'contenido')
+    for sugerencia in pendientes.iterator(chunk_size=tamano_lote):
+        sugerencia.firma_minhash = sugerencia.grupo = None
+        registrar_sugerencia(sugerencia)
+        procesadas += 1
+    return procesadas
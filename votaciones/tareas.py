@@ -0,0 +1,73 @@
+# gala_premios/votaciones/tareas.py
+"""
+Ejecución de tareas de administración en segundo plano.
+
+No usamos una cola externa: la tarea se lanza en un hilo del propio proceso y su
+estado se guarda en `TareaAdmin`, de modo que cualquier worker puede consultarlo.
+Con TAREAS_EN_SEGUNDO_PLANO=False (p.ej. en comandos o tests) se ejecuta en línea.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import TareaAdmin
+
+logger = logging.getLogger(__name__)
+
+
+def actualizar_progreso(tarea, procesados, total=None, mensaje=None):
+    """Guarda el progreso de la tarea (si hay tarea asociada)."""
+    if tarea is None:
+        return
+    tarea.procesados = procesados
+    campos = ['procesados']
+    if total is not None:
+        tarea.total = total
+        campos.append('total')
+    if mensaje is not None:
+        tarea.mensaje = mensaje
+        campos.append('mensaje')
+    tarea.save(update_fields=campos)
+
+
+def _ejecutar(tarea_id, funcion, args, kwargs):
+    close_old_connections()
+    tarea = TareaAdmin.objects.get(pk=tarea_id)
+    try:
+        tarea.estado = 'en_curso'
+        tarea.save(update_fields=['estado'])
+        mensaje = funcion(tarea, *args, **kwargs)
+        tarea.estado = 'completada'
+        if mensaje:
+            tarea.mensaje = mensaje
+    except Exception as e:
+        logger.exception("Error en la tarea %s (%s)", tarea.pk, tarea.tipo)
+        tarea.estado = 'error'
+        tarea.mensaje = str(e)
+    tarea.fecha_fin = timezone.now()
+    tarea.save(update_fields=['estado', 'mensaje', 'fecha_fin'])
+    return tarea
+
+
+def lanzar_tarea(tipo, funcion, *args, **kwargs):
+    """
+    Crea la `TareaAdmin` y ejecuta `funcion(tarea, *args, **kwargs)`.
+    La función puede devolver un mensaje final que se guarda en la tarea.
+    """
+    tarea = TareaAdmin.objects.create(tipo=tipo)
+    if not getattr(settings, 'TAREAS_EN_SEGUNDO_PLANO', True):
+        return _ejecutar(tarea.pk, funcion, args, kwargs)
+
+    def objetivo():
+        try:
+            _ejecutar(tarea.pk, funcion, args, kwargs)
+        finally:
+            connection.close()
+
+    hilo = threading.Thread(target=objetivo, name=f"tarea-{tipo}-{tarea.pk}", daemon=True)
+    # Si estamos dentro de una transacción, la tarea arranca cuando se confirme
+    transaction.on_commit(hilo.start)
+    return tarea
@@ -1,3 +1,145 @@
+from django.db.models import Case, Count, IntegerField, Sum, When
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
 
-# Create your tests here.
+from .lectura import leer_premios, leer_resultados, leer_usuarios
+from .management.commands.benchmark import crear_datos_realistas
+from .models import Nominado, Premio, Usuario, Voto
+from .puntuacion import clasificacion
+from .serializers import PremioSerializer, ResultadosPremioSerializer, UsuarioSerializer
+
+
+class ParidadLecturaRapidaTests(TestCase):
+    """
+    La lectura rápida (lectura.py) debe producir el mismo JSON, byte a byte,
+    que los serializers de DRF a los que sustituye.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        usuarios, _ = crear_datos_realistas(n_usuarios=6, n_premios=6, n_nominados=4)
+        # Un participante con foto subida para cubrir las URLs absolutas de ficheros
+        usuarios[0].foto_perfil = 'perfiles/participante0.jpg'
+        usuarios[0].save()
+        cls.votante = usuarios[1]
+
+    def setUp(self):
+        self.premios = Premio.objects.filter(activo=True).order_by('nombre')
+        self.renderer = JSONRenderer()
+
+    def _request(self, ruta, usuario=None):
+        peticion = APIRequestFactory().get(ruta, HTTP_HOST='localhost')
+        if usuario is not None:
+            force_authenticate(peticion, user=usuario)
+        vista = APIView()
+        vista.permission_classes = []
+        request = vista.initialize_request(peticion)
+        vista.initial(request)
+        return request
+
+    def assertMismoJSON(self, drf, rapido):
+        self.assertEqual(self.renderer.render(drf), self.renderer.render(rapido))
+
+    def _comparar_premios(self, ruta, usuario=None):
+        request = self._request(ruta, usuario)
+        queryset = PremioSerializer.preparar_queryset(self.premios, request)
+        drf = PremioSerializer(queryset, many=True, context={'request': request}).data
+        self.assertTrue(drf)
+        self.assertMismoJSON(drf, leer_premios(self.premios, request))
+
+    def test_premios_anonimo(self):
+        self._comparar_premios('/api/premios-todos/')
+
+    def test_premios_autenticado(self):
+        self._comparar_premios('/api/premios-todos/', self.votante)
+
+    def test_premios_expand(self):
+        for expand in ('', 'nominados', 'usuarios', 'nominados,usuarios'):
+            with self.subTest(expand=expand):
+                self._comparar_premios(f'/api/premios-todos/?expand={expand}', self.votante)
+
+    def test_premios_fields(self):
+        for campos in (
+            'id,nombre,nominados_visible',
+            'id,nominados',
+            'id,ya_votado_por_usuario,elegibilidad',
+            'nombre,ganadores_historicos,fecha_resultados_publicados',
+        ):
+            for usuario in (None, self.votante):
+                with self.subTest(fields=campos, autenticado=usuario is not None):
+                    self._comparar_premios(f'/api/premios-todos/?fields={campos}', usuario)
+
+    def test_premios_fields_y_expand(self):
+        self._comparar_premios('/api/premios-todos/?fields=id,nominados,nominados_visible&expand=nominados', self.votante)
+
+    def test_resultados(self):
+        publicados = Premio.objects.filter(
+            estado='finalizado', fecha_resultados_publicados__isnull=False
+        ).order_by('nombre')
+        drf = ResultadosPremioSerializer(publicados, many=True).data
+        self.assertTrue(drf)
+        self.assertMismoJSON(drf, leer_resultados(publicados))
+
+    def test_usuarios(self):
+        participantes = Usuario.objects.filter(verificado=True).order_by('username')
+        self.assertMismoJSON(UsuarioSerializer(participantes, many=True).data, leer_usuarios(participantes))
+
+
+class DesempatePuntuacionTests(TestCase):
+    """
+    El motor de puntuación debe clasificar como los recuentos SQL a los que
+    sustituye: más puntos y, a igualdad, order_by('nominado__nombre') con la
+    collation de la base de datos (tildes y minúsculas incluidas).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.premio = Premio.objects.create(nombre='Premio desempate', estado='votacion_2', ronda_actual=2)
+        nominados = {
+            nombre: Nominado.objects.create(nombre=nombre, premio=cls.premio)
+            for nombre in ('Beatriz', 'Álvaro', 'alberto', 'Carla', 'zoe')
+        }
+        papeletas = [
+            ('Beatriz', 'Álvaro', 'alberto'),
+            ('Álvaro', 'alberto', 'Beatriz'),
+            ('alberto', 'Beatriz', 'Álvaro'),
+            ('zoe', 'Carla'),
+            ('Carla', 'zoe'),
+        ]
+        votos = []
+        for i, papeleta in enumerate(papeletas):
+            usuario = Usuario.objects.create_user(username=f'votante{i}', verificado=True)
+            for orden, nombre in enumerate(papeleta, start=1):
+                nominado = nominados[nombre]
+                votos.append(Voto(usuario=usuario, premio=cls.premio, nominado=nominado, ronda=1))
+                votos.append(Voto(usuario=usuario, premio=cls.premio, nominado=nominado, ronda=2, orden_ronda2=orden))
+        # bulk_create: sin las validaciones de fase de Voto.save()
+        Voto.objects.bulk_create(votos)
+
+    def _clasificacion_sql(self, ronda):
+        votos = Voto.objects.filter(premio=self.premio, ronda=ronda).values('nominado_id', 'nominado__nombre')
+        if ronda == 1:
+            votos = votos.annotate(puntos_totales=Count('id'))
+        else:
+            votos = votos.annotate(puntos_totales=Sum(Case(
+                When(orden_ronda2=1, then=3),
+                When(orden_ronda2=2, then=2),
+                When(orden_ronda2=3, then=1),
+                default=0,
+                output_field=IntegerField(),
+            )))
+        return [
+            {'id': v['nominado_id'], 'nombre': v['nominado__nombre'], 'puntos': v['puntos_totales']}
+            for v in votos.order_by('-puntos_totales', 'nominado__nombre')
+        ]
+
+    def test_ronda2_podio_puntos_y_desempate(self):
+        esperado = self._clasificacion_sql(2)
+        # Tres empatados a 6 puntos en el podio y dos a 5: el orden lo decide solo el nombre
+        self.assertEqual([c['puntos'] for c in esperado], [6, 6, 6, 5, 5])
+        self.assertEqual(clasificacion(self.premio, 2), esperado)
+
+    def test_ronda1_desempate(self):
+        self.assertEqual(clasificacion(self.premio, 1), self._clasificacion_sql(1))
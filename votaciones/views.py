@@ -5,23 +5,49 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.generics import RetrieveUpdateAPIView, CreateAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
 
-from django.db.models import Sum, Case, When, F, Count 
-from django.db import transaction
+from django.db.models import Count
+from django.db import IntegrityError, transaction
 from django.utils import timezone # Para la fecha de publicación de resultados
 from django.conf import settings
+from django.urls import reverse
 
 from .serializers import (
     RegistroUsuarioSerializer, UsuarioSerializer, AdminUsuarioSerializer,
     PremioSerializer, VotoSerializer, NominadoSerializer, SugerenciaSerializer,
-    ResultadosPremioSerializer, MisNominacionSerializer
+    ResultadosPremioSerializer, MisNominacionSerializer,
+    es_formato_compacto, serializar_premios_compacto
 )
 from .models import Usuario, Premio, Nominado, Voto, Sugerencia
+from .paginacion import KeysetPagination
+from .cache import premio_por_slug, respuesta_cacheada, version_premio
+from .elegibilidad import elegibilidad
+from .historico import salon_de_la_fama, victorias
+from .lectura import leer_premios, leer_resultados, leer_usuarios
+from .puntuacion import cargar_papeletas, clasificacion
+from .publicacion import (
+    CACHE_INMUTABLE, CACHE_REVALIDAR, artefacto_actual, premios_publicados, publicar_resultados,
+    respuesta_artefacto,
+)
 
 # Google token verification
 from google.oauth2 import id_token as google_id_token
 from google.auth.transport import requests as google_requests
 
 from django.utils.crypto import get_random_string
+from django.contrib.auth.models import update_last_login
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+
+# Login con usuario y contraseña: devuelve el token DRF y registra el inicio de sesión
+class ObtenerTokenView(ObtainAuthToken):
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user)
+        # last_login marca el token como en uso para `limpiar_sesiones`
+        update_last_login(None, user)
+        return Response({'token': token.key})
 
 # Vista para el registro de nuevos usuarios
 class RegistroUsuarioView(APIView):
@@ -84,8 +110,9 @@ class GoogleAuthView(APIView):
             if not email:
                 return Response({"detail": "Token sin email"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Find or create user
-            user = Usuario.objects.filter(email=email).first()
+            # Find or create user (sin distinguir mayúsculas, con el índice sobre Lower(email));
+            # si hay cuentas duplicadas de antes de la restricción, gana la original
+            user = Usuario.objects.por_email(email).order_by('email_duplicado', 'date_joined').first()
             if not user:
                 # Generate a username from email
                 base_username = email.split('@')[0]
@@ -95,17 +122,25 @@ class GoogleAuthView(APIView):
                     username_candidate = f"{base_username}{suffix}"
                     suffix += 1
 
-                user = Usuario.objects.create_user(
-                    username=username_candidate,
-                    email=email,
-                    first_name=given_name,
-                    last_name=family_name,
-                    password = get_random_string(12)  # longitud 12, puedes cambiarla
-                )
+                try:
+                    with transaction.atomic():
+                        user = Usuario.objects.create_user(
+                            username=username_candidate,
+                            email=email,
+                            first_name=given_name,
+                            last_name=family_name,
+                            password = get_random_string(12)  # longitud 12, puedes cambiarla
+                        )
+                except IntegrityError:
+                    # Otra petición ha creado la cuenta con este email a la vez
+                    user = Usuario.objects.por_email(email).order_by('email_duplicado', 'date_joined').first()
+                    if user is None:
+                        raise
 
             # Issue DRF token
-            from rest_framework.authtoken.models import Token
             token, _ = Token.objects.get_or_create(user=user)
+            # last_login marca el token como en uso para `limpiar_sesiones`
+            update_last_login(None, user)
 
             user_data = UsuarioSerializer(user).data
             return Response({"token": token.key, "user": user_data}, status=status.HTTP_200_OK)
@@ -119,22 +154,46 @@ class ListaPremiosView(APIView):
     # pero es buena práctica especificarlo explícitamente para claridad.
     permission_classes = [AllowAny]
 
+    @respuesta_cacheada(solo_anonimos=True)
     def get(self, request):
         # Filtramos solo los premios que están activos y en fase de votación
         # (votacion_1 o votacion_2)
         premios = Premio.objects.filter(activo=True, estado__in=['votacion_1', 'votacion_2']).order_by('nombre')
-        # Pasamos el contexto de la request al serializer para que 'ya_votado_por_usuario' funcione
-        serializer = PremioSerializer(premios, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if es_formato_compacto(request):
+            # Solo se precargan las relaciones que pide el cliente (?fields= / ?expand=)
+            premios = PremioSerializer.preparar_queryset(premios, request)
+            return Response(serializar_premios_compacto(premios, {'request': request}), status=status.HTTP_200_OK)
+        # Lectura rápida con values(): misma salida que PremioSerializer (incluido 'ya_votado_por_usuario')
+        return Response(leer_premios(premios, request), status=status.HTTP_200_OK)
 
 class ListaTodosPremiosView(APIView):
     permission_classes = [AllowAny]
 
+    @respuesta_cacheada(solo_anonimos=True)
     def get(self, request):
         # Lista todos los premios activos, independientemente del estado
         premios = Premio.objects.filter(activo=True).order_by('nombre')
-        serializer = PremioSerializer(premios, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if es_formato_compacto(request):
+            premios = PremioSerializer.preparar_queryset(premios, request)
+            return Response(serializar_premios_compacto(premios, {'request': request}), status=status.HTTP_200_OK)
+        return Response(leer_premios(premios, request), status=status.HTTP_200_OK)
+
+def _version_detalle_premio(view, request, slug):
+    premio_id = premio_por_slug(slug)
+    return f"premio:{version_premio(premio_id)}" if premio_id else None
+
+# Detalle de un premio activo por su slug (con sus nominados)
+class DetallePremioView(APIView):
+    permission_classes = [AllowAny]
+
+    # Cada premio tiene su propia versión en caché: editar otro premio no invalida este
+    @respuesta_cacheada(solo_anonimos=True, version=_version_detalle_premio)
+    def get(self, request, slug):
+        premio_id = premio_por_slug(slug)
+        datos = leer_premios(Premio.objects.filter(pk=premio_id, activo=True), request) if premio_id else []
+        if not datos:
+            return Response({"detail": "Premio no encontrado.", "code": "premio_not_found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos[0], status=status.HTTP_200_OK)
 
 # Vista para emitir un voto
 class VotarView(APIView):
@@ -154,9 +213,11 @@ class VotarView(APIView):
             nominado = validated_data['nominado']
             ronda = validated_data.get('ronda', 1)
             orden_ronda2 = validated_data.get('orden_ronda2', None)
+            # Vínculos y votos ya emitidos del usuario (caché por usuario, ver elegibilidad.py)
+            datos = elegibilidad(request.user)
 
             # 1. No auto-voto
-            if nominado.usuarios_vinculados.filter(id=request.user.id).exists():
+            if datos.vinculado(nominado.pk):
                 return Response({"detail": "No puedes votarte a ti mismo en ninguna ronda.", "code": "self_vote_forbidden"}, status=status.HTTP_400_BAD_REQUEST)
 
             # 2. Premio abierto y en ronda correcta
@@ -168,12 +229,12 @@ class VotarView(APIView):
                 return Response({"detail": "El nominado seleccionado no pertenece a este premio.", "code": "nominado_mismatch"}, status=status.HTTP_400_BAD_REQUEST)
 
             # 4. Lógica por ronda
-            existing_votes = Voto.objects.filter(usuario=request.user, premio=premio, ronda=ronda)
+            votados = datos.votados(premio.pk, ronda)
 
             if ronda == 1:
-                if existing_votes.count() >= 4:
+                if len(votados) >= 4:
                     return Response({"detail": "Ya has emitido el máximo de 4 votos para este premio en la Ronda 1.", "code": "max_votes_r1_reached"}, status=status.HTTP_400_BAD_REQUEST)
-                if existing_votes.filter(nominado=nominado).exists():
+                if nominado.pk in votados:
                     return Response({"detail": "Ya has votado por este nominado en esta ronda.", "code": "already_voted_nominado_r1"}, status=status.HTTP_400_BAD_REQUEST)
                 if orden_ronda2 is not None:
                     return Response({"detail": "El campo 'orden_ronda2' no es válido en la Ronda 1.", "code": "invalid_order_r1"}, status=status.HTTP_400_BAD_REQUEST)
@@ -182,11 +243,11 @@ class VotarView(APIView):
                     return Response({"detail": "Para la Ronda 2, debes especificar un 'orden_ronda2' (1, 2 o 3).", "code": "missing_order_r2"}, status=status.HTTP_400_BAD_REQUEST)
                 if orden_ronda2 not in [1, 2, 3]:
                     return Response({"detail": "El 'orden_ronda2' debe ser 1 (Oro), 2 (Plata) o 3 (Bronce).", "code": "invalid_order_value"}, status=status.HTTP_400_BAD_REQUEST)
-                if existing_votes.count() >= 3:
+                if len(votados) >= 3:
                     return Response({"detail": "Ya has emitido el máximo de 3 votos para este premio en la Ronda 2.", "code": "max_votes_r2_reached"}, status=status.HTTP_400_BAD_REQUEST)
-                if existing_votes.filter(orden_ronda2=orden_ronda2).exists():
+                if orden_ronda2 in datos.posiciones(premio.pk, ronda):
                     return Response({"detail": f"Ya has usado la posición {orden_ronda2} para este premio en la Ronda 2.", "code": "position_already_used"}, status=status.HTTP_400_BAD_REQUEST)
-                if existing_votes.filter(nominado=nominado).exists():
+                if nominado.pk in votados:
                     return Response({"detail": "Ya has votado por este nominado en esta Ronda 2.", "code": "already_voted_nominado_r2"}, status=status.HTTP_400_BAD_REQUEST)
                 finalistas_ids = list(
                     Voto.objects.filter(premio=premio, ronda=1)
@@ -207,20 +268,26 @@ class VotarView(APIView):
         err = process_vote(serializer.validated_data)
         if err is not None:
             return err
-        serializer.save(usuario=request.user)
+        serializer.save(usuario=request.user, **Voto.auditoria_desde_peticion(request))
         return Response({"message": "Voto registrado con éxito.", "voto_id": serializer.data['id']}, status=status.HTTP_201_CREATED)
 
 # Vista para listar todos los usuarios (participantes)
 class ListaParticipantesView(APIView):
     permission_classes = [AllowAny] # Vista pública
+    # Paginación por cursor opcional (?page_size=N / ?cursor=...)
+    keyset_ordering = ('username', 'id')
 
+    @respuesta_cacheada()
     def get(self, request):
         # Opcional: Podrías filtrar por usuarios que tienen rol 'votante'
         # o que tienen 'descripcion' o 'foto_perfil' para que no salgan superusuarios "vacíos"
         # usuarios = Usuario.objects.filter(rol='votante', activo=True).order_by('username')
         usuarios = Usuario.objects.filter(verificado=True).order_by('username') # Solo participantes verificados
-        serializer = UsuarioSerializer(usuarios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        pagina = paginator.paginate_queryset(usuarios, request, view=self)
+        if pagina is not None:
+            return paginator.get_paginated_response(UsuarioSerializer(pagina, many=True).data)
+        return Response(leer_usuarios(usuarios), status=status.HTTP_200_OK)
 
 # Vista para ver y editar el perfil del usuario autenticado
 class MiPerfilView(RetrieveUpdateAPIView):
@@ -293,52 +360,38 @@ class ResultadosView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        # ... (Tu lógica existente para el método GET de ResultadosView, no la modifiques aquí)
-        PUNTOS_ORO = 3
-        PUNTOS_PLATA = 2
-        PUNTOS_BRONCE = 1
+        # Puntuación de la Ronda 2 según el sistema de cada premio (ver puntuacion.py)
+        premios = list(Premio.objects.all().order_by('nombre'))
+        papeletas = cargar_papeletas([p.pk for p in premios], ronda=2)
+        clasificaciones = {p.pk: clasificacion(p, 2, papeletas[p.pk]) for p in premios}
 
-        premios = Premio.objects.all().order_by('nombre')
-        resultados_finales = []
+        puntuados = {fila['id'] for filas in clasificaciones.values() for fila in filas}
+        datos = {n['id']: n for n in Nominado.objects.filter(id__in=puntuados).values('id', 'nombre', 'descripcion', 'imagen')}
+        podios = {fila['id'] for filas in clasificaciones.values() for fila in filas[:3]}
+        ganadores = Nominado.objects.in_bulk(podios)
 
+        resultados_finales = []
         for premio in premios:
-            nominados_con_puntos = Voto.objects.filter(
-                premio=premio,
-                ronda=2,
-                orden_ronda2__in=[1, 2, 3]
-            ).values('nominado__id', 'nominado__nombre', 'nominado__descripcion', 'nominado__imagen').annotate(
-                puntos_totales=Sum(
-                    Case(
-                        When(orden_ronda2=1, then=PUNTOS_ORO),
-                        When(orden_ronda2=2, then=PUNTOS_PLATA),
-                        When(orden_ronda2=3, then=PUNTOS_BRONCE),
-                        default=0
-                    )
-                )
-            ).order_by('-puntos_totales', 'nominado__nombre')
-
-            ganador_oro = None
-            ganador_plata = None
-            ganador_bronce = None
-
-            nominados_lista = list(nominados_con_puntos)
-
-            if len(nominados_lista) > 0:
-                ganador_oro = Nominado.objects.get(id=nominados_lista[0]['nominado__id'])
-            if len(nominados_lista) > 1:
-                ganador_plata = Nominado.objects.get(id=nominados_lista[1]['nominado__id'])
-            if len(nominados_lista) > 2:
-                ganador_bronce = Nominado.objects.get(id=nominados_lista[2]['nominado__id'])
-
+            filas = clasificaciones[premio.pk]
+            podio = [ganadores[fila['id']] for fila in filas[:3]] + [None] * (3 - len(filas[:3]))
             resultados_finales.append({
                 'premio_id': str(premio.id),
                 'premio_nombre': premio.nombre,
+                'sistema_puntuacion': premio.sistema_puntuacion,
                 'ganadores': {
-                    'oro': NominadoSerializer(ganador_oro).data if ganador_oro else None,
-                    'plata': NominadoSerializer(ganador_plata).data if ganador_plata else None,
-                    'bronce': NominadoSerializer(ganador_bronce).data if ganador_bronce else None,
+                    medalla: NominadoSerializer(nominado).data if nominado else None
+                    for medalla, nominado in zip(('oro', 'plata', 'bronce'), podio)
                 },
-                'nominados_por_puntos': list(nominados_con_puntos)
+                'nominados_por_puntos': [
+                    {
+                        'nominado__id': fila['id'],
+                        'nominado__nombre': fila['nombre'],
+                        'nominado__descripcion': datos[fila['id']]['descripcion'],
+                        'nominado__imagen': datos[fila['id']]['imagen'],
+                        'puntos_totales': fila['puntos'],
+                    }
+                    for fila in filas
+                ]
             })
 
         return Response(resultados_finales, status=status.HTTP_200_OK)
@@ -350,34 +403,10 @@ class ResultadosView(APIView):
         
         # Función auxiliar para publicar resultados de un premio
         def publicar_premio(premio: Premio):
-            PUNTOS_ORO = 3
-            PUNTOS_PLATA = 2
-            PUNTOS_BRONCE = 1
-            nominados_con_puntos = Voto.objects.filter(
-                premio=premio,
-                ronda=2,
-                orden_ronda2__in=[1, 2, 3]
-            ).values('nominado__id', 'nominado__nombre').annotate(
-                puntos_totales=Sum(
-                    Case(
-                        When(orden_ronda2=1, then=PUNTOS_ORO),
-                        When(orden_ronda2=2, then=PUNTOS_PLATA),
-                        When(orden_ronda2=3, then=PUNTOS_BRONCE),
-                        default=0
-                    )
-                )
-            ).order_by('-puntos_totales', 'nominado__nombre')
-
-            ganador_oro = None
-            ganador_plata = None
-            ganador_bronce = None
-            nominados_lista = list(nominados_con_puntos)
-            if len(nominados_lista) > 0:
-                ganador_oro = Nominado.objects.get(id=nominados_lista[0]['nominado__id'])
-            if len(nominados_lista) > 1:
-                ganador_plata = Nominado.objects.get(id=nominados_lista[1]['nominado__id'])
-            if len(nominados_lista) > 2:
-                ganador_bronce = Nominado.objects.get(id=nominados_lista[2]['nominado__id'])
+            # Podio según el sistema de puntuación del premio
+            podio = [fila['id'] for fila in clasificacion(premio, 2)[:3]]
+            nominados = Nominado.objects.in_bulk(podio)
+            ganador_oro, ganador_plata, ganador_bronce = ([nominados[pk] for pk in podio] + [None] * 3)[:3]
 
             premio.ganador_oro = ganador_oro
             premio.ganador_plata = ganador_plata
@@ -403,6 +432,7 @@ class ResultadosView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             publicado = publicar_premio(premio)
+            publicar_resultados()
             serializer = ResultadosPremioSerializer(publicado)
             return Response(
                 {"message": f"Resultados para '{publicado.nombre}' calculados y publicados con éxito.", "premio_resultados": serializer.data},
@@ -413,6 +443,7 @@ class ResultadosView(APIView):
         publicados = []
         for p in Premio.objects.exclude(estado='finalizado').all():
             publicados.append(ResultadosPremioSerializer(publicar_premio(p)).data)
+        publicar_resultados()
 
         return Response(
             {"message": "Resultados calculados y publicados para todos los premios.", "premios_resultados": publicados},
@@ -423,20 +454,66 @@ class ResultadosPublicosView(APIView):
     permission_classes = [AllowAny] # Cualquiera puede ver los resultados publicados
 
     def get(self, request):
-        # Filtra los premios que tienen sus resultados publicados
-        premios_publicados = Premio.objects.filter(
-            estado='finalizado',
-            fecha_resultados_publicados__isnull=False
-        ).order_by('nombre')
+        # En JSON se sirve el fichero precalculado (ver publicacion.py); 'Content-Location'
+        # indica su URL inmutable, que se puede cachear indefinidamente
+        if request.accepted_renderer.format != 'json':
+            return self.get_renderizado(request)
+        nombre = artefacto_actual()['nombre']
+        response = respuesta_artefacto(request, nombre, CACHE_REVALIDAR)
+        if response is None:
+            return self.get_renderizado(request)
+        response['Content-Location'] = reverse('resultados_estaticos', args=[nombre])
+        return response
+
+    @respuesta_cacheada()
+    def get_renderizado(self, request):
+        return Response(leer_resultados(premios_publicados()), status=status.HTTP_200_OK)
+
+
+# Fichero de resultados publicado (nombre con el hash del contenido). WhiteNoise
+# sirve la misma URL si el fichero ya existía al arrancar el proceso.
+class ResultadosEstaticosView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
 
-        serializer = ResultadosPremioSerializer(premios_publicados, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get(self, request, nombre):
+        response = respuesta_artefacto(request, nombre, CACHE_INMUTABLE)
+        if response is None:
+            return Response({"detail": "No encontrado.", "code": "resultados_not_found"}, status=status.HTTP_404_NOT_FOUND)
+        return response
+
+
+# Salón de la fama: agregados de los ganadores históricos (tabla GanadorHistorico)
+class SalonDeLaFamaView(APIView):
+    permission_classes = [AllowAny]
+    LIMITE_MAXIMO = 500
+
+    @respuesta_cacheada()
+    def get(self, request):
+        nombre = (request.query_params.get('nombre') or '').strip()
+        if nombre:
+            # ?nombre=...: todas las victorias de ese ganador (sin distinguir mayúsculas ni tildes)
+            ganadas = victorias(nombre)
+            return Response({"nombre": nombre, "victorias": len(ganadas), "premios": ganadas}, status=status.HTTP_200_OK)
+        try:
+            limite = int(request.query_params.get('limite', 50))
+        except ValueError:
+            limite = 0
+        if not 1 <= limite <= self.LIMITE_MAXIMO:
+            return Response(
+                {"detail": f"'limite' debe ser un entero entre 1 y {self.LIMITE_MAXIMO}.", "code": "invalid_limit"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(salon_de_la_fama(limite), status=status.HTTP_200_OK)
 
 # Vistas para la administración de usuarios por parte de administradores
 class UsuarioListCreateView(ListCreateAPIView): 
     queryset = Usuario.objects.all().order_by('username') 
     serializer_class = AdminUsuarioSerializer
     permission_classes = [IsAdminUser] 
+    # Paginación por cursor opcional: sin ?page_size ni ?cursor se devuelve la lista completa
+    pagination_class = KeysetPagination
+    keyset_ordering = ('username', 'id')
 
     # Opcional: para la creación, puedes sobrescribir perform_create si necesitas lógica adicional,
     # pero el UsuarioSerializer debería manejarlo bien con los campos especificados.
@@ -6,6 +6,7 @@ from rest_framework import status
 
 from votaciones.models import Premio, Nominado, Usuario, Sugerencia # Importaciones absolutas
 from votaciones.serializers import PremioSerializer, NominadoSerializer, SugerenciaSerializer # Importaciones absolutas
+from votaciones.paginacion import KeysetPagination
 
 # Vistas CRUD para Premios (Solo para Administradores)
 
@@ -16,6 +17,13 @@ class PremioListCreateAPIView(ListCreateAPIView):
     queryset = Premio.objects.all()
     serializer_class = PremioSerializer
     permission_classes = [IsAdminUser] # Solo administradores
+    # Paginación por cursor opcional (?page_size=N / ?cursor=...)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('nombre', 'id')
+
+    def get_queryset(self):
+        # Precarga solo lo que se va a devolver según ?fields= / ?expand=
+        return PremioSerializer.preparar_queryset(super().get_queryset(), self.request)
 
 class PremioRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     """
@@ -26,6 +34,9 @@ class PremioRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAdminUser] # Solo administradores
     lookup_field = 'id' # Usa el campo 'id' (UUID) para buscar el objeto
 
+    def get_queryset(self):
+        return PremioSerializer.preparar_queryset(super().get_queryset(), self.request)
+
 # Vistas para Sugerencias (Solo para Administradores)
 
 class SugerenciaListAPIView(ListAPIView):
@@ -35,6 +46,9 @@ class SugerenciaListAPIView(ListAPIView):
     queryset = Sugerencia.objects.all().order_by('-fecha_sugerencia')
     serializer_class = SugerenciaSerializer
     permission_classes = [IsAdminUser]
+    # Paginación por cursor opcional (?page_size=N / ?cursor=...)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-fecha_sugerencia', '-id')
 
 class SugerenciaRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     """
@@ -55,6 +69,9 @@ class NominadoListCreateAPIView(ListCreateAPIView):
     queryset = Nominado.objects.all()
     serializer_class = NominadoSerializer
     permission_classes = [IsAdminUser] # Solo administradores
+    # Paginación por cursor opcional (?page_size=N / ?cursor=...)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('nombre', 'id')
 
 class NominadoRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     """
@@ -68,10 +85,22 @@ class NominadoRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Count, Q, Sum, Case, When
+from collections import defaultdict
+from django.db.models import Count, Max, Min, Q
+from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
-from .models import Premio, Voto, Usuario, ConfiguracionSistema
+from django.http import StreamingHttpResponse
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .models import Premio, Voto, Usuario, ConfiguracionSistema, TareaAdmin
+from .serializers import TareaAdminSerializer
+from .gala import MODOS_BORRADO, TAMANO_LOTE_BORRADO, reiniciar_fases, tarea_archivar_edicion, tarea_reset_gala
+from .tareas import lanzar_tarea
+from .exportacion import FORMATOS_EXPORTACION, filtrar_votos, iterar_exportacion
+from .acciones_masivas import asignar_tags, verificar_usuarios, vincular_usuarios
+from .importacion import MODOS_IMPORTACION, ErrorImportacion, importar_nominados, leer_filas
+from .busqueda import buscar_sugerencias, contar_sugerencias, marcar_revisadas
+from .puntuacion import VACIA, cargar_papeletas, clasificacion
+from .proyeccion import SIMULACIONES_MAXIMAS, SIMULACIONES_POR_DEFECTO, proyectar_premios
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
@@ -124,42 +153,23 @@ def premios_top(request):
     Devuelve para cada premio abierto (votacion_1 o votacion_2) el top 5 de nominados
     según la ronda actual del premio:
       - Ronda 1: ordenado por número de votos (ronda=1)
-      - Ronda 2: ordenado por puntos (oro=3, plata=2, bronce=1)
+      - Ronda 2: ordenado por puntos según el sistema de puntuación del premio
     """
-    abiertos = Premio.objects.filter(estado__in=['votacion_1', 'votacion_2']).order_by('nombre')
+    abiertos = list(Premio.objects.filter(estado__in=['votacion_1', 'votacion_2']).order_by('nombre'))
     total_usuarios = Usuario.objects.count()
+    # Una consulta por ronda para todos los premios abiertos
+    papeletas = {
+        ronda: cargar_papeletas([p.pk for p in abiertos if p.ronda_actual == ronda], ronda)
+        for ronda in (1, 2)
+    }
 
     data = []
     for p in abiertos:
-        if p.ronda_actual == 1:
-            tops = (
-                Voto.objects
-                .filter(premio=p, ronda=1)
-                .values('nominado__id', 'nominado__nombre')
-                .annotate(valor=Count('id'))
-                .order_by('-valor', 'nominado__nombre')[:5]
-            )
-            total_votos = Voto.objects.filter(premio=p, ronda=1).count()
-            votantes_distintos = Voto.objects.filter(premio=p, ronda=1).values('usuario').distinct().count()
-        else:
-            tops = (
-                Voto.objects
-                .filter(premio=p, ronda=2, orden_ronda2__in=[1,2,3])
-                .values('nominado__id', 'nominado__nombre')
-                .annotate(
-                    valor=Sum(
-                        Case(
-                            When(orden_ronda2=1, then=3),
-                            When(orden_ronda2=2, then=2),
-                            When(orden_ronda2=3, then=1),
-                            default=0,
-                        )
-                    )
-                )
-                .order_by('-valor', 'nominado__nombre')[:5]
-            )
-            total_votos = Voto.objects.filter(premio=p, ronda=2).count()
-            votantes_distintos = Voto.objects.filter(premio=p, ronda=2).values('usuario').distinct().count()
+        ronda = 1 if p.ronda_actual == 1 else 2
+        votos = papeletas[ronda][p.pk]
+        tops = clasificacion(p, ronda, votos)[:5]
+        total_votos = int((votos.matriz != VACIA).sum())
+        votantes_distintos = len(votos)
 
         data.append({
             'premio': {
@@ -167,15 +177,16 @@ def premios_top(request):
                 'nombre': p.nombre,
                 'estado': p.estado,
                 'ronda_actual': p.ronda_actual,
+                'sistema_puntuacion': p.sistema_puntuacion,
             },
             'total_votos': total_votos,
             'votantes_distintos': votantes_distintos,
             'total_usuarios': total_usuarios,
             'top': [
                 {
-                    'id': str(item['nominado__id']),
-                    'nombre': item['nominado__nombre'],
-                    'valor': item['valor'],
+                    'id': str(item['id']),
+                    'nombre': item['nombre'],
+                    'valor': item['puntos'],
                 }
                 for item in tops
             ],
@@ -243,33 +254,343 @@ def reset_gala(request):
     """
     Resetea la gala para pruebas: elimina votos y devuelve el sistema a la fase inicial.
     No elimina usuarios ni premios/nominados, solo limpia votos y reinicia estados.
+
+    Los premios y la fase se reinician al momento (un UPDATE); el borrado de votos se
+    lanza como tarea en segundo plano cuyo estado se consulta en /api/admin/tareas/<id>/.
+    Body opcional: { "modo": "auto" | "truncate" | "lotes", "tamano_lote": 5000 }
     """
+    modo = request.data.get('modo', 'auto')
+    if modo not in MODOS_BORRADO:
+        return Response(
+            {'error': f"Modo no válido. Usa uno de: {', '.join(MODOS_BORRADO)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     try:
-        with transaction.atomic():
-            # Borrar todos los votos
-            Voto.objects.all().delete()
-
-            # Resetear todos los premios a estado inicial
-            for p in Premio.objects.all():
-                p.estado = 'preparacion'
-                p.ronda_actual = 1
-                p.ganador_oro = None
-                p.ganador_plata = None
-                p.ganador_bronce = None
-                p.fecha_resultados_publicados = None
-                p.save(update_fields=['estado', 'ronda_actual', 'ganador_oro', 'ganador_plata', 'ganador_bronce', 'fecha_resultados_publicados'])
-
-            # Resetear configuración del sistema a fase inicial
-            config, _ = ConfiguracionSistema.objects.get_or_create()
-            config.fase_actual = 'preparacion'
-            config.save(update_fields=['fase_actual'])
+        tamano_lote = int(request.data.get('tamano_lote', TAMANO_LOTE_BORRADO))
+    except (TypeError, ValueError):
+        tamano_lote = 0
+    if tamano_lote <= 0:
+        return Response({'error': 'tamano_lote debe ser un entero positivo.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            'mensaje': 'Gala reiniciada: votos eliminados y fases restablecidas a preparación.',
-            'fase_actual': 'preparacion'
-        }, status=status.HTTP_200_OK)
+    try:
+        corte = timezone.now()
+        reiniciar_fases()
+        tarea = lanzar_tarea('reset_gala', tarea_reset_gala, modo=modo, corte=corte, tamano_lote=tamano_lote)
     except Exception as e:
         return Response(
             {'error': f'No se pudo reiniciar la gala: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+    return Response({
+        'mensaje': 'Gala reiniciada: fases restablecidas a preparación. Los votos se están eliminando en segundo plano.',
+        'fase_actual': 'preparacion',
+        'tarea': TareaAdminSerializer(tarea).data,
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def archivar_edicion(request):
+    """
+    Archiva la edición actual (o la indicada): guarda el resumen de votos y el podio
+    de cada premio, regenera `ganadores_historicos`, elimina los votos de la edición
+    y deja los premios en preparación para la edición siguiente.
+    Se ejecuta en segundo plano; el estado se consulta en /api/admin/tareas/<id>/.
+    Body opcional: { "edicion": 2025, "conservar_nominados": false, "tamano_lote": 5000 }
+    """
+    config, _ = ConfiguracionSistema.objects.get_or_create()
+    try:
+        edicion = int(request.data.get('edicion', config.edicion_actual))
+        tamano_lote = int(request.data.get('tamano_lote', TAMANO_LOTE_BORRADO))
+    except (TypeError, ValueError):
+        return Response({'error': 'edicion y tamano_lote deben ser enteros.'}, status=status.HTTP_400_BAD_REQUEST)
+    if tamano_lote <= 0:
+        return Response({'error': 'tamano_lote debe ser un entero positivo.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    en_curso = Premio.objects.filter(edicion=edicion, estado__in=['votacion_1', 'votacion_2']).count()
+    if en_curso:
+        return Response(
+            {'error': f'Hay {en_curso} premios con votación abierta en la edición {edicion}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    conservar_nominados = str(request.data.get('conservar_nominados', False)).lower() in ('1', 'true', 'si', 'sí')
+    tarea = lanzar_tarea(
+        'archivar_edicion', tarea_archivar_edicion,
+        edicion=edicion, conservar_nominados=conservar_nominados, tamano_lote=tamano_lote,
+    )
+    return Response({
+        'mensaje': f'Archivando la edición {edicion} en segundo plano.',
+        'tarea': TareaAdminSerializer(tarea).data,
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def verificar_usuarios_masivo(request):
+    """
+    Verifica o desverifica varios usuarios con un único UPDATE.
+    Body: { "ids": [<uuid>, ...], "verificado": true }
+    Devuelve el resultado de cada id (actualizado, sin_cambios, no_encontrado, id_invalido).
+    """
+    ids = request.data.get('ids')
+    verificado = request.data.get('verificado', True)
+    if not isinstance(ids, list) or not ids:
+        return Response({'error': 'ids debe ser una lista no vacía.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(verificado, bool):
+        return Response({'error': 'verificado debe ser true o false.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(verificar_usuarios(ids, verificado=verificado))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def asignar_tags_masivo(request):
+    """
+    Asigna participante_tag a varios usuarios (null para quitarlo).
+    Body: { "asignaciones": [{"id": <uuid>, "participante_tag": "p1"}, ...] }
+    """
+    asignaciones = request.data.get('asignaciones')
+    if not isinstance(asignaciones, list) or not asignaciones:
+        return Response({'error': 'asignaciones debe ser una lista no vacía.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(asignar_tags(asignaciones))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def vincular_usuarios_masivo(request):
+    """
+    Vincula usuarios a nominados con un único insert en la tabla intermedia.
+    Body: { "vinculos": [{"nominado": <uuid>, "usuarios": [<uuid>, ...]}, ...] }
+    """
+    vinculos = request.data.get('vinculos')
+    if not isinstance(vinculos, list) or not vinculos:
+        return Response({'error': 'vinculos debe ser una lista no vacía.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(vincular_usuarios(vinculos))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def importar_nominados_masivo(request):
+    """
+    Crea o actualiza nominados en bloque.
+    - JSON: { "nominados": [{premio, nombre, descripcion, usuarios, activo}, ...] }
+    - multipart: fichero 'archivo' (.csv o .json)
+    Opciones (body o query string): modo=crear|upsert, estricto=true, simular=true,
+    codificacion=<del fichero> (por defecto UTF-8 y, si no lo es, Windows-1252).
+    Devuelve el resultado de cada fila; con errores y estricto=true no se guarda nada.
+    """
+    opcion = lambda nombre, defecto=None: request.data.get(nombre, request.query_params.get(nombre, defecto))
+    es_cierto = lambda valor: str(valor).lower() in ('1', 'true', 'si', 'sí')
+    modo = opcion('modo', 'crear')
+    if modo not in MODOS_IMPORTACION:
+        return Response(
+            {'error': f"Modo no válido. Usa uno de: {', '.join(MODOS_IMPORTACION)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        archivo = request.FILES.get('archivo')
+        if archivo is not None:
+            formato = 'json' if archivo.name.lower().endswith('.json') else 'csv'
+            filas = leer_filas(archivo.read(), formato, codificacion=opcion('codificacion'))
+        else:
+            filas = request.data.get('nominados') if hasattr(request.data, 'get') else request.data
+            if not isinstance(filas, list):
+                raise ErrorImportacion("Envía 'nominados' como lista o un fichero 'archivo'.")
+        resultado = importar_nominados(
+            filas, modo=modo, estricto=es_cierto(opcion('estricto', False)), simular=es_cierto(opcion('simular', False))
+        )
+    except ErrorImportacion as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    codigo = status.HTTP_201_CREATED if resultado['aplicado'] and resultado['creados'] else status.HTTP_200_OK
+    return Response(resultado, status=codigo)
+
+
+def _criterios_busqueda(datos):
+    """(texto, tipo, revisada) de la petición o un Response 400."""
+    texto = str(datos.get('q') or '').strip()
+    if not texto:
+        return Response({'error': "Falta el texto a buscar ('q')."}, status=status.HTTP_400_BAD_REQUEST)
+    tipo = datos.get('tipo') or None
+    if tipo is not None and tipo not in dict(Sugerencia.TIPO_SUGERENCIA_CHOICES):
+        return Response({'error': f"Tipo no válido: '{tipo}'."}, status=status.HTTP_400_BAD_REQUEST)
+    revisada = datos.get('revisada')
+    if revisada in (None, ''):
+        revisada = None
+    elif str(revisada).lower() in ('true', '1'):
+        revisada = True
+    elif str(revisada).lower() in ('false', '0'):
+        revisada = False
+    else:
+        return Response({'error': 'revisada debe ser true o false.'}, status=status.HTTP_400_BAD_REQUEST)
+    return texto, tipo, revisada
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def buscar_sugerencias_admin(request):
+    """
+    Búsqueda de texto completo en contenido y notas de las sugerencias, por relevancia.
+    Parámetros: q (obligatorio), tipo, revisada=true|false, limite (por defecto 50), desplazamiento.
+    """
+    criterios = _criterios_busqueda(request.query_params)
+    if isinstance(criterios, Response):
+        return criterios
+    try:
+        limite = min(int(request.query_params.get('limite', 50)), settings.PAGINACION_TAMANO_MAXIMO)
+        desplazamiento = int(request.query_params.get('desplazamiento', 0))
+    except ValueError:
+        return Response({'error': 'limite y desplazamiento deben ser enteros.'}, status=status.HTTP_400_BAD_REQUEST)
+    if limite < 1 or desplazamiento < 0:
+        return Response({'error': 'limite debe ser positivo y desplazamiento >= 0.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    pagina = buscar_sugerencias(*criterios, limite=limite, desplazamiento=desplazamiento)
+    sugerencias = Sugerencia.objects.select_related('usuario').in_bulk([pk for pk, _ in pagina])
+    resultados = SugerenciaSerializer([sugerencias[pk] for pk, _ in pagina], many=True).data
+    for datos, (_, rango) in zip(resultados, pagina):
+        datos['rango'] = rango
+    return Response({'total': contar_sugerencias(*criterios), 'resultados': resultados})
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def marcar_sugerencias_revisadas(request):
+    """
+    Marca como revisadas todas las sugerencias que coinciden con la búsqueda.
+    Body: { "q": "...", "tipo": "premio" }   (mismos criterios que la búsqueda)
+    """
+    criterios = _criterios_busqueda(request.data)
+    if isinstance(criterios, Response):
+        return criterios
+    return Response({
+        'coincidencias': contar_sugerencias(*criterios),
+        'actualizadas': marcar_revisadas(*criterios),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def grupos_sugerencias(request):
+    """
+    Agrupa las sugerencias casi duplicadas (MinHash/LSH, ver similitud.py), de mayor a menor.
+    Parámetros: minimo (tamaño mínimo del grupo, por defecto 2), tipo, solo_pendientes=true,
+    muestras (sugerencias de ejemplo por grupo, por defecto 3), limite, desplazamiento.
+    """
+    try:
+        minimo = int(request.query_params.get('minimo', 2))
+        muestras = min(int(request.query_params.get('muestras', 3)), 50)
+        limite = min(int(request.query_params.get('limite', 50)), settings.PAGINACION_TAMANO_MAXIMO)
+        desplazamiento = int(request.query_params.get('desplazamiento', 0))
+    except ValueError:
+        return Response({'error': 'minimo, muestras, limite y desplazamiento deben ser enteros.'}, status=status.HTTP_400_BAD_REQUEST)
+    if minimo < 1 or muestras < 0 or limite < 1 or desplazamiento < 0:
+        return Response({'error': 'Parámetros fuera de rango.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    sugerencias = Sugerencia.objects.filter(grupo__isnull=False)
+    tipo = request.query_params.get('tipo')
+    if tipo:
+        sugerencias = sugerencias.filter(tipo=tipo)
+    if request.query_params.get('solo_pendientes') in ('1', 'true'):
+        sugerencias = sugerencias.filter(revisada=False)
+
+    grupos = (
+        sugerencias.values('grupo')
+        .annotate(
+            total=Count('id'),
+            pendientes=Count('id', filter=Q(revisada=False)),
+            primera=Min('fecha_sugerencia'),
+            ultima=Max('fecha_sugerencia'),
+        )
+        .filter(total__gte=minimo)
+        .order_by('-total', '-ultima')
+    )
+    total_grupos = grupos.count()
+    pagina = list(grupos[desplazamiento:desplazamiento + limite])
+
+    ejemplos = defaultdict(list)
+    if muestras:
+        filas = (
+            sugerencias.filter(grupo__in=[g['grupo'] for g in pagina])
+            .order_by('fecha_sugerencia')
+            .values('grupo', 'id', 'tipo', 'contenido', 'revisada', 'fecha_sugerencia')
+        )
+        for fila in filas:
+            lista = ejemplos[fila.pop('grupo')]
+            if len(lista) < muestras:
+                lista.append(fila)
+    for grupo in pagina:
+        grupo['muestras'] = ejemplos.get(grupo['grupo'], [])
+    return Response({'total': total_grupos, 'grupos': pagina})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def estado_tarea(request, tarea_id):
+    """
+    Devuelve el estado y progreso de una tarea de administración en segundo plano.
+    """
+    try:
+        tarea = TareaAdmin.objects.get(pk=tarea_id)
+    except TareaAdmin.DoesNotExist:
+        return Response({'error': 'Tarea no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(TareaAdminSerializer(tarea).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_votos(request):
+    """
+    Exporta los votos (incluyendo IP y user agent) en streaming para auditoría.
+    Parámetros opcionales: formato=csv|jsonl, premio=<uuid>, ronda=1|2,
+    desde=YYYY-MM-DD, hasta=YYYY-MM-DD (también admiten fecha/hora ISO 8601).
+    """
+    formato = request.query_params.get('formato', 'csv')
+    if formato not in FORMATOS_EXPORTACION:
+        return Response(
+            {'error': "Formato no soportado. Usa 'csv' o 'jsonl'."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        votos = filtrar_votos(
+            premio=request.query_params.get('premio'),
+            ronda=request.query_params.get('ronda'),
+            desde=request.query_params.get('desde'),
+            hasta=request.query_params.get('hasta'),
+        )
+    except (ValueError, DjangoValidationError) as e:
+        mensaje = e.messages[0] if isinstance(e, DjangoValidationError) else str(e)
+        return Response({'error': mensaje}, status=status.HTTP_400_BAD_REQUEST)
+
+    content_type = 'text/csv; charset=utf-8' if formato == 'csv' else 'application/x-ndjson; charset=utf-8'
+    nombre_fichero = f"votos_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+    response = StreamingHttpResponse(iterar_exportacion(votos, formato), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre_fichero}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def proyeccion_premios(request):
+    """
+    Proyección Monte-Carlo de los premios en Ronda 2 (ver proyeccion.py): probabilidad
+    de victoria de cada finalista y si el ganador ya está matemáticamente decidido.
+    Parámetros: simulaciones (por defecto 2000), semilla (para resultados reproducibles).
+    """
+    try:
+        simulaciones = int(request.query_params.get('simulaciones', SIMULACIONES_POR_DEFECTO))
+        semilla = request.query_params.get('semilla')
+        semilla = int(semilla) if semilla not in (None, '') else None
+    except ValueError:
+        return Response({'error': 'simulaciones y semilla deben ser enteros.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= simulaciones <= SIMULACIONES_MAXIMAS or (semilla is not None and semilla < 0):
+        return Response(
+            {'error': f'simulaciones debe estar entre 1 y {SIMULACIONES_MAXIMAS} y semilla no puede ser negativa.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response({
+        'simulaciones': simulaciones,
+        'calculado': timezone.now(),
+        'premios': proyectar_premios(simulaciones=simulaciones, semilla=semilla),
+    })
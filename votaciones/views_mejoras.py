@@ -8,6 +8,7 @@ from django.core.exceptions import ValidationError
 
 from .models import Premio, Voto, Usuario
 from .serializers import PremioSerializer, VotoSerializer
+from .publicacion import publicar_resultados
 
 class VerificarVotoView(APIView):
     """
@@ -120,6 +121,9 @@ class CambiarEstadoPremioView(APIView):
             
             premio.estado = nuevo_estado
             premio.save()
+            if nuevo_estado == 'finalizado':
+                # Fichero de resultados públicos, una vez confirmada la transacción
+                transaction.on_commit(publicar_resultados)
             
         return Response({
             "mensaje": f"Estado del premio actualizado a {nuevo_estado}",